@@ -1,14 +1,51 @@
-from datetime import datetime, timezone
+from __future__ import annotations
 
-import requests
+import json
+import logging
+import pathlib
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Protocol
 
 from app.config import settings
+from app.metrics import ALERT_DISPATCH_SECONDS, ALERTS
+
+if TYPE_CHECKING:
+    import requests
+
+    from app.db.telemetry import TelemetryWriter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AlertEvent:
+    alert_type: str
+    camera_id: str
+    severity: str
+    details: str
+    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    suppressed: int = 0
+
+    def format(self) -> str:
+        message = format_alert(self.alert_type, self.camera_id, self.severity, self.details, self.timestamp)
+        if self.suppressed:
+            message += f" (+{self.suppressed} suppressed)"
+        return message
+
+
+class AlertSink(Protocol):
+    def deliver(self, events: list[AlertEvent], message: str) -> None: ...
 
 
 class TelegramAlerter:
     def __init__(self) -> None:
         self.bot_token = settings.telegram_bot_token
         self.chat_id = settings.telegram_chat_id
+        self.session: requests.Session | None = None
 
     @property
     def enabled(self) -> bool:
@@ -18,8 +55,225 @@ class TelegramAlerter:
         if not self.enabled:
             return
 
+        if self.session is None:
+            # Only processes that actually send to Telegram import requests.
+            import requests
+
+            self.session = requests.Session()
         url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-        requests.post(url, json={"chat_id": self.chat_id, "text": message}, timeout=8)
+        response = self.session.post(url, json={"chat_id": self.chat_id, "text": message}, timeout=8)
+        response.raise_for_status()
+
+    def deliver(self, events: list[AlertEvent], message: str) -> None:
+        self.send(message)
+
+
+class MemorySink:
+    def __init__(self) -> None:
+        self.messages: list[str] = []
+        self.events: list[AlertEvent] = []
+
+    def deliver(self, events: list[AlertEvent], message: str) -> None:
+        self.messages.append(message)
+        self.events.extend(events)
+
+
+class FileSink:
+    """Appends one JSON line per alert, for offline testing and local audit trails."""
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def deliver(self, events: list[AlertEvent], message: str) -> None:
+        with self.path.open("a", encoding="utf-8") as fh:
+            for event in events:
+                record = asdict(event) | {"timestamp": event.timestamp.isoformat()}
+                fh.write(json.dumps(record) + "\n")
+
+
+class DatabaseSink:
+    """Persists alerts to the ``alerts`` table through the batched telemetry writer."""
+
+    def __init__(self, writer: TelemetryWriter) -> None:
+        self.writer = writer
+
+    def deliver(self, events: list[AlertEvent], message: str) -> None:
+        for event in events:
+            self.writer.alert(event.alert_type, event.timestamp, event.camera_id, event.severity)
+
+
+@dataclass
+class DispatcherStats:
+    accepted: int = 0
+    suppressed: int = 0
+    dropped: int = 0
+    messages_sent: int = 0
+    delivery_failures: int = 0
+    retries: int = 0
+
+    def as_dict(self, pending: int) -> dict[str, int]:
+        return {"pending": pending} | asdict(self)
+
+
+class AlertDispatcher:
+    """Queues alerts and delivers them to sinks from background threads.
+
+    ``dispatch`` never blocks on the network. Repeats of the same (alert_type, camera_id) inside
+    ``cooldown_seconds`` are suppressed and counted on the next alert that gets through. Alerts
+    arriving within ``coalesce_seconds`` of each other are sent as one digest message. Each sink
+    has its own delivery thread and queue, so a sink that is retrying with exponential backoff
+    does not hold up the others; ``close`` cuts the backoff short.
+    """
+
+    def __init__(
+        self,
+        sinks: list[AlertSink],
+        cooldown_seconds: float = settings.alerts.cooldown_seconds,
+        coalesce_seconds: float = settings.alerts.coalesce_seconds,
+        max_retries: int = settings.alerts.max_retries,
+        retry_backoff_seconds: float = settings.alerts.retry_backoff_seconds,
+        queue_size: int = settings.alerts.queue_size,
+    ) -> None:
+        self.sinks = sinks
+        self.cooldown_seconds = cooldown_seconds
+        self.coalesce_seconds = coalesce_seconds
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.stats = DispatcherStats()
+
+        self._queue: queue.Queue[AlertEvent] = queue.Queue(maxsize=queue_size)
+        self._sink_queues: list[queue.Queue[tuple[list[AlertEvent], str]]] = [queue.Queue(maxsize=queue_size) for _ in sinks]
+        self._last_sent: dict[tuple[str, str], float] = {}
+        self._suppressed: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sinks_stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._sink_threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+        for sink, sink_queue in zip(self.sinks, self._sink_queues):
+            thread = threading.Thread(
+                target=self._run_sink, args=(sink, sink_queue), name=f"alert-sink-{type(sink).__name__}", daemon=True
+            )
+            thread.start()
+            self._sink_threads.append(thread)
+
+    def close(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        # Sinks stop once the digests queued for them are delivered (without backoff waits).
+        self._sinks_stop.set()
+        for thread in self._sink_threads:
+            thread.join(timeout=timeout)
+        self._sink_threads = []
+
+    def dispatch(self, alert_type: str, camera_id: str, severity: str, details: str) -> bool:
+        """Queue an alert; returns False if it was suppressed by the cooldown or the queue is full."""
+        key = (alert_type, camera_id)
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_sent.get(key)
+            if last is not None and now - last < self.cooldown_seconds:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                self.stats.suppressed += 1
+                return False
+            event = AlertEvent(alert_type, camera_id, severity, details, suppressed=self._suppressed.get(key, 0))
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                # Nothing was sent, so neither start the cooldown nor lose the suppressed count.
+                self.stats.dropped += 1
+                return False
+            self._last_sent[key] = now
+            self._suppressed.pop(key, None)
+            self.stats.accepted += 1
+        ALERTS.labels(alert_type).inc()
+        return True
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return self.stats.as_dict(self._queue.qsize() + sum(q.qsize() for q in self._sink_queues))
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            events = [first]
+            deadline = time.monotonic() + self.coalesce_seconds
+            while not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    events.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            while True:
+                try:
+                    events.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            message = format_digest(events)
+            for sink, sink_queue in zip(self.sinks, self._sink_queues):
+                try:
+                    sink_queue.put_nowait((events, message))
+                except queue.Full:
+                    with self._lock:
+                        self.stats.delivery_failures += 1
+                    logger.warning("Alert queue for %s is full; dropping a digest of %d alerts", type(sink).__name__, len(events))
+
+    def _run_sink(self, sink: AlertSink, sink_queue: queue.Queue[tuple[list[AlertEvent], str]]) -> None:
+        while not (self._sinks_stop.is_set() and sink_queue.empty()):
+            try:
+                events, message = sink_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self._deliver(sink, events, message)
+
+    def _deliver(self, sink: AlertSink, events: list[AlertEvent], message: str) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                sink.deliver(events, message)
+            except Exception:
+                if attempt == self.max_retries:
+                    with self._lock:
+                        self.stats.delivery_failures += 1
+                    logger.exception("Alert delivery to %s failed", type(sink).__name__)
+                    return
+                with self._lock:
+                    self.stats.retries += 1
+                self._stop.wait(self.retry_backoff_seconds * 2**attempt)
+                continue
+            with self._lock:
+                self.stats.messages_sent += 1
+            # From when each alert was raised, so coalescing and retries are included.
+            delivered = ALERT_DISPATCH_SECONDS.labels(type(sink).__name__)
+            now = time.time()
+            for event in events:
+                delivered.observe(now - event.timestamp.timestamp())
+            return
+
+
+def build_dispatcher(writer: TelemetryWriter | None = None) -> AlertDispatcher:
+    sinks: list[AlertSink] = []
+    telegram = TelegramAlerter()
+    if telegram.enabled:
+        sinks.append(telegram)
+    if settings.alerts.log_path:
+        sinks.append(FileSink(settings.alerts.log_path))
+    if writer is not None:
+        sinks.append(DatabaseSink(writer))
+    return AlertDispatcher(sinks)
 
 
 def loitering_trigger(dwell_seconds: float) -> bool:
@@ -38,6 +292,14 @@ def shelf_empty_trigger(empty_seconds: float) -> bool:
     return empty_seconds >= settings.alerts.shelf_empty_seconds
 
 
-def format_alert(alert_type: str, camera_id: str, severity: str, details: str) -> str:
-    ts = datetime.now(timezone.utc).isoformat()
+def format_alert(alert_type: str, camera_id: str, severity: str, details: str, timestamp: datetime | None = None) -> str:
+    ts = (timestamp or datetime.now(timezone.utc)).isoformat()
     return f"[{ts}] [{severity.upper()}] {alert_type} @ {camera_id}: {details}"
+
+
+def format_digest(events: list[AlertEvent]) -> str:
+    if len(events) == 1:
+        return events[0].format()
+    lines = [f"{len(events)} alerts:"]
+    lines.extend(f"- {event.format()}" for event in events)
+    return "\n".join(lines)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Any
+
+import cv2
+import numpy as np
+
+from app.config import settings
+
+
+class MotionScorer:
+    """Cheap frame-difference motion score on a small grayscale thumbnail."""
+
+    def __init__(self, width: int = settings.cadence.motion_width) -> None:
+        self.width = width
+        self._previous: np.ndarray | None = None
+        self._thumbnail: np.ndarray | None = None
+
+    def score(self, frame: np.ndarray) -> float:
+        height, width = frame.shape[:2]
+        size = (self.width, max(1, round(height * self.width / width)))
+        if self._thumbnail is None or self._thumbnail.shape[::-1] != size:
+            self._thumbnail = np.empty(size[::-1], dtype=np.uint8)
+            self._previous = None
+
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._thumbnail) if small.ndim == 3 else small
+        if self._previous is None:
+            self._previous = gray.copy()
+            return 1.0
+
+        motion = float(cv2.absdiff(gray, self._previous).mean()) / 255.0
+        self._previous[...] = gray
+        return motion
+
+
+class DetectionCadence:
+    """Decides per frame whether to run the detector or let the tracker predict.
+
+    The detector runs at least every ``max_interval`` frames, and sooner (but no more often than
+    every ``min_interval`` frames) when the motion score reaches ``motion_threshold``.
+    """
+
+    def __init__(
+        self,
+        min_interval: int = settings.cadence.min_interval,
+        max_interval: int = settings.cadence.max_interval,
+        motion_threshold: float = settings.cadence.motion_threshold,
+        scorer: MotionScorer | None = None,
+    ) -> None:
+        if not 1 <= min_interval <= max_interval:
+            raise ValueError("Detection cadence needs 1 <= min_interval <= max_interval")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.motion_threshold = motion_threshold
+        self.scorer = scorer or MotionScorer()
+
+        self.detected_frames = 0
+        self.predicted_frames = 0
+        self.last_motion = 0.0
+        self._since_detection = max_interval
+
+    def should_detect(self, frame: np.ndarray) -> bool:
+        self.last_motion = self.scorer.score(frame)
+        self._since_detection += 1
+        detect = self._since_detection >= self.max_interval or (
+            self._since_detection >= self.min_interval and self.last_motion >= self.motion_threshold
+        )
+        if detect:
+            self._since_detection = 0
+            self.detected_frames += 1
+        else:
+            self.predicted_frames += 1
+        return detect
+
+    def snapshot(self) -> dict[str, float | int]:
+        total = self.detected_frames + self.predicted_frames
+        return {
+            "detected_frames": self.detected_frames,
+            "predicted_frames": self.predicted_frames,
+            "detect_ratio": round(self.detected_frames / total, 3) if total else 0.0,
+            "last_motion": round(self.last_motion, 4),
+        }
+
+
+def predict_tracks(tracker: Any) -> list[Any]:
+    """Advance a DeepSORT tracker's Kalman filters one frame without an update step.
+
+    ``update_tracks([])`` would mark every track as missed, and DeepSORT deletes tentative tracks
+    on their first miss, so tracks would never confirm when detection runs every few frames.
+    The detector did not look at this frame, so it is not counted as a miss either: DeepSORT only
+    IoU-matches tracks updated on the previous step. As a consequence ``max_age`` counts detector
+    runs, not frames: at a detection interval of ``k`` a lost track is kept for up to
+    ``k * max_age`` frames.
+    """
+    tracker.tracker.predict()
+    tracks = tracker.tracker.tracks
+    for track in tracks:
+        track.time_since_update -= 1
+    return tracks
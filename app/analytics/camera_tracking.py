@@ -1,24 +1,61 @@
 from __future__ import annotations
 
 import argparse
+import json
+import logging
+import threading
 import time
+import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import Any, Callable
 
 import cv2
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
-from ultralytics import YOLO
-
+import numpy as np
+
+from app.analytics.alerts import build_dispatcher
+from app.analytics.cadence import DetectionCadence, predict_tracks
+from app.analytics.detectors import load_detector
+from app.analytics.frame_ring import FrameRef, FrameRing, frame_ring_slots
+from app.analytics.heatmap import OccupancyHeatmap
+from app.analytics.pipeline import Pipeline, Stage
+from app.analytics.postprocess import ClassFilter, target_classes_from_config
+from app.analytics.preview import PreviewFrame, PreviewPublisher, annotate_frame
+from app.analytics.reid import EmbeddingIndex, ReIdMatch, shared_index
+from app.analytics.rules import RuleEngine, RuleInput, rules_for_camera
+from app.analytics.trajectory import TrajectoryBuffer, TrajectoryMonitor, trajectory_memory_report
+from app.analytics.zones import Zone, ZoneDwell, ZoneExit, ZoneIndex, load_zone_config, rectangle_zone
 from app.config import settings
-from app.db.models import Customer, Movement
-
-try:
-    from deep_sort_realtime.deepsort_tracker import DeepSort
-except Exception as exc:  # pragma: no cover
-    raise RuntimeError(
-        "deep-sort-realtime is required for camera tracking. Install with: pip install -r requirements-vision.txt"
-    ) from exc
+from app.db.heatmaps import LIVE
+from app.db.telemetry import TelemetryWriter
+from app.metrics import (
+    CAMERA_FPS,
+    PIPELINE_DROPPED,
+    PIPELINE_PROCESSED,
+    QUEUE_DEPTH,
+    REGISTRY,
+    STAGE_SECONDS,
+    TRACKED_OBJECTS,
+    MetricsServer,
+)
+from app.profiler import PROFILER
+
+logger = logging.getLogger(__name__)
+
+# Per-frame steps timed into retail_vision_step_seconds; "resize" is the copy into the frame ring.
+STEPS = ("read", "resize", "predict", "postprocess", "track", "analytics", "persist", "render")
+
+
+def load_tracker(**kwargs: Any) -> Any:
+    """A DeepSORT tracker, imported on first use so ``--help`` and the supervisor's config
+    handling do not pay for scipy and the embedder."""
+    try:
+        from deep_sort_realtime.deepsort_tracker import DeepSort
+    except Exception as exc:  # pragma: no cover
+        raise RuntimeError(
+            "deep-sort-realtime is required for camera tracking. Install with: pip install -r requirements-vision.txt"
+        ) from exc
+    return DeepSort(**kwargs)
 
 
 @dataclass
@@ -26,184 +63,528 @@ class TrackState:
     track_id: int
     entry_time: datetime
     last_seen: datetime
-    path: list[tuple[float, float]] = field(default_factory=list)
-    db_customer_id: int | None = None
-    shelf_dwell_start: datetime | None = None
-    shelf_dwell_seconds: float = 0.0
+    path: TrajectoryBuffer = field(default_factory=TrajectoryBuffer)
+    customer_key: str = field(default_factory=lambda: uuid.uuid4().hex)
+    zones: ZoneDwell = field(default_factory=ZoneDwell)
+    exit_time: datetime | None = None
+
+    @property
+    def zone_dwell_seconds(self) -> float:
+        return self.zones.total_seconds()
+
+
+@dataclass
+class FramePacket:
+    frame_id: int
+    captured_at: datetime
+    frame: np.ndarray
+    frame_ref: FrameRef | None = None
+    detections: list[tuple[str, float, list[float]]] = field(default_factory=list)
+    deep_sort_input: list[tuple[list[float], float, str]] = field(default_factory=list)
+    detected: bool = True
+    tracks: list[tuple[int, tuple[float, float, float, float], float]] = field(default_factory=list)
+    new_tracks: list[TrackState] = field(default_factory=list)
+    positions: list[tuple[TrackState, float, float]] = field(default_factory=list)
+    finalized: list[TrackState] = field(default_factory=list)
+    zone_exits: list[tuple[TrackState, ZoneExit]] = field(default_factory=list)
+    heatmap: np.ndarray | None = None
 
 
 class CameraTrackerApp:
-    def __init__(self, args: argparse.Namespace) -> None:
+    """Live tracker for one camera. ``model`` replaces the YOLO weights at ``args.model`` with any
+    object exposing ultralytics' ``predict`` (e.g. the replay harness's stub detector)."""
+
+    def __init__(self, args: argparse.Namespace, model: Any | None = None) -> None:
         self.args = args
-        self.model = YOLO(args.model)
-        self.tracker = DeepSort(max_age=30, n_init=3)
-        self.target_classes = {"person", "bottle", "backpack"}
-        self.target_classes.update(args.product_classes)
+        if model is None:
+            model = load_detector(args.backend, args.model, args.onnx_model, imgsz=(args.height, args.width))
+        self.model = model
+        self.tracker = load_tracker(max_age=30, n_init=3)
+        self.target_classes = target_classes_from_config(settings.detection) | set(args.product_classes)
+        self.class_filter: ClassFilter | None = None
+        self.cadence: DetectionCadence | None = None
+        if args.adaptive_cadence:
+            self.cadence = DetectionCadence(
+                min_interval=args.min_detect_interval,
+                max_interval=args.detect_every,
+                motion_threshold=args.motion_threshold,
+            )
         self.track_states: dict[int, TrackState] = {}
         self.lost_timeout_seconds = args.lost_timeout_seconds
+        # Shared by every camera in this process, so a shopper keeps one customer key across them.
+        self.reid: EmbeddingIndex | None = shared_index() if args.reid else None
+
+        self.zones: list[Zone] = []
+        if args.zones_file:
+            self.zones = load_zone_config(args.zones_file).get(args.camera_id, [])
+        if args.shelf_zone:
+            self.zones.append(rectangle_zone("Shelf zone", *args.shelf_zone))
+        self.zone_index = ZoneIndex(self.zones, args.width, args.height) if self.zones else None
+
+        self.writer = TelemetryWriter.from_url(
+            args.telemetry_url,
+            batch_size=settings.telemetry.batch_size,
+            flush_interval_seconds=settings.telemetry.flush_interval_seconds,
+            max_pending_events=settings.telemetry.max_pending_events,
+        )
+        self.dispatcher = build_dispatcher(self.writer)
+        self.heatmap = OccupancyHeatmap(args.width, args.height)
+        self.trajectories = TrajectoryMonitor(args.camera_id, self.heatmap)
+        self.rules = RuleEngine(args.camera_id, rules_for_camera(args.camera_id, args.rules_file), self.zones, self.dispatcher)
+        # Shelf stock is the number of a zone's product_class detections inside it.
+        self.product_zones: dict[str, list[int]] = {}
+        for index, zone in enumerate(self.zones):
+            if zone.product_class:
+                self.product_zones.setdefault(zone.product_class, []).append(index)
+        self.rule_log = open(args.record_rule_inputs, "a", encoding="utf-8") if args.record_rule_inputs else None
+        self.last_heatmap_save = time.monotonic()
+
+        self.preview: PreviewPublisher | None = None
+        if args.headless and (args.preview_dir or args.preview_port):
+            self.preview = PreviewPublisher(
+                fps=args.preview_fps,
+                output_dir=args.preview_dir,
+                port=args.preview_port,
+                jpeg_quality=settings.preview.jpeg_quality,
+                zones=self.zones,
+            )
 
-        self.engine = create_engine(settings.postgres_url, future=True)
-        self.session_factory = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
-
-    def _inside_shelf_zone(self, cx: float, cy: float) -> bool:
-        if not self.args.shelf_zone:
-            return False
-        x1, y1, x2, y2 = self.args.shelf_zone
-        return x1 <= cx <= x2 and y1 <= cy <= y2
-
-    def _upsert_state(self, session: Session, track_id: int, cx: float, cy: float, now: datetime) -> TrackState:
+        # Metric children are looked up once; observing one is a bisect and a lock.
+        camera = args.camera_id
+        self.step_seconds = {step: STAGE_SECONDS.labels(camera, step) for step in STEPS}
+        self.tracked_objects = TRACKED_OBJECTS.labels(camera)
+        self.fps_gauge = CAMERA_FPS.labels(camera)
+        self.metrics_server: MetricsServer | None = None
+
+        self.cap: cv2.VideoCapture | None = None
+        self.pipeline: Pipeline | None = None
+        # Frames in flight live in preallocated ring slots; the capture buffer is reused too.
+        self.frames: FrameRing | None = None
+        self._raw_frame: np.ndarray | None = None
+        self.frame_id = 0
+        self.last_frame_time = time.perf_counter()
+        self.fps = 0.0
+        self.last_stats_time = time.perf_counter()
+        self.last_stats_frames = 0
+        # Where --stats-interval-seconds reports go; the supervisor forwards them to its parent.
+        self.report_stats: Callable[[dict[str, Any]], None] = lambda report: print(json.dumps(report))
+        self.people_in_view = 0
+        self._occupancy_post: threading.Thread | None = None
+
+    def _update_state(
+        self, track_id: int, cx: float, cy: float, now: datetime, match: ReIdMatch | None = None
+    ) -> tuple[TrackState, bool, list[ZoneExit]]:
         state = self.track_states.get(track_id)
+        is_new = state is None and match is None
         if state is None:
-            customer = Customer(entry_time=now)
-            session.add(customer)
-            session.flush()
-            state = TrackState(track_id=track_id, entry_time=now, last_seen=now, db_customer_id=customer.id)
+            state = self._resume(track_id, match, now) if match is not None else None
+            if state is None:
+                state = TrackState(track_id=track_id, entry_time=now, last_seen=now)
             self.track_states[track_id] = state
 
         state.last_seen = now
-        state.path.append((cx, cy))
-
-        if state.db_customer_id is not None:
-            session.add(
-                Movement(
-                    customer_id=state.db_customer_id,
-                    timestamp=now,
-                    x_coordinate=float(cx),
-                    y_coordinate=float(cy),
-                )
-            )
-
-        if self._inside_shelf_zone(cx, cy):
-            if state.shelf_dwell_start is None:
-                state.shelf_dwell_start = now
-        elif state.shelf_dwell_start is not None:
-            state.shelf_dwell_seconds += (now - state.shelf_dwell_start).total_seconds()
-            state.shelf_dwell_start = None
-
-        return state
-
-    def _finalize_lost_tracks(self, session: Session, active_track_ids: set[int], now: datetime) -> None:
+        state.path.append(cx, cy, now.timestamp())
+
+        exits: list[ZoneExit] = []
+        if self.zone_index is not None:
+            exits = state.zones.update(self.zone_index, self.zone_index.combo_at(cx, cy), now)
+        return state, is_new, exits
+
+    def _resume(self, track_id: int, match: ReIdMatch, now: datetime) -> TrackState:
+        """The state for a new DeepSORT track re-identified as ``match``'s customer.
+
+        A customer still waiting out ``lost_timeout_seconds`` here (occluded past DeepSORT's
+        ``max_age``) moves to the new track with its path and zone dwell; anyone else (seen by
+        another camera, or already exited) resumes with their original entry time.
+        """
+        for old_id, state in self.track_states.items():
+            if state.customer_key == match.customer_key:
+                del self.track_states[old_id]
+                state.track_id = track_id
+                return state
+        entry_time = datetime.fromtimestamp(match.entered_at, tz=timezone.utc)
+        return TrackState(track_id=track_id, entry_time=entry_time, last_seen=now, customer_key=match.customer_key)
+
+    def _reidentify(self, tracks: list[Any], now: datetime) -> dict[int, ReIdMatch]:
+        """Matches for confirmed tracks that are new to this camera, by their latest DeepSORT feature."""
+        assert self.reid is not None
+        new = [
+            track
+            for track in tracks
+            if int(track.track_id) not in self.track_states and track.time_since_update == 0 and track.features
+        ]
+        if not new:
+            return {}
+        embeddings = np.stack([track.get_feature() for track in new])
+        matches = self.reid.match(embeddings, self.args.camera_id, now.timestamp(), self.args.reid_threshold)
+        return {int(track.track_id): match for track, match in zip(new, matches) if match is not None}
+
+    def _update_gallery(self, tracks: list[Any], now: datetime) -> None:
+        assert self.reid is not None
+        fresh = [track for track in tracks if track.time_since_update == 0 and track.features]
+        if not fresh:
+            return
+        states = [self.track_states[int(track.track_id)] for track in fresh]
+        self.reid.upsert(
+            [state.customer_key for state in states],
+            np.stack([track.get_feature() for track in fresh]),
+            self.args.camera_id,
+            now.timestamp(),
+            [state.entry_time.timestamp() for state in states],
+        )
+
+    def _finalize_lost_tracks(
+        self, active_track_ids: set[int], now: datetime
+    ) -> tuple[list[TrackState], list[tuple[TrackState, ZoneExit]]]:
         to_finalize: list[int] = []
         for tid, state in self.track_states.items():
             is_lost = tid not in active_track_ids and (now - state.last_seen).total_seconds() > self.lost_timeout_seconds
             if is_lost:
                 to_finalize.append(tid)
 
+        finalized: list[TrackState] = []
+        zone_exits: list[tuple[TrackState, ZoneExit]] = []
         for tid in to_finalize:
             state = self.track_states.pop(tid)
-            if state.shelf_dwell_start is not None:
-                state.shelf_dwell_seconds += (now - state.shelf_dwell_start).total_seconds()
-                state.shelf_dwell_start = None
+            if self.zone_index is not None:
+                zone_exits.extend((state, zone_exit) for zone_exit in state.zones.close(self.zone_index, now))
+            state.exit_time = now
+            finalized.append(state)
+        return finalized, zone_exits
+
+    def _capture(self) -> FramePacket | None:
+        assert self.cap is not None
+        started = time.perf_counter()
+        ok, frame = self.cap.read(self._raw_frame)
+        read_done = time.perf_counter()
+        self.step_seconds["read"].observe(read_done - started)
+        if not ok:
+            return None
+
+        self._raw_frame = frame
+        self.frame_id += 1
+        captured_at = datetime.now(timezone.utc)
+        ref = None
+        if self.frames is not None:
+            ref = self.frames.write(frame, self.frame_id, captured_at.timestamp(), self.args.camera_id)
+        if ref is None:
+            # Every slot is still in flight (counted as an overrun): this frame gets its own buffer.
+            frame = cv2.resize(frame, (self.args.width, self.args.height))
+        else:
+            frame = self.frames.frame(ref)
+        self.step_seconds["resize"].observe(time.perf_counter() - read_done)
+        return FramePacket(frame_id=self.frame_id, captured_at=captured_at, frame=frame, frame_ref=ref)
+
+    def release_frame(self, packet: FramePacket) -> None:
+        """Return a packet's ring slot once nothing downstream reads its pixels."""
+        if packet.frame_ref is not None and self.frames is not None:
+            self.frames.release(packet.frame_ref)
+            packet.frame_ref = None
+
+    def close_frames(self) -> None:
+        if self.frames is not None:
+            self.frames.close()
+            self.frames = None
+
+    def _detect(self, packet: FramePacket) -> FramePacket:
+        if self.cadence is not None and not self.cadence.should_detect(packet.frame):
+            # DeepSORT's Kalman filter carries the tracks through this frame.
+            packet.detected = False
+            return packet
+
+        started = time.perf_counter()
+        results = self.model.predict(packet.frame, conf=self.args.confidence, verbose=False)
+        result = results[0]
+        predicted = time.perf_counter()
+        self.step_seconds["predict"].observe(predicted - started)
+        if self.class_filter is None:
+            self.class_filter = ClassFilter(result.names, self.target_classes)
+
+        detections = self.class_filter.apply(result)
+        packet.detections = list(zip(detections.labels, detections.confidence.tolist(), detections.xyxy.tolist()))
+        packet.deep_sort_input = self.class_filter.tracked(detections).to_deep_sort()
+        self.step_seconds["postprocess"].observe(time.perf_counter() - predicted)
+        return packet
+
+    def _track(self, packet: FramePacket) -> FramePacket:
+        started = time.perf_counter()
+        if packet.detected:
+            tracks = self.tracker.update_tracks(packet.deep_sort_input, frame=packet.frame)
+        else:
+            tracks = predict_tracks(self.tracker)
+        tracked = time.perf_counter()
+        self.step_seconds["track"].observe(tracked - started)
+        now = packet.captured_at
+        active_track_ids: set[int] = set()
+        confirmed = [track for track in tracks if track.is_confirmed()]
+        matches = self._reidentify(confirmed, now) if self.reid is not None and packet.detected else {}
+
+        for track in confirmed:
+            tid = int(track.track_id)
+            active_track_ids.add(tid)
+            x1, y1, x2, y2 = track.to_ltrb()
+            cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+
+            state, is_new, exits = self._update_state(tid, cx, cy, now, matches.get(tid))
+            if is_new:
+                packet.new_tracks.append(state)
+            packet.zone_exits.extend((state, zone_exit) for zone_exit in exits)
+            packet.positions.append((state, cx, cy))
+            packet.tracks.append((tid, (x1, y1, x2, y2), state.zone_dwell_seconds))
+
+        if self.reid is not None and packet.detected:
+            self._update_gallery(confirmed, now)
+        packet.finalized, zone_exits = self._finalize_lost_tracks(active_track_ids, now)
+        packet.zone_exits.extend(zone_exits)
+
+        active = [state for state, _, _ in packet.positions]
+        kinematics = self.trajectories.update([state.path for state in active], now.timestamp())
+        rule_input = RuleInput(
+            timestamp=now.timestamp(),
+            track_ids=np.fromiter((state.track_id for state in active), dtype=np.int64, count=len(active)),
+            speed=np.where(kinematics.valid, kinematics.speed_px_per_s, np.nan),
+            dwell=np.fromiter(((now - state.entry_time).total_seconds() for state in active), dtype=np.float64, count=len(active)),
+            zone_occupancy=self.zone_index.counts_at(kinematics.position) if self.zone_index is not None else None,
+            shelf_stock=self._shelf_stock(packet),
+            camera_id=self.args.camera_id,
+        )
+        self.rules.update(rule_input)
+        if self.rule_log is not None:
+            self.rule_log.write(json.dumps(rule_input.as_dict()) + "\n")
+        if time.monotonic() - self.last_heatmap_save >= settings.heatmap.save_interval_seconds:
+            self.last_heatmap_save = time.monotonic()
+            packet.heatmap = self.heatmap.snapshot()
+        self.people_in_view = len(packet.tracks)
+        self.tracked_objects.set(len(packet.tracks))
+        self.step_seconds["analytics"].observe(time.perf_counter() - tracked)
+        return packet
+
+    def _shelf_stock(self, packet: FramePacket) -> np.ndarray | None:
+        """Product detections inside each product zone, or ``None`` when this frame was not detected."""
+        if not packet.detected or self.zone_index is None or not self.product_zones:
+            return None
+        stock = np.zeros(len(self.zones), dtype=np.float64)
+        if not packet.detections:
+            return stock
+        labels = np.array([label for label, _, _ in packet.detections])
+        boxes = np.array([box for _, _, box in packet.detections], dtype=np.float64)
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        for product_class, columns in self.product_zones.items():
+            stock[columns] = self.zone_index.counts_at(centers[labels == product_class])[columns]
+        return stock
+
+    def _persist(self, packet: FramePacket) -> FramePacket:
+        started = time.perf_counter()
+        now = packet.captured_at
+        for state in packet.new_tracks:
+            self.writer.customer_entered(state.customer_key, state.entry_time, self.args.camera_id)
+
+        for state, cx, cy in packet.positions:
+            self.writer.movement(state.customer_key, now, cx, cy, self.args.camera_id)
+
+        for state, zone_exit in packet.zone_exits:
+            self.writer.product_interaction(state.customer_key, zone_exit.zone.label, zone_exit.dwell_seconds)
+
+        for state in packet.finalized:
+            if state.exit_time is not None:
+                self.writer.customer_exited(
+                    state.customer_key, state.exit_time, (state.exit_time - state.entry_time).total_seconds()
+                )
 
-            if state.db_customer_id is not None:
-                customer = session.get(Customer, state.db_customer_id)
-                if customer is not None:
-                    customer.exit_time = now
-                    customer.total_time_spent = (now - state.entry_time).total_seconds()
+        if packet.heatmap is not None:
+            self._save_heatmap(packet.heatmap, now)
+        self.step_seconds["persist"].observe(time.perf_counter() - started)
+        return packet
+
+    def _save_heatmap(self, grid: np.ndarray, now: datetime) -> None:
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.writer.heatmap(LIVE, self.args.camera_id, day_start, grid, self.heatmap.cell_size)
+
+    def start_outputs(self) -> None:
+        """Start the background DB writer and alert dispatcher, and ``/metrics`` if a port is set."""
+        self.writer.start()
+        self.dispatcher.start()
+        if self.args.metrics_port is not None:
+            profiler = PROFILER if self.args.enable_profiler else None
+            self.metrics_server = MetricsServer(self.args.metrics_port, profiler=profiler)
+            self.metrics_server.start()
+
+    def close_outputs(self) -> None:
+        """Store the final heatmap, then drain alerts into the writer and the writer into the DB."""
+        if self.heatmap.updated_at is not None:
+            self._save_heatmap(self.heatmap.snapshot(), datetime.now(timezone.utc))
+        if self.rule_log is not None:
+            self.rule_log.close()
+            self.rule_log = None
+        self.dispatcher.close()
+        self.writer.close()
+        REGISTRY.remove_collector(f"pipeline:{self.args.camera_id}")
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+            self.metrics_server = None
+
+    def _measure_fps(self) -> float:
+        """Frames per second, smoothed so a single slow frame does not swing the overlay or gauge."""
+        now_perf = time.perf_counter()
+        fps = 1.0 / max(now_perf - self.last_frame_time, 1e-6)
+        self.last_frame_time = now_perf
+        self.fps = fps if self.fps == 0.0 else 0.9 * self.fps + 0.1 * fps
+        self.fps_gauge.set(self.fps)
+        return self.fps
+
+    def _render(self, packet: FramePacket) -> bool:
+        fps = self._measure_fps()
+        frame = annotate_frame(packet.frame, packet.detections, packet.tracks, self.zones, fps)
+        cv2.imshow("Retail Vision Camera", frame)
+        return cv2.waitKey(1) & 0xFF != ord("q")
+
+    def _publish_preview(self, packet: FramePacket) -> None:
+        fps = self._measure_fps()
+        if self.preview is not None and self.preview.wants_frame():
+            self.preview.offer(PreviewFrame(packet.frame_id, packet.frame, packet.detections, packet.tracks, fps))
+
+    def _render_and_report(self, pipeline: Pipeline, packet: FramePacket) -> bool:
+        started = time.perf_counter()
+        keep_going = True
+        if self.args.headless:
+            self._publish_preview(packet)
+        else:
+            keep_going = self._render(packet)
+        self.release_frame(packet)
+        self.step_seconds["render"].observe(time.perf_counter() - started)
+
+        interval = self.args.stats_interval_seconds
+        now_perf = time.perf_counter()
+        if interval > 0 and now_perf - self.last_stats_time >= interval:
+            frames = pipeline.stats["render"].processed
+            fps = (frames - self.last_stats_frames) / (now_perf - self.last_stats_time)
+            self.last_stats_time, self.last_stats_frames = now_perf, frames
+            report = {
+                "camera_id": self.args.camera_id,
+                "frames": frames,
+                "fps": round(fps, 2),
+                "tracks": len(self.track_states),
+                "people": self.people_in_view,
+                "stages": pipeline.snapshot(),
+                "telemetry": self.writer.snapshot(),
+                "trajectories": self.trajectories.snapshot(),
+                "rules": self.rules.snapshot(),
+                "reid": self.reid.snapshot() if self.reid is not None else None,
+                "alerts": self.dispatcher.snapshot(),
+                "cadence": self.cadence.snapshot() if self.cadence is not None else None,
+                "frame_ring": self.frames.snapshot() if self.frames is not None else None,
+                "memory": trajectory_memory_report(
+                    self.args.camera_id, (state.path for state in list(self.track_states.values()))
+                ),
+            }
+            self.report_stats(report)
+            if self.args.occupancy_url:
+                self._publish_occupancy(self.people_in_view)
+        return keep_going
+
+    def _publish_occupancy(self, people_count: int) -> None:
+        """POST the count to the API's occupancy hub off the render thread; a report is skipped
+        while the previous request is still in flight."""
+        if self._occupancy_post is not None and self._occupancy_post.is_alive():
+            return
+        body = {"camera_id": self.args.camera_id, "people_count": people_count}
+        self._occupancy_post = threading.Thread(
+            target=_post_occupancy, args=(self.args.occupancy_url, body), name="occupancy-post", daemon=True
+        )
+        self._occupancy_post.start()
+
+    def build_pipeline(self) -> Pipeline:
+        stages = [
+            Stage("detect", self._detect),
+            Stage("track", self._track),
+            # Persist carries customer lifecycle events, so it never drops packets.
+            Stage("persist", self._persist, drop_policy="block"),
+        ]
+        if self.frames is None:
+            slots = frame_ring_slots(self.args.queue_size, len(stages))
+            self.frames = FrameRing.create(slots, self.args.height, self.args.width)
+        pipeline = Pipeline(
+            source_name="capture",
+            source=self._capture,
+            stages=stages,
+            queue_size=self.args.queue_size,
+            drop_policy=self.args.drop_policy,
+            on_drop=self.release_frame,
+        )
+        REGISTRY.add_collector(f"pipeline:{self.args.camera_id}", lambda: self._collect_pipeline(pipeline))
+        return pipeline
+
+    def _collect_pipeline(self, pipeline: Pipeline) -> None:
+        camera = self.args.camera_id
+        for stage in pipeline.snapshot():
+            name = str(stage["stage"])
+            PIPELINE_PROCESSED.labels(camera, name).set(stage["processed"])
+            PIPELINE_DROPPED.labels(camera, name).set(stage["dropped"])
+            QUEUE_DEPTH.labels(camera, name).set(stage["queue_depth"])
 
     def run(self) -> None:
-        cap = cv2.VideoCapture(self.args.camera_index)
-        if not cap.isOpened():
+        self.cap = cv2.VideoCapture(self.args.video if self.args.video else self.args.camera_index)
+        if not self.cap.isOpened():
+            if self.args.video:
+                raise RuntimeError(f"Unable to open video file {self.args.video}")
             raise RuntimeError("Unable to open camera. Try --camera-index 1")
 
-        last_frame_time = time.perf_counter()
-
+        self.start_outputs()
+        if self.preview is not None:
+            self.preview.start()
+        pipeline = self.pipeline = self.build_pipeline()
+        pipeline.start()
         try:
-            while True:
-                ok, frame = cap.read()
-                if not ok:
-                    break
-
-                frame = cv2.resize(frame, (self.args.width, self.args.height))
-                now = datetime.now(timezone.utc)
-
-                results = self.model.predict(frame, conf=self.args.confidence, verbose=False)
-                result = results[0]
-                names = result.names
-
-                deep_sort_input = []
-                for box in result.boxes:
-                    class_id = int(box.cls.item())
-                    confidence = float(box.conf.item())
-                    label = names[class_id]
-                    if label not in self.target_classes:
-                        continue
-
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().tolist()
-                    cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 190, 255), 2)
-                    cv2.putText(
-                        frame,
-                        f"{label} {confidence:.2f}",
-                        (int(x1), int(y1) - 8),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        0.5,
-                        (0, 190, 255),
-                        2,
-                    )
-
-                    if label == "person":
-                        deep_sort_input.append(([x1, y1, x2 - x1, y2 - y1], confidence, label))
-
-                tracks = self.tracker.update_tracks(deep_sort_input, frame=frame)
-                active_track_ids: set[int] = set()
-
-                with self.session_factory() as session:
-                    for track in tracks:
-                        if not track.is_confirmed():
-                            continue
-
-                        tid = int(track.track_id)
-                        active_track_ids.add(tid)
-                        x1, y1, x2, y2 = track.to_ltrb()
-                        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
-
-                        state = self._upsert_state(session, tid, cx, cy, now)
-
-                        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (50, 220, 50), 2)
-                        cv2.putText(
-                            frame,
-                            f"ID {tid} dwell {state.shelf_dwell_seconds:.1f}s",
-                            (int(x1), int(y2) + 16),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.5,
-                            (50, 220, 50),
-                            2,
-                        )
-
-                    self._finalize_lost_tracks(session, active_track_ids, now)
-                    session.commit()
-
-                if self.args.shelf_zone:
-                    x1, y1, x2, y2 = self.args.shelf_zone
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 100, 100), 2)
-                    cv2.putText(frame, "Shelf zone", (x1, max(20, y1 - 8)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 100, 100), 2)
-
-                now_perf = time.perf_counter()
-                fps = 1.0 / max(now_perf - last_frame_time, 1e-6)
-                last_frame_time = now_perf
-                cv2.putText(frame, f"FPS: {fps:.1f}", (12, 28), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-
-                cv2.imshow("Retail Vision Camera", frame)
-                if cv2.waitKey(1) & 0xFF == ord("q"):
-                    break
+            pipeline.drain("render", lambda packet: self._render_and_report(pipeline, packet))
         finally:
-            cap.release()
-            cv2.destroyAllWindows()
-
-
-def parse_args() -> argparse.Namespace:
+            try:
+                pipeline.stop()
+            finally:
+                self.cap.release()
+                if self.preview is not None:
+                    self.preview.close()
+                if not self.args.headless:
+                    cv2.destroyAllWindows()
+                self.close_outputs()
+                self.close_frames()
+
+    def stop(self) -> None:
+        """Make a running :meth:`run` return from another thread."""
+        if self.pipeline is not None:
+            self.pipeline.request_stop()
+
+
+def _post_occupancy(url: str, body: dict[str, Any]) -> None:
+    # Only trackers that publish occupancy import requests.
+    import requests
+
+    try:
+        requests.post(url, json=body, timeout=2.0).raise_for_status()
+    except requests.RequestException as exc:
+        logger.warning("Publishing occupancy to %s failed: %s", url, exc)
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run YOLOv8 + DeepSORT on laptop camera")
     parser.add_argument("--model", default=settings.detection.model_path, help="YOLO model path")
+    parser.add_argument(
+        "--backend",
+        choices=["auto", "onnx", "ultralytics"],
+        default=settings.detection.backend,
+        help="Detector runtime; auto prefers ONNX Runtime when --onnx-model exists.",
+    )
+    parser.add_argument("--onnx-model", default=settings.detection.onnx_model_path, help="Exported ONNX model path.")
     parser.add_argument("--camera-index", type=int, default=0)
+    parser.add_argument("--video", default=None, help="Read frames from this video file instead of a camera.")
     parser.add_argument("--width", type=int, default=settings.detection.frame_width)
     parser.add_argument("--height", type=int, default=settings.detection.frame_height)
     parser.add_argument("--confidence", type=float, default=settings.detection.confidence_threshold)
-    parser.add_argument("--lost-timeout-seconds", type=float, default=2.0)
+    parser.add_argument("--lost-timeout-seconds", type=float, default=settings.tracking.lost_timeout_seconds)
     parser.add_argument(
         "--product-classes",
         type=lambda s: [x.strip() for x in s.split(",") if x.strip()],
         default=[],
-        help="Comma-separated custom product labels to render (for fine-tuned models).",
+        help="Comma-separated product labels to detect on top of DetectionConfig's target and custom product classes.",
     )
     parser.add_argument(
         "--shelf-zone",
@@ -211,14 +592,116 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Optional shelf rectangle x1,y1,x2,y2 used for dwell-time accumulation.",
     )
+    parser.add_argument(
+        "--zones-file",
+        default=None,
+        help="JSON file of named shelf/aisle polygons per camera; dwell per zone is stored as product interactions.",
+    )
+    parser.add_argument("--camera-id", default=None, help="Camera id used in the zones file (defaults to --camera-index).")
+    parser.add_argument(
+        "--rules-file",
+        default=settings.alerts.rules_path,
+        help="JSON alert rule overrides ({\"defaults\": [...], \"cameras\": {id: [...]}}) on top of the built-in rules.",
+    )
+    parser.add_argument(
+        "--record-rule-inputs",
+        default=None,
+        help="Append each frame's rule engine input as a JSON line, for replaying with scripts.bench_rules.",
+    )
+    parser.add_argument(
+        "--reid",
+        action="store_true",
+        default=settings.reid.enabled,
+        help="Re-identify new tracks by appearance so occluded or cross-camera shoppers keep one customer.",
+    )
+    parser.add_argument(
+        "--reid-threshold",
+        type=float,
+        default=settings.reid.similarity_threshold,
+        help="Cosine similarity (0-1) a new track needs to a recent customer's embedding to be matched.",
+    )
+    parser.add_argument(
+        "--telemetry-url",
+        default=settings.postgres_url,
+        help="Database for customer/movement telemetry; a sqlite:/// URL creates a local file for testing.",
+    )
+    parser.add_argument("--queue-size", type=int, default=settings.pipeline.queue_size)
+    parser.add_argument(
+        "--drop-policy",
+        choices=["drop_oldest", "block"],
+        default=settings.pipeline.drop_policy,
+        help="What a full stage queue does with new frames: discard the oldest one or block the producer.",
+    )
+    parser.add_argument(
+        "--adaptive-cadence",
+        action="store_true",
+        default=settings.cadence.enabled,
+        help="Run YOLO only every --detect-every frames or on motion; other frames advance the tracker only.",
+    )
+    parser.add_argument("--detect-every", type=int, default=settings.cadence.max_interval)
+    parser.add_argument("--min-detect-interval", type=int, default=settings.cadence.min_interval)
+    parser.add_argument(
+        "--motion-threshold",
+        type=float,
+        default=settings.cadence.motion_threshold,
+        help="Mean absolute frame difference (0-1) that triggers an early detection.",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Skip on-screen annotation and cv2.imshow; use --preview-dir/--preview-port for an optional preview.",
+    )
+    parser.add_argument("--preview-fps", type=float, default=settings.preview.fps, help="Headless preview render rate.")
+    parser.add_argument("--preview-dir", default=None, help="Write the latest annotated preview to DIR/latest.jpg.")
+    parser.add_argument(
+        "--preview-port",
+        type=int,
+        default=None,
+        help="Serve the annotated preview as MJPEG on /stream.mjpg and on demand on /snapshot.jpg.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve Prometheus metrics (per-step timings, queue depths, tracks, FPS, DB flushes) on /metrics.",
+    )
+    parser.add_argument(
+        "--enable-profiler",
+        action="store_true",
+        default=settings.metrics.profiler_enabled,
+        help="Also serve /debug/profile?seconds=N on --metrics-port, a folded-stack sample of every thread.",
+    )
+    parser.add_argument(
+        "--stats-interval-seconds",
+        type=float,
+        default=0.0,
+        help="Print per-stage queue depth and latency counters as JSON at this interval (0 disables).",
+    )
+    parser.add_argument(
+        "--occupancy-url",
+        default=settings.realtime.publish_url,
+        help="API /occupancy endpoint to POST this camera's people count to with each stats report.",
+    )
+    return parser
+
 
-    args = parser.parse_args()
+def validate_args(args: argparse.Namespace) -> argparse.Namespace:
     if not (0.4 <= args.confidence <= 0.6):
         raise ValueError("Set --confidence in the recommended range 0.4 to 0.6")
     if args.shelf_zone is not None and len(args.shelf_zone) != 4:
         raise ValueError("--shelf-zone must be x1,y1,x2,y2")
+    if args.camera_id is None:
+        args.camera_id = str(args.camera_index)
+    if not (1 <= args.min_detect_interval <= args.detect_every):
+        raise ValueError("Set 1 <= --min-detect-interval <= --detect-every")
+    if args.occupancy_url and args.stats_interval_seconds <= 0:
+        raise ValueError("--occupancy-url publishes with each stats report; set --stats-interval-seconds")
     return args
 
 
+def parse_args() -> argparse.Namespace:
+    return validate_args(build_parser().parse_args())
+
+
 if __name__ == "__main__":
     CameraTrackerApp(parse_args()).run()
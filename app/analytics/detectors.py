@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import ast
+import logging
+import pathlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+import cv2
+import numpy as np
+
+from app.config import DetectionConfig, settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DetectionBoxes:
+    """``(N, 6)`` float32 ``[x1, y1, x2, y2, conf, cls]`` rows, like ultralytics' ``Boxes.data``."""
+
+    data: np.ndarray
+
+
+@dataclass
+class DetectionResult:
+    boxes: DetectionBoxes
+    names: dict[int, str]
+
+
+class Detector(Protocol):
+    """What the trackers and ``BatchedInferenceService`` need from a detector: ultralytics'
+    ``predict`` call shape, returning one result with ``boxes.data`` and ``names`` per frame."""
+
+    names: dict[int, str]
+
+    def predict(self, source: Any, conf: float = ..., verbose: bool = ...) -> list[Any]: ...
+
+
+class UltralyticsDetector:
+    """The full ultralytics ``YOLO`` wrapper (PyTorch weights, or any format it can load),
+    pinned to the configured frame size so it does not re-letterbox per frame."""
+
+    def __init__(self, model_path: str, imgsz: tuple[int, int]) -> None:
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+        self.imgsz = list(imgsz)
+
+    def predict(self, source: Any, conf: float = 0.25, verbose: bool = False, **kwargs: Any) -> list[Any]:
+        return self.model.predict(source, conf=conf, verbose=verbose, imgsz=self.imgsz, **kwargs)
+
+
+class OnnxDetector:
+    """YOLOv8 exported to ONNX, run directly through ONNX Runtime.
+
+    Skips the ultralytics wrapper: frames are written into a preallocated NCHW float32 buffer
+    (resized into a reusable buffer only when they do not already match the model's fixed input
+    size), and the raw ``(1, 4 + classes, anchors)`` output is decoded and NMS-filtered with
+    NumPy and OpenCV. Thread counts and execution providers come from ``DetectionConfig``.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        imgsz: tuple[int, int],
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 1,
+        providers: list[str] | None = None,
+        iou_threshold: float = 0.45,
+    ) -> None:
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        available = set(ort.get_available_providers())
+        chosen = [p for p in (providers or ["CPUExecutionProvider"]) if p in available] or ["CPUExecutionProvider"]
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=chosen)
+        self.iou_threshold = iou_threshold
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, width = model_input.shape
+        # Dynamic axes come back as names; fall back to the configured frame size.
+        self.input_height = height if isinstance(height, int) else imgsz[0]
+        self.input_width = width if isinstance(width, int) else imgsz[1]
+        self.fixed_batch = batch if isinstance(batch, int) else None
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names: dict[int, str] = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+        self._inputs: dict[int, np.ndarray] = {}
+        self._resized = np.empty((self.input_height, self.input_width, 3), dtype=np.uint8)
+
+    def predict(self, source: Any, conf: float = 0.25, verbose: bool = False, **_: Any) -> list[DetectionResult]:
+        frames = source if isinstance(source, list) else [source]
+        step = self.fixed_batch or len(frames)
+        results: list[DetectionResult] = []
+        for start in range(0, len(frames), step):
+            chunk = frames[start : start + step]
+            batch = self._fill(chunk, step)
+            (output,) = self.session.run(None, {self.input_name: batch})
+            for frame, prediction in zip(chunk, output):
+                results.append(DetectionResult(DetectionBoxes(self._decode(prediction, frame.shape, conf)), self.names))
+        return results
+
+    def _fill(self, frames: list[np.ndarray], size: int) -> np.ndarray:
+        batch = self._inputs.get(size)
+        if batch is None:
+            batch = self._inputs[size] = np.zeros((size, 3, self.input_height, self.input_width), dtype=np.float32)
+        scale = np.float32(1.0 / 255.0)
+        for slot, frame in zip(batch, frames):
+            if frame.shape[:2] != (self.input_height, self.input_width):
+                frame = cv2.resize(frame, (self.input_width, self.input_height), dst=self._resized)
+            # BGR HWC uint8 -> RGB CHW float32 in [0, 1], written straight into the batch slot.
+            np.multiply(frame[:, :, ::-1].transpose(2, 0, 1), scale, out=slot)
+        return batch
+
+    def _decode(self, prediction: np.ndarray, frame_shape: tuple[int, ...], conf: float) -> np.ndarray:
+        candidates = prediction.T
+        class_scores = candidates[:, 4:]
+        class_id = class_scores.argmax(axis=1)
+        confidence = class_scores[np.arange(class_scores.shape[0]), class_id]
+        keep = confidence >= conf
+        if not keep.any():
+            return np.empty((0, 6), dtype=np.float32)
+
+        cxcywh, confidence, class_id = candidates[keep, :4], confidence[keep], class_id[keep]
+        ltwh = cxcywh.copy()
+        ltwh[:, :2] -= ltwh[:, 2:] / 2
+        indices = cv2.dnn.NMSBoxesBatched(ltwh, confidence, class_id, conf, self.iou_threshold)
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+
+        data = np.empty((indices.shape[0], 6), dtype=np.float32)
+        data[:, :2] = ltwh[indices, :2]
+        data[:, 2:4] = ltwh[indices, :2] + ltwh[indices, 2:]
+        data[:, 4] = confidence[indices]
+        data[:, 5] = class_id[indices]
+        height, width = frame_shape[:2]
+        if (height, width) != (self.input_height, self.input_width):
+            data[:, [0, 2]] *= width / self.input_width
+            data[:, [1, 3]] *= height / self.input_height
+        return data
+
+
+def warm_up(detector: Any, imgsz: tuple[int, int], runs: int = settings.detection.warmup_runs) -> None:
+    """Run a few blank frames so the first real frame does not pay for lazy initialization."""
+    blank = np.zeros((imgsz[0], imgsz[1], 3), dtype=np.uint8)
+    for _ in range(runs):
+        detector.predict(blank, conf=0.99, verbose=False)
+
+
+class LockedDetector:
+    """Serializes ``predict`` so trackers on several threads can share one loaded model."""
+
+    def __init__(self, detector: Detector) -> None:
+        self.detector = detector
+        self.names = detector.names
+        self._lock = threading.Lock()
+
+    def predict(self, *args: Any, **kwargs: Any) -> list[Any]:
+        with self._lock:
+            return self.detector.predict(*args, **kwargs)
+
+
+_SHARED: dict[tuple[Any, ...], LockedDetector] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def load_detector(
+    backend: str | None = None,
+    model_path: str | None = None,
+    onnx_model_path: str | None = None,
+    imgsz: tuple[int, int] | None = None,
+    config: DetectionConfig = settings.detection,
+) -> Detector:
+    """Build the configured detector backend and warm it up.
+
+    ``onnx`` requires ``onnxruntime`` and an exported model. ``auto`` uses ONNX Runtime when
+    both are available and otherwise falls back to the ultralytics wrapper on ``model_path``.
+    """
+    backend = backend or config.backend
+    model_path = model_path or config.model_path
+    onnx_model_path = onnx_model_path or config.onnx_model_path or (model_path if model_path.endswith(".onnx") else "")
+    imgsz = imgsz or (config.frame_height, config.frame_width)
+    if backend not in ("auto", "onnx", "ultralytics"):
+        raise ValueError(f"Unknown detector backend: {backend}")
+
+    detector: Any = None
+    if backend in ("auto", "onnx"):
+        try:
+            if not onnx_model_path or not pathlib.Path(onnx_model_path).is_file():
+                raise FileNotFoundError(f"ONNX model not found: {onnx_model_path or '(onnx_model_path not set)'}")
+            detector = OnnxDetector(
+                onnx_model_path,
+                imgsz,
+                intra_op_threads=config.onnx_intra_op_threads,
+                inter_op_threads=config.onnx_inter_op_threads,
+                providers=config.onnx_providers,
+                iou_threshold=config.iou_threshold,
+            )
+        except (ImportError, FileNotFoundError) as exc:
+            if backend == "onnx":
+                raise RuntimeError(f"ONNX backend unavailable: {exc}. Install onnxruntime and export the model.") from exc
+            logger.info("Falling back to the ultralytics detector (%s)", exc)
+
+    if detector is None:
+        detector = UltralyticsDetector(model_path, imgsz)
+    warm_up(detector, imgsz, config.warmup_runs)
+    return detector
+
+
+def shared_detector(
+    backend: str | None = None,
+    model_path: str | None = None,
+    onnx_model_path: str | None = None,
+    imgsz: tuple[int, int] | None = None,
+    config: DetectionConfig = settings.detection,
+) -> LockedDetector:
+    """:func:`load_detector`, but loaded once per process for each distinct set of arguments.
+
+    Callers get the same :class:`LockedDetector`, so restarting a tracker or creating another
+    ``VisionEngine`` in the process reuses the loaded and warmed-up model.
+    """
+    key = (
+        backend or config.backend,
+        model_path or config.model_path,
+        onnx_model_path or config.onnx_model_path,
+        imgsz or (config.frame_height, config.frame_width),
+        id(config),
+    )
+    with _SHARED_LOCK:
+        detector = _SHARED.get(key)
+        if detector is None:
+            detector = _SHARED[key] = LockedDetector(load_detector(backend, model_path, onnx_model_path, imgsz, config))
+        return detector
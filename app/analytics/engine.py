@@ -3,39 +3,58 @@ from __future__ import annotations
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import cv2
 import numpy as np
 
+from app.analytics.cadence import DetectionCadence, predict_tracks
+from app.analytics.detectors import shared_detector
+from app.analytics.postprocess import ClassFilter, target_classes_from_config
+from app.analytics.trajectory import TrajectoryBuffer, trajectory_memory_report
 from app.config import settings
 
+if TYPE_CHECKING:
+    from app.analytics.inference import BatchedInferenceService
+
 
 @dataclass
 class TrackedCustomer:
     customer_id: int
     entry_time: datetime
     latest_seen: datetime
-    path: list[tuple[float, float]] = field(default_factory=list)
+    path: TrajectoryBuffer = field(default_factory=TrajectoryBuffer)
 
     @property
     def dwell_duration(self) -> float:
         return (self.latest_seen - self.entry_time).total_seconds()
 
 
+def result_to_detections(result: Any, class_filter: ClassFilter | None = None) -> list[dict[str, Any]]:
+    # ``predict`` has already applied the confidence threshold, so only the class filter remains.
+    if class_filter is None:
+        class_filter = ClassFilter(result.names, target_classes_from_config(settings.detection))
+    return class_filter.apply(result).to_dicts()
+
+
 class VisionEngine:
-    """YOLOv8 + DeepSORT pipeline scaffold for retail analytics."""
+    """YOLOv8 + DeepSORT pipeline scaffold for retail analytics.
 
-    def __init__(self) -> None:
-        self.model = self._load_detector(settings.detection.model_path)
+    Pass a shared ``BatchedInferenceService`` to run detection for many cameras through one
+    model; each engine keeps its own tracker for its ``camera_id``.
+    """
+
+    def __init__(self, inference: BatchedInferenceService | None = None, camera_id: str = "default") -> None:
+        self.inference = inference
+        self.camera_id = camera_id
+        self.model = inference.model if inference is not None else shared_detector()
         self.tracker = self._load_tracker()
         self.customers: dict[int, TrackedCustomer] = {}
         self.shelf_presence_seconds: dict[str, float] = defaultdict(float)
-
-    def _load_detector(self, model_path: str) -> Any:
-        from ultralytics import YOLO
-
-        return YOLO(model_path)
+        self.class_filter: ClassFilter | None = None
+        self.lost_timeout_seconds = settings.tracking.lost_timeout_seconds
+        self.evicted: list[TrackedCustomer] = []
+        self.cadence = DetectionCadence() if settings.cadence.enabled else None
 
     def _load_tracker(self) -> Any:
         try:
@@ -49,45 +68,47 @@ class VisionEngine:
         return cv2.resize(frame, (settings.detection.frame_width, settings.detection.frame_height))
 
     def detect(self, frame: np.ndarray) -> list[dict[str, Any]]:
+        if self.inference is not None:
+            return self.inference.detect(self.camera_id, frame)
+
         results = self.model.predict(
             frame,
             conf=settings.detection.confidence_threshold,
             verbose=False,
         )
-
-        detections: list[dict[str, Any]] = []
         result = results[0]
-        names = result.names
-        for box in result.boxes:
-            class_id = int(box.cls.item())
-            confidence = float(box.conf.item())
-            label = names[class_id]
-            if confidence < settings.detection.confidence_threshold:
-                continue
-            detections.append(
-                {
-                    "bbox": box.xyxy[0].cpu().numpy().tolist(),
-                    "confidence": confidence,
-                    "label": label,
-                }
-            )
-        return detections
-
-    def track(self, detections: list[dict[str, Any]]) -> list[TrackedCustomer]:
+        if self.class_filter is None:
+            self.class_filter = ClassFilter(result.names, target_classes_from_config(settings.detection))
+        return result_to_detections(result, self.class_filter)
+
+    def process(self, frame: np.ndarray) -> list[TrackedCustomer]:
+        """Detect and track one preprocessed frame, skipping detection when the cadence allows it."""
+        if self.cadence is not None and not self.cadence.should_detect(frame):
+            return self.track(None)
+        return self.track(self.detect(frame))
+
+    def track(self, detections: list[dict[str, Any]] | None) -> list[TrackedCustomer]:
+        """Update tracks from ``detections``; ``None`` marks a frame the detector skipped."""
         now = datetime.now(timezone.utc)
         if not self.tracker:
             return list(self.customers.values())
 
-        ds_input = []
-        for d in detections:
-            x1, y1, x2, y2 = d["bbox"]
-            ds_input.append(([x1, y1, x2 - x1, y2 - y1], d["confidence"], d["label"]))
-
-        tracks = self.tracker.update_tracks(ds_input, frame=None)
+        ds_input: list[tuple[list[float], float, str]] = []
+        if detections:
+            ltwh = np.asarray([d["bbox"] for d in detections], dtype=np.float32)
+            ltwh[:, 2:] -= ltwh[:, :2]
+            ds_input = list(zip(ltwh.tolist(), [d["confidence"] for d in detections], [d["label"] for d in detections]))
+
+        if detections is None:
+            tracks = predict_tracks(self.tracker)
+        else:
+            tracks = self.tracker.update_tracks(ds_input, frame=None)
+        active_track_ids: set[int] = set()
         for track in tracks:
             if not track.is_confirmed():
                 continue
             track_id = int(track.track_id)
+            active_track_ids.add(track_id)
             x1, y1, x2, y2 = track.to_ltrb()
             cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
 
@@ -97,6 +118,19 @@ class VisionEngine:
                 self.customers[track_id] = customer
 
             customer.latest_seen = now
-            customer.path.append((cx, cy))
+            customer.path.append(cx, cy, now.timestamp())
 
+        self.evicted = self.evict_lost_tracks(active_track_ids, now)
         return list(self.customers.values())
+
+    def evict_lost_tracks(self, active_track_ids: set[int], now: datetime) -> list[TrackedCustomer]:
+        """Drop customers unseen for ``lost_timeout_seconds``, mirroring ``CameraTrackerApp._finalize_lost_tracks``."""
+        lost = [
+            track_id
+            for track_id, customer in self.customers.items()
+            if track_id not in active_track_ids and (now - customer.latest_seen).total_seconds() > self.lost_timeout_seconds
+        ]
+        return [self.customers.pop(track_id) for track_id in lost]
+
+    def memory_report(self) -> dict[str, Any]:
+        return trajectory_memory_report(self.camera_id, (customer.path for customer in self.customers.values()))
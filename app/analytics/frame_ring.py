@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any
+
+import cv2
+import numpy as np
+
+_FREE = 0
+_BUSY = 1
+# Per-slot header words (state, sequence) followed by the ring-wide counters (written, overruns).
+_WRITTEN = 0
+_OVERRUNS = 1
+_HEADER_ALIGN = 64
+
+
+@dataclass(frozen=True)
+class FrameRingSpec:
+    """Everything another process needs to :meth:`FrameRing.attach` to a ring; cheap to pickle."""
+
+    name: str
+    slots: int
+    height: int
+    width: int
+    channels: int = 3
+
+
+@dataclass(frozen=True)
+class FrameRef:
+    """What travels between processes instead of pixels: a slot index plus frame metadata."""
+
+    slot: int
+    sequence: int
+    frame_id: int
+    captured_at: float
+    camera_id: str = ""
+
+
+def _header_bytes(slots: int) -> int:
+    return -(-(2 * slots + 2) * 8 // _HEADER_ALIGN) * _HEADER_ALIGN
+
+
+def frame_ring_slots(queue_size: int, stages: int) -> int:
+    """Enough slots for every frame a pipeline can hold: each queue full plus one in each worker."""
+    return (stages + 1) * max(1, queue_size) + stages + 2
+
+
+class FrameRing:
+    """Fixed pool of preallocated frame slots in ``multiprocessing.shared_memory``.
+
+    One producer (a camera's capture loop) acquires a free slot, resizes or copies the frame
+    straight into it and hands consumers a :class:`FrameRef`; consumers read the slot as a
+    NumPy view and :meth:`release` it when done. Nothing is allocated or pickled per frame.
+    When every slot is still held the frame is counted as an overrun and :meth:`write` returns
+    ``None`` so the producer can drop it or fall back to a private copy.
+
+    Slot ownership is handed over by the message carrying the ``FrameRef``; the shared slot
+    states only record releases, and each header word has a single writer (the producer marks
+    slots busy and bumps the counters, the holder of a slot frees it), so no lock is needed.
+    """
+
+    def __init__(self, spec: FrameRingSpec, memory: shared_memory.SharedMemory, owner: bool) -> None:
+        self.spec = spec
+        self.memory = memory
+        self.owner = owner
+        header = np.ndarray((2 * spec.slots + 2,), dtype=np.int64, buffer=memory.buf)
+        self._states = header[: spec.slots]
+        self._sequences = header[spec.slots : 2 * spec.slots]
+        self._counters = header[2 * spec.slots :]
+        self._frames = np.ndarray(
+            (spec.slots, spec.height, spec.width, spec.channels), dtype=np.uint8, buffer=memory.buf, offset=_header_bytes(spec.slots)
+        )
+        self._cursor = 0
+
+    @classmethod
+    def create(cls, slots: int, height: int, width: int, channels: int = 3, name: str | None = None) -> FrameRing:
+        if slots < 1:
+            raise ValueError("A frame ring needs at least one slot")
+        memory = shared_memory.SharedMemory(name=name, create=True, size=_header_bytes(slots) + slots * height * width * channels)
+        ring = cls(FrameRingSpec(memory.name, slots, height, width, channels), memory, owner=True)
+        ring._states[:] = _FREE
+        ring._sequences[:] = 0
+        ring._counters[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, spec: FrameRingSpec) -> FrameRing:
+        return cls(spec, shared_memory.SharedMemory(name=spec.name), owner=False)
+
+    def acquire(self) -> int | None:
+        """Claim a free slot for writing (producer side), or count an overrun and return ``None``."""
+        slots = self.spec.slots
+        for offset in range(slots):
+            slot = (self._cursor + offset) % slots
+            if self._states[slot] == _FREE:
+                self._states[slot] = _BUSY
+                self._cursor = (slot + 1) % slots
+                return slot
+        self._counters[_OVERRUNS] += 1
+        return None
+
+    def publish(self, slot: int, frame_id: int, captured_at: float, camera_id: str = "") -> FrameRef:
+        self._counters[_WRITTEN] += 1
+        sequence = int(self._counters[_WRITTEN])
+        self._sequences[slot] = sequence
+        return FrameRef(slot, sequence, frame_id, captured_at, camera_id)
+
+    def write(self, frame: np.ndarray, frame_id: int, captured_at: float, camera_id: str = "") -> FrameRef | None:
+        """Resize (or copy, if already the slot size) ``frame`` into a free slot and publish it."""
+        slot = self.acquire()
+        if slot is None:
+            return None
+        target = self._frames[slot]
+        if frame.shape == target.shape:
+            np.copyto(target, frame)
+        else:
+            cv2.resize(frame, (self.spec.width, self.spec.height), dst=target)
+        return self.publish(slot, frame_id, captured_at, camera_id)
+
+    def slot_view(self, slot: int) -> np.ndarray:
+        """Writable view of a slot, e.g. to decode or render into it between acquire and publish."""
+        return self._frames[slot]
+
+    def frame(self, ref: FrameRef) -> np.ndarray:
+        """Zero-copy view of a published frame; valid until ``ref`` is released."""
+        if self._sequences[ref.slot] != ref.sequence:
+            raise LookupError(f"Frame ring slot {ref.slot} no longer holds frame sequence {ref.sequence}")
+        return self._frames[ref.slot]
+
+    def release(self, ref: FrameRef | int) -> None:
+        slot = ref.slot if isinstance(ref, FrameRef) else ref
+        self._states[slot] = _FREE
+
+    def in_use(self) -> int:
+        return int(np.count_nonzero(self._states))
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "slots": self.spec.slots,
+            "in_use": self.in_use(),
+            "written": int(self._counters[_WRITTEN]),
+            "overruns": int(self._counters[_OVERRUNS]),
+        }
+
+    def close(self) -> None:
+        """Detach from the shared memory; the creating process also removes it."""
+        # Views into the buffer must be gone before SharedMemory.close() can unmap it.
+        del self._states, self._sequences, self._counters, self._frames
+        try:
+            self.memory.close()
+        except BufferError:
+            pass  # packets still hold frame views; the mapping goes away with the last of them
+        if self.owner:
+            self.memory.unlink()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import math
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+
+import numpy as np
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.heatmaps import DAILY, upsert_heatmaps
+from app.db.models import Movement
+
+
+class OccupancyHeatmap:
+    """Per-camera occupancy as a 2D histogram of ``cell_size``-pixel cells that decays over time.
+
+    Every :meth:`add` first scales the grid by ``0.5 ** (elapsed / half_life_seconds)``, so a
+    cell's value is a recency-weighted count of track positions and old traffic fades out
+    without keeping any history. ``half_life_seconds <= 0`` disables decay (plain counts, as
+    used for the daily batch rebuild).
+    """
+
+    def __init__(
+        self,
+        width: int = settings.detection.frame_width,
+        height: int = settings.detection.frame_height,
+        cell_size: int = settings.heatmap.cell_size,
+        half_life_seconds: float = settings.heatmap.half_life_seconds,
+    ) -> None:
+        self.cell_size = max(1, cell_size)
+        self.rows = math.ceil(height / self.cell_size)
+        self.cols = math.ceil(width / self.cell_size)
+        self.half_life_seconds = half_life_seconds
+        self.grid = np.zeros((self.rows, self.cols), dtype=np.float32)
+        self.updated_at: float | None = None
+
+    def decay_to(self, t: float) -> None:
+        if self.updated_at is not None and self.half_life_seconds > 0 and t > self.updated_at:
+            self.grid *= np.float32(0.5 ** ((t - self.updated_at) / self.half_life_seconds))
+        self.updated_at = t if self.updated_at is None else max(self.updated_at, t)
+
+    def add(self, xy: np.ndarray, t: float | None = None) -> None:
+        """Count ``(N, 2)`` pixel positions, decaying the grid to ``t`` first."""
+        if t is not None:
+            self.decay_to(t)
+        if len(xy) == 0:
+            return
+        cells = np.asarray(xy, dtype=np.float32) // self.cell_size
+        cols = np.clip(cells[:, 0], 0, self.cols - 1).astype(np.intp)
+        rows = np.clip(cells[:, 1], 0, self.rows - 1).astype(np.intp)
+        counts = np.bincount(rows * self.cols + cols, minlength=self.grid.size)
+        self.grid += counts.reshape(self.grid.shape).astype(np.float32, copy=False)
+
+    def snapshot(self, t: float | None = None) -> np.ndarray:
+        """A copy of the grid, decayed to ``t`` if given."""
+        if t is not None:
+            self.decay_to(t)
+        return self.grid.copy()
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def rebuild_daily_heatmaps(
+    engine: Engine,
+    start: date,
+    end: date,
+    chunk_rows: int = settings.heatmap.batch_chunk_rows,
+    width: int = settings.detection.frame_width,
+    height: int = settings.detection.frame_height,
+    cell_size: int = settings.heatmap.cell_size,
+) -> dict[str, Any]:
+    """Recompute per-camera daily heatmaps for ``start <= day <= end`` from ``movements``.
+
+    Each day is one range query (a single partition on PostgreSQL) streamed in ``chunk_rows``
+    batches; every chunk is binned with one ``bincount`` per camera, so memory stays at one
+    chunk plus one grid per camera. Results replace the stored ``daily`` rows, so re-running
+    a day is idempotent.
+    """
+    days = 0
+    rows_read = 0
+    written = 0
+    day = start
+    while day <= end:
+        window_start = _day_start(day)
+        window_end = window_start + timedelta(days=1)
+        grids: dict[str, OccupancyHeatmap] = {}
+        query = (
+            select(Movement.camera_id, Movement.x_coordinate, Movement.y_coordinate)
+            .where(Movement.timestamp >= window_start, Movement.timestamp < window_end)
+            .execution_options(yield_per=chunk_rows)
+        )
+        with Session(engine) as session:
+            for chunk in session.execute(query).partitions():
+                rows_read += len(chunk)
+                camera_column, x_column, y_column = zip(*chunk)
+                xy = np.column_stack([np.array(x_column, dtype=np.float32), np.array(y_column, dtype=np.float32)])
+                labels, codes = np.unique(np.array([c or "" for c in camera_column], dtype=object), return_inverse=True)
+                for index, camera_id in enumerate(labels):
+                    heatmap = grids.get(camera_id)
+                    if heatmap is None:
+                        heatmap = grids[camera_id] = OccupancyHeatmap(width, height, cell_size, half_life_seconds=0)
+                    heatmap.add(xy[codes == index])
+            upsert_heatmaps(
+                session,
+                [
+                    (DAILY, camera_id, window_start, heatmap.grid, heatmap.cell_size)
+                    for camera_id, heatmap in grids.items()
+                ],
+            )
+            session.commit()
+        written += len(grids)
+        days += 1
+        day += timedelta(days=1)
+    return {"days": days, "rows": rows_read, "heatmaps": written}
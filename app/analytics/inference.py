@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import bisect
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from app.analytics.detectors import DetectionBoxes, DetectionResult, load_detector
+from app.analytics.engine import result_to_detections
+from app.analytics.postprocess import ClassFilter, target_classes_from_config
+from app.config import settings
+
+LATENCY_BUCKETS_MS = (1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0, 1000.0)
+
+
+@dataclass
+class LatencyHistogram:
+    buckets_ms: tuple[float, ...] = LATENCY_BUCKETS_MS
+    counts: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    total: int = 0
+    sum_ms: float = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets_ms, value_ms)] += 1
+        self.total += 1
+        self.sum_ms += value_ms
+
+    def as_dict(self) -> dict[str, Any]:
+        labels = [f"le_{b:g}" for b in self.buckets_ms] + ["le_inf"]
+        return {
+            "count": self.total,
+            "avg_ms": round(self.sum_ms / self.total, 3) if self.total else 0.0,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+@dataclass
+class _InferenceRequest:
+    camera_id: str
+    frame: np.ndarray
+    submitted_at: float
+    future: Future = field(default_factory=Future)
+
+
+class BatchedInferenceService:
+    """Shares one detector across cameras by grouping their frames into micro-batches.
+
+    Frames submitted from any camera are collected until ``max_batch_size`` frames are waiting
+    or the oldest has waited ``max_wait_ms``, then run through a single batched ``predict``.
+    Each caller gets its own detections back through a future, so per-camera trackers stay
+    with the camera that submitted the frame.
+    """
+
+    def __init__(
+        self,
+        model: Any | None = None,
+        max_batch_size: int = settings.inference.max_batch_size,
+        max_wait_ms: float = settings.inference.max_wait_ms,
+        confidence_threshold: float = settings.detection.confidence_threshold,
+    ) -> None:
+        self.model = model if model is not None else load_detector()
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.confidence_threshold = confidence_threshold
+        self.class_filter: ClassFilter | None = None
+
+        self.batch_sizes: dict[int, int] = defaultdict(int)
+        self.camera_latency: dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self._requests: queue.Queue[_InferenceRequest] = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="batched-inference", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def submit(self, camera_id: str, frame: np.ndarray) -> Future:
+        if self._thread is None:
+            raise RuntimeError("BatchedInferenceService.start() must be called before submit()")
+        request = _InferenceRequest(camera_id=camera_id, frame=frame, submitted_at=time.perf_counter())
+        self._requests.put(request)
+        return request.future
+
+    def detect(self, camera_id: str, frame: np.ndarray) -> list[dict[str, Any]]:
+        result = self.submit(camera_id, frame).result()
+        if self.class_filter is None:
+            self.class_filter = ClassFilter(result.names, target_classes_from_config(settings.detection))
+        return result_to_detections(result, self.class_filter)
+
+    def client(self, camera_id: str) -> InferenceClient:
+        return InferenceClient(self, camera_id)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+                "cameras": {camera_id: hist.as_dict() for camera_id, hist in self.camera_latency.items()},
+            }
+
+    def _collect_batch(self) -> list[_InferenceRequest]:
+        try:
+            first = self._requests.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = first.submitted_at + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._predict(batch)
+
+        while True:
+            try:
+                self._requests.get_nowait().future.cancel()
+            except queue.Empty:
+                break
+
+    def _predict(self, batch: list[_InferenceRequest]) -> None:
+        try:
+            results = self.model.predict([r.frame for r in batch], conf=self.confidence_threshold, verbose=False)
+        except Exception as exc:
+            for request in batch:
+                request.future.set_exception(exc)
+            return
+
+        finished = time.perf_counter()
+        with self._stats_lock:
+            self.batch_sizes[len(batch)] += 1
+            for request in batch:
+                self.camera_latency[request.camera_id].observe(1000.0 * (finished - request.submitted_at))
+
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+
+
+class InferenceClient:
+    """One camera's handle on a :class:`BatchedInferenceService`, shaped like a detector.
+
+    ``predict`` submits the frame into the shared micro-batches and waits for its own result, so
+    a ``CameraTrackerApp`` can take a client as its ``model``. The batch runs at the service's
+    ``confidence_threshold``; a higher ``conf`` is applied here, a lower one cannot be.
+    """
+
+    def __init__(self, service: BatchedInferenceService, camera_id: str) -> None:
+        self.service = service
+        self.camera_id = camera_id
+        self.names = service.model.names
+
+    def predict(self, source: np.ndarray, conf: float = 0.0, verbose: bool = False, **_: Any) -> list[Any]:
+        result = self.service.submit(self.camera_id, source).result()
+        if conf <= self.service.confidence_threshold:
+            return [result]
+        data = result.boxes.data
+        if hasattr(data, "cpu"):
+            data = data.cpu().numpy()
+        data = np.asarray(data, dtype=np.float32).reshape(-1, 6)
+        return [DetectionResult(DetectionBoxes(data[data[:, 4] >= conf]), result.names)]
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Literal
+
+DropPolicy = Literal["drop_oldest", "block"]
+
+_END_OF_STREAM = object()
+_POLL_SECONDS = 0.1
+_LATENCY_SAMPLES = 10_000
+
+
+@dataclass
+class StageStats:
+    name: str
+    processed: int = 0
+    dropped: int = 0
+    queue_depth: int = 0
+    total_latency_s: float = 0.0
+    max_latency_s: float = 0.0
+    recent_latencies_s: deque[float] = field(default_factory=lambda: deque(maxlen=_LATENCY_SAMPLES))
+
+    def record(self, latency_s: float) -> None:
+        self.processed += 1
+        self.total_latency_s += latency_s
+        self.max_latency_s = max(self.max_latency_s, latency_s)
+        self.recent_latencies_s.append(latency_s)
+
+    def percentiles_ms(self, quantiles: tuple[float, ...] = (50, 95, 99)) -> dict[str, float]:
+        """Nearest-rank latency percentiles over the most recent samples."""
+        samples = sorted(self.recent_latencies_s.copy())  # deque.copy() is atomic vs. the worker thread
+        if not samples:
+            return {f"p{q:g}_ms": 0.0 for q in quantiles}
+        return {
+            f"p{q:g}_ms": round(1000.0 * samples[min(len(samples) - 1, int(len(samples) * q / 100.0))], 3)
+            for q in quantiles
+        }
+
+    @property
+    def avg_latency_ms(self) -> float:
+        return 1000.0 * self.total_latency_s / self.processed if self.processed else 0.0
+
+    def as_dict(self) -> dict[str, float | int | str]:
+        return {
+            "stage": self.name,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "queue_depth": self.queue_depth,
+            "avg_latency_ms": round(self.avg_latency_ms, 3),
+            "max_latency_ms": round(1000.0 * self.max_latency_s, 3),
+        }
+
+
+class StageQueue:
+    """Bounded hand-off between two pipeline workers."""
+
+    def __init__(
+        self, maxsize: int, drop_policy: DropPolicy = "drop_oldest", on_drop: Callable[[Any], None] | None = None
+    ) -> None:
+        if drop_policy not in ("drop_oldest", "block"):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, maxsize))
+        self.drop_policy = drop_policy
+        self.on_drop = on_drop
+        self.dropped = 0
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def put(self, item: Any, stop: threading.Event) -> None:
+        if self.drop_policy == "block" or item is _END_OF_STREAM:
+            while not stop.is_set():
+                try:
+                    self._queue.put(item, timeout=_POLL_SECONDS)
+                    return
+                except queue.Full:
+                    continue
+            return
+
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    dropped = self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    continue
+                if self.on_drop is not None:
+                    self.on_drop(dropped)
+
+    def get(self, timeout: float = _POLL_SECONDS) -> Any:
+        return self._queue.get(timeout=timeout)
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Any], Any | None]
+    drop_policy: DropPolicy | None = None
+
+
+class Pipeline:
+    """Runs a source and a chain of stages on worker threads joined by bounded queues.
+
+    The source returns ``None`` at end of stream; a stage returning ``None`` consumes the
+    item. The output of the last stage is drained on the calling thread via :meth:`drain`,
+    which keeps GUI work such as ``cv2.imshow`` on the main thread. ``on_drop`` sees every item
+    a ``drop_oldest`` queue discards, so items holding pooled buffers can hand them back.
+    """
+
+    def __init__(
+        self,
+        source_name: str,
+        source: Callable[[], Any | None],
+        stages: list[Stage],
+        queue_size: int = 4,
+        drop_policy: DropPolicy = "drop_oldest",
+        on_drop: Callable[[Any], None] | None = None,
+    ) -> None:
+        self.source_name = source_name
+        self.source = source
+        self.stages = stages
+        self.inboxes = [StageQueue(queue_size, stage.drop_policy or drop_policy, on_drop) for stage in stages]
+        self.output = StageQueue(queue_size, drop_policy, on_drop)
+        self.stats: dict[str, StageStats] = {source_name: StageStats(source_name)}
+        for stage in stages:
+            self.stats[stage.name] = StageStats(stage.name)
+
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._error: BaseException | None = None
+        self._sink_name: str | None = None
+
+    def start(self) -> None:
+        outboxes = self.inboxes[1:] + [self.output]
+        first = self.inboxes[0] if self.inboxes else self.output
+        self._threads.append(threading.Thread(target=self._run_source, args=(first,), name=self.source_name, daemon=True))
+        for stage, inbox, outbox in zip(self.stages, self.inboxes, outboxes):
+            self._threads.append(
+                threading.Thread(target=self._run_stage, args=(stage, inbox, outbox), name=stage.name, daemon=True)
+            )
+        for thread in self._threads:
+            thread.start()
+
+    def request_stop(self) -> None:
+        """Ask every worker and :meth:`drain` to finish without waiting for them."""
+        self._stop.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        if self._error is not None:
+            raise self._error
+
+    def drain(self, name: str, sink: Callable[[Any], bool | None]) -> None:
+        """Consume the last stage's output on this thread until end of stream or ``sink`` returns False."""
+        self._sink_name = name
+        stats = self.stats.setdefault(name, StageStats(name))
+        while not self._stop.is_set():
+            try:
+                item = self.output.get()
+            except queue.Empty:
+                continue
+            if item is _END_OF_STREAM:
+                break
+            started = time.perf_counter()
+            keep_going = sink(item)
+            stats.record(time.perf_counter() - started)
+            if keep_going is False:
+                break
+
+    def snapshot(self) -> list[dict[str, float | int | str]]:
+        queues = dict(zip((stage.name for stage in self.stages), self.inboxes))
+        if self._sink_name is not None:
+            queues[self._sink_name] = self.output
+        for name, stats in self.stats.items():
+            inbox = queues.get(name)
+            if inbox is not None:
+                stats.queue_depth = inbox.depth()
+                stats.dropped = inbox.dropped
+        return [stats.as_dict() for stats in self.stats.values()]
+
+    def _fail(self, exc: BaseException) -> None:
+        if self._error is None:
+            self._error = exc
+        self._stop.set()
+
+    def _run_source(self, outbox: StageQueue) -> None:
+        stats = self.stats[self.source_name]
+        while not self._stop.is_set():
+            started = time.perf_counter()
+            try:
+                item = self.source()
+            except BaseException as exc:
+                self._fail(exc)
+                return
+            if item is None:
+                outbox.put(_END_OF_STREAM, self._stop)
+                return
+            stats.record(time.perf_counter() - started)
+            outbox.put(item, self._stop)
+
+    def _run_stage(self, stage: Stage, inbox: StageQueue, outbox: StageQueue) -> None:
+        stats = self.stats[stage.name]
+        while not self._stop.is_set():
+            try:
+                item = inbox.get()
+            except queue.Empty:
+                continue
+            if item is _END_OF_STREAM:
+                outbox.put(_END_OF_STREAM, self._stop)
+                return
+            started = time.perf_counter()
+            try:
+                result = stage.fn(item)
+            except BaseException as exc:
+                self._fail(exc)
+                return
+            stats.record(time.perf_counter() - started)
+            if result is not None:
+                outbox.put(result, self._stop)
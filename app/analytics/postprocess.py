@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+import numpy as np
+
+
+@dataclass
+class Detections:
+    """Filtered detections for one frame as parallel arrays."""
+
+    xyxy: np.ndarray
+    confidence: np.ndarray
+    class_id: np.ndarray
+    names: dict[int, str]
+
+    def __len__(self) -> int:
+        return int(self.class_id.shape[0])
+
+    @property
+    def labels(self) -> list[str]:
+        return [self.names[c] for c in self.class_id.tolist()]
+
+    def ltwh(self) -> np.ndarray:
+        ltwh = self.xyxy.copy()
+        ltwh[:, 2:] -= ltwh[:, :2]
+        return ltwh
+
+    def subset(self, mask: np.ndarray) -> Detections:
+        return Detections(self.xyxy[mask], self.confidence[mask], self.class_id[mask], self.names)
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        return [
+            {"bbox": bbox, "confidence": conf, "label": label}
+            for bbox, conf, label in zip(self.xyxy.tolist(), self.confidence.tolist(), self.labels)
+        ]
+
+    def to_deep_sort(self) -> list[tuple[list[float], float, str]]:
+        return list(zip(self.ltwh().tolist(), self.confidence.tolist(), self.labels))
+
+
+class ClassFilter:
+    """Precomputed class-id lookup tables for a model's ``names`` mapping."""
+
+    def __init__(self, names: dict[int, str], target_classes: Iterable[str], track_class: str = "person") -> None:
+        self.names = names
+        size = max(names) + 1 if names else 1
+        targets = set(target_classes)
+        self.keep = np.zeros(size, dtype=bool)
+        self.track = np.zeros(size, dtype=bool)
+        for class_id, label in names.items():
+            self.keep[class_id] = label in targets
+            self.track[class_id] = label == track_class
+
+    def apply(self, result: Any) -> Detections:
+        # One device-to-host copy of the (N, 6) [x1, y1, x2, y2, conf, cls] tensor per frame.
+        data = result.boxes.data
+        if hasattr(data, "cpu"):
+            data = data.cpu().numpy()
+        data = np.asarray(data, dtype=np.float32).reshape(-1, 6)
+
+        class_id = data[:, 5].astype(np.int64)
+        in_range = (class_id >= 0) & (class_id < self.keep.shape[0])
+        mask = in_range & self.keep[np.where(in_range, class_id, 0)]
+        return Detections(data[mask, :4], data[mask, 4], class_id[mask], self.names)
+
+    def tracked(self, detections: Detections) -> Detections:
+        return detections.subset(self.track[detections.class_id])
+
+
+def target_classes_from_config(detection_config: Any) -> set[str]:
+    return set(detection_config.target_classes) | set(detection_config.custom_product_classes)
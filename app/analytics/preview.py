@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import pathlib
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import cv2
+import numpy as np
+
+from app.analytics.zones import Zone
+
+DETECTION_COLOR = (0, 190, 255)
+TRACK_COLOR = (50, 220, 50)
+ZONE_COLOR = (255, 100, 100)
+
+
+@dataclass
+class PreviewFrame:
+    frame_id: int
+    frame: np.ndarray
+    detections: list[tuple[str, float, list[float]]] = field(default_factory=list)
+    tracks: list[tuple[int, tuple[float, float, float, float], float]] = field(default_factory=list)
+    fps: float | None = None
+
+
+def annotate_frame(
+    frame: np.ndarray,
+    detections: list[tuple[str, float, list[float]]],
+    tracks: list[tuple[int, tuple[float, float, float, float], float]],
+    zones: list[Zone] | None = None,
+    fps: float | None = None,
+) -> np.ndarray:
+    for label, confidence, (x1, y1, x2, y2) in detections:
+        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), DETECTION_COLOR, 2)
+        cv2.putText(
+            frame,
+            f"{label} {confidence:.2f}",
+            (int(x1), int(y1) - 8),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.5,
+            DETECTION_COLOR,
+            2,
+        )
+
+    for tid, (x1, y1, x2, y2), dwell in tracks:
+        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), TRACK_COLOR, 2)
+        cv2.putText(
+            frame,
+            f"ID {tid} dwell {dwell:.1f}s",
+            (int(x1), int(y2) + 16),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.5,
+            TRACK_COLOR,
+            2,
+        )
+
+    for zone in zones or []:
+        polygon = np.asarray(zone.polygon, dtype=np.int32)
+        cv2.polylines(frame, [polygon], True, ZONE_COLOR, 2)
+        x1, y1 = polygon.min(axis=0)
+        cv2.putText(frame, zone.name, (int(x1), max(20, int(y1) - 8)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, ZONE_COLOR, 2)
+
+    if fps is not None:
+        cv2.putText(frame, f"FPS: {fps:.1f}", (12, 28), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    return frame
+
+
+class PreviewPublisher:
+    """Renders annotated preview frames at a reduced rate, off the tracking thread.
+
+    ``offer`` is cheap and never blocks: it keeps at most one pending frame, accepted when the
+    preview interval has elapsed or a snapshot was requested. A background thread draws the
+    annotations, JPEG-encodes the frame and publishes it to an output directory and/or the
+    MJPEG HTTP endpoint (``/stream.mjpg`` and ``/snapshot.jpg``).
+    """
+
+    def __init__(
+        self,
+        fps: float = 2.0,
+        output_dir: str | None = None,
+        port: int | None = None,
+        host: str = "0.0.0.0",
+        jpeg_quality: int = 80,
+        zones: list[Zone] | None = None,
+    ) -> None:
+        self.interval_s = 1.0 / fps if fps > 0 else None
+        self.output_dir = pathlib.Path(output_dir) if output_dir else None
+        self.jpeg_quality = jpeg_quality
+        self.zones = zones
+
+        self.latest_jpeg: bytes | None = None
+        self.sequence = 0
+        self.rendered = 0
+        self._pending: PreviewFrame | None = None
+        self._last_accepted = 0.0
+        self._snapshot_requested = threading.Event()
+        self._published = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._server: ThreadingHTTPServer | None = None
+
+        if self.output_dir is not None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+        if port is not None:
+            self._server = ThreadingHTTPServer((host, port), _MJPEGHandler)
+            self._server.daemon_threads = True
+            self._server.publisher = self  # type: ignore[attr-defined]
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="preview", daemon=True)
+        self._thread.start()
+        if self._server is not None:
+            threading.Thread(target=self._server.serve_forever, name="preview-http", daemon=True).start()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        with self._published:
+            self._published.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+    @property
+    def closed(self) -> bool:
+        return self._stop.is_set()
+
+    def request_snapshot(self) -> None:
+        self._snapshot_requested.set()
+
+    def wants_frame(self) -> bool:
+        if self._snapshot_requested.is_set():
+            return True
+        return self.interval_s is not None and time.perf_counter() - self._last_accepted >= self.interval_s
+
+    def offer(self, preview: PreviewFrame) -> bool:
+        if not self.wants_frame():
+            return False
+        self._snapshot_requested.clear()
+        self._last_accepted = time.perf_counter()
+        # Copy so the capture side is free to reuse its buffer.
+        preview.frame = preview.frame.copy()
+        self._pending = preview
+        self._wake.set()
+        return True
+
+    def wait_for_frame(self, after_sequence: int, timeout: float) -> tuple[int, bytes | None]:
+        with self._published:
+            self._published.wait_for(lambda: self.sequence > after_sequence or self._stop.is_set(), timeout=timeout)
+            return self.sequence, self.latest_jpeg
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(timeout=0.5)
+            self._wake.clear()
+            preview, self._pending = self._pending, None
+            if preview is not None:
+                self._publish(preview)
+
+    def _publish(self, preview: PreviewFrame) -> None:
+        frame = annotate_frame(preview.frame, preview.detections, preview.tracks, self.zones, preview.fps)
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return
+        jpeg = encoded.tobytes()
+
+        if self.output_dir is not None:
+            tmp_path = self.output_dir / "latest.jpg.tmp"
+            tmp_path.write_bytes(jpeg)
+            tmp_path.replace(self.output_dir / "latest.jpg")
+
+        with self._published:
+            self.latest_jpeg = jpeg
+            self.sequence += 1
+            self.rendered += 1
+            self._published.notify_all()
+
+
+class _MJPEGHandler(BaseHTTPRequestHandler):
+    server: Any
+
+    def do_GET(self) -> None:  # noqa: N802
+        publisher: PreviewPublisher = self.server.publisher
+        if self.path.startswith("/snapshot.jpg"):
+            sequence = publisher.sequence
+            publisher.request_snapshot()
+            _, jpeg = publisher.wait_for_frame(sequence, timeout=5.0)
+            if jpeg is None:
+                self.send_error(503, "No preview frame available yet")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(jpeg)))
+            self.end_headers()
+            self.wfile.write(jpeg)
+            return
+
+        if self.path.startswith("/stream.mjpg") or self.path == "/":
+            self.send_response(200)
+            self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+            self.end_headers()
+            sequence = 0
+            try:
+                while not publisher.closed:
+                    sequence, jpeg = publisher.wait_for_frame(sequence, timeout=5.0)
+                    if jpeg is None:
+                        continue
+                    self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n")
+                    self.wfile.write(f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                    self.wfile.write(jpeg)
+                    self.wfile.write(b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            return
+
+        self.send_error(404)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.config import settings
+
+SEARCH_MODES = ("auto", "exact", "approximate")
+# Alternatives kept per query so a batch of new tracks can each get a different customer.
+_MAX_MATCH_CANDIDATES = 8
+
+
+@dataclass(frozen=True)
+class ReIdMatch:
+    customer_key: str
+    similarity: float
+    camera_id: str
+    entered_at: float
+    last_seen: float
+
+
+@dataclass
+class ReIdStats:
+    queries: int = 0
+    matches: int = 0
+    cross_camera_matches: int = 0
+    evicted: int = 0
+    searches: int = 0
+    approximate_searches: int = 0
+    search_s: float = 0.0
+    max_search_s: float = 0.0
+
+    def as_dict(self, size: int) -> dict[str, float | int]:
+        return {
+            "gallery": size,
+            "queries": self.queries,
+            "matches": self.matches,
+            "cross_camera_matches": self.cross_camera_matches,
+            "evicted": self.evicted,
+            "searches": self.searches,
+            "approximate_searches": self.approximate_searches,
+            "avg_search_ms": round(1000.0 * self.search_s / self.searches, 3) if self.searches else 0.0,
+            "max_search_ms": round(1000.0 * self.max_search_s, 3),
+        }
+
+
+def normalize(vectors: np.ndarray | Sequence[Sequence[float]]) -> np.ndarray:
+    """Rows scaled to unit length as float32, so cosine similarity is a dot product."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _resized(array: np.ndarray, capacity: int, fill: float | bool) -> np.ndarray:
+    grown = np.full((capacity, *array.shape[1:]), fill, dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+class EmbeddingIndex:
+    """In-memory gallery of appearance embeddings, one row per customer, for re-identification.
+
+    A row holds a normalised running average (``momentum``) of the customer's DeepSORT features,
+    the camera and time they were last seen and when they first entered. Rows live in float32
+    arrays that double when full; customers unseen for ``window_seconds`` are evicted and their
+    rows reused. :meth:`search` answers a batch of queries with one matrix product.
+
+    The exact search scores every row. The approximate one, used by ``search="auto"`` once
+    ``approximate_min_size`` rows are live, scores ``projection_dim``-wide random projections of
+    the rows first and then re-scores only each query's ``rerank_candidates`` best rows at full
+    width, so the similarities it returns are exact and only the shortlist is approximate.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = settings.reid.window_seconds,
+        active_seconds: float = settings.reid.active_seconds,
+        similarity_threshold: float = settings.reid.similarity_threshold,
+        momentum: float = settings.reid.embedding_momentum,
+        search: str = settings.reid.search,
+        approximate_min_size: int = settings.reid.approximate_min_size,
+        projection_dim: int = settings.reid.projection_dim,
+        rerank_candidates: int = settings.reid.rerank_candidates,
+        capacity: int = 1024,
+        seed: int = 0,
+    ) -> None:
+        if search not in SEARCH_MODES:
+            raise ValueError(f"search must be one of {SEARCH_MODES}, got {search!r}")
+        self.window_seconds = window_seconds
+        self.active_seconds = active_seconds
+        self.similarity_threshold = similarity_threshold
+        self.momentum = momentum
+        self.search_mode = search
+        self.approximate_min_size = approximate_min_size
+        self.projection_dim = max(1, projection_dim)
+        self.rerank_candidates = max(1, rerank_candidates)
+        self.stats = ReIdStats()
+        self.dim: int | None = None
+        self._capacity = max(1, capacity)
+        self._rng = np.random.default_rng(seed)
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._sketches = np.zeros((0, 0), dtype=np.float32)
+        self._projection = np.zeros((0, 0), dtype=np.float32)
+        self._last_seen = np.full(self._capacity, -np.inf)
+        self._entered_at = np.zeros(self._capacity)
+        self._live = np.zeros(self._capacity, dtype=bool)
+        self._keys: list[str | None] = [None] * self._capacity
+        self._cameras: list[str] = [""] * self._capacity
+        self._rows: dict[str, int] = {}
+        self._free: list[int] = []
+        self._high_water = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def nbytes(self) -> int:
+        return self._vectors.nbytes + self._sketches.nbytes + self._last_seen.nbytes + self._entered_at.nbytes
+
+    def snapshot(self) -> dict[str, float | int]:
+        return {**self.stats.as_dict(len(self)), "gallery_mb": round(self.nbytes / (1024.0 * 1024.0), 1)}
+
+    def upsert(
+        self, keys: Sequence[str], embeddings: np.ndarray, camera_id: str, now: float, entered_at: Sequence[float]
+    ) -> None:
+        """Fold each track's latest feature into its customer's row, adding rows for new customers."""
+        vectors = normalize(embeddings)
+        if not len(keys):
+            return
+        with self._lock:
+            if self.dim is None:
+                self._allocate(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embeddings have {vectors.shape[1]} dimensions, the index has {self.dim}")
+            rows = np.empty(len(keys), dtype=np.int64)
+            fresh = np.zeros(len(keys), dtype=bool)
+            for i, key in enumerate(keys):
+                row = self._rows.get(key)
+                if row is None:
+                    row = self._new_row(key)
+                    fresh[i] = True
+                rows[i] = row
+                self._cameras[row] = camera_id
+            blended = self.momentum * self._vectors[rows] + (1.0 - self.momentum) * vectors
+            blended[fresh] = vectors[fresh]
+            blended = normalize(blended)
+            self._vectors[rows] = blended
+            self._sketches[rows] = blended @ self._projection
+            self._last_seen[rows] = now
+            self._entered_at[rows[fresh]] = np.asarray(entered_at, dtype=np.float64)[fresh]
+
+    def evict(self, now: float) -> int:
+        with self._lock:
+            return self._evict(now)
+
+    def search(
+        self, queries: np.ndarray, k: int = 1, seen_before: float | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """The ``k`` most similar rows per query as ``(similarities, rows)``, best first.
+
+        With ``seen_before``, only rows last seen at or before that time are candidates. Fewer
+        than ``k`` candidates gives fewer columns.
+        """
+        queries = normalize(queries)
+        with self._lock:
+            return self._search(queries, k, seen_before)
+
+    def match(
+        self, embeddings: np.ndarray, camera_id: str, now: float, threshold: float | None = None
+    ) -> list[ReIdMatch | None]:
+        """Re-identify new tracks against customers not in view for ``active_seconds``.
+
+        Pairs at or above ``threshold`` are assigned best first, so a customer goes to at most
+        one of the embeddings. The caller then upserts the track under the matched key, which
+        keeps the customer out of later matches while it stays in view.
+        """
+        threshold = self.similarity_threshold if threshold is None else threshold
+        queries = normalize(embeddings)
+        results: list[ReIdMatch | None] = [None] * len(queries)
+        with self._lock:
+            self._evict(now)
+            scores, rows = self._search(queries, min(len(queries), _MAX_MATCH_CANDIDATES), now - self.active_seconds)
+            pairs = sorted(
+                ((float(scores[q, j]), q, int(rows[q, j])) for q, j in zip(*np.nonzero(scores >= threshold))),
+                reverse=True,
+            )
+            taken: set[int] = set()
+            for similarity, q, row in pairs:
+                if results[q] is not None or row in taken:
+                    continue
+                taken.add(row)
+                key = self._keys[row]
+                assert key is not None
+                results[q] = ReIdMatch(
+                    key, similarity, self._cameras[row], float(self._entered_at[row]), float(self._last_seen[row])
+                )
+                self.stats.matches += 1
+                if self._cameras[row] != camera_id:
+                    self.stats.cross_camera_matches += 1
+            self.stats.queries += len(queries)
+        return results
+
+    def _allocate(self, dim: int) -> None:
+        self.dim = dim
+        width = min(self.projection_dim, dim)
+        self._projection = (self._rng.standard_normal((dim, width)) / np.sqrt(width)).astype(np.float32)
+        self._vectors = np.zeros((self._capacity, dim), dtype=np.float32)
+        self._sketches = np.zeros((self._capacity, width), dtype=np.float32)
+
+    def _new_row(self, key: str) -> int:
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self._high_water == self._capacity:
+                self._grow()
+            row = self._high_water
+            self._high_water += 1
+        self._keys[row] = key
+        self._live[row] = True
+        self._rows[key] = row
+        return row
+
+    def _grow(self) -> None:
+        capacity = 2 * self._capacity
+        self._vectors = _resized(self._vectors, capacity, 0.0)
+        self._sketches = _resized(self._sketches, capacity, 0.0)
+        self._last_seen = _resized(self._last_seen, capacity, -np.inf)
+        self._entered_at = _resized(self._entered_at, capacity, 0.0)
+        self._live = _resized(self._live, capacity, False)
+        self._keys.extend([None] * (capacity - self._capacity))
+        self._cameras.extend([""] * (capacity - self._capacity))
+        self._capacity = capacity
+
+    def _evict(self, now: float) -> int:
+        used = self._high_water
+        stale = np.flatnonzero(self._live[:used] & (self._last_seen[:used] < now - self.window_seconds))
+        for row in stale.tolist():
+            key = self._keys[row]
+            if key is not None:
+                del self._rows[key]
+            self._keys[row] = None
+            self._free.append(row)
+        self._live[stale] = False
+        self._last_seen[stale] = -np.inf
+        self.stats.evicted += len(stale)
+        return len(stale)
+
+    def _search(self, queries: np.ndarray, k: int, seen_before: float | None) -> tuple[np.ndarray, np.ndarray]:
+        started = time.perf_counter()
+        used = self._high_water
+        candidates = self._live[:used]
+        if seen_before is not None:
+            candidates = candidates & (self._last_seen[:used] <= seen_before)
+        count = int(np.count_nonzero(candidates))
+        k = min(k, count)
+        if k <= 0 or self.dim is None:
+            return np.empty((len(queries), 0), dtype=np.float32), np.empty((len(queries), 0), dtype=np.int64)
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"Queries have {queries.shape[1]} dimensions, the index has {self.dim}")
+
+        approximate = self.search_mode == "approximate" or (
+            self.search_mode == "auto" and count >= self.approximate_min_size
+        )
+        shortlist = None
+        if approximate and max(k, self.rerank_candidates) < count:
+            coarse = (queries @ self._projection) @ self._sketches[:used].T
+            coarse[:, ~candidates] = -np.inf
+            width = max(k, self.rerank_candidates)
+            shortlist = np.argpartition(-coarse, width - 1, axis=1)[:, :width]
+            scores = np.einsum("qd,qcd->qc", queries, self._vectors[shortlist])
+            self.stats.approximate_searches += 1
+        else:
+            scores = queries @ self._vectors[:used].T
+            scores[:, ~candidates] = -np.inf
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        rows = top if shortlist is None else np.take_along_axis(shortlist, top, axis=1)
+
+        elapsed = time.perf_counter() - started
+        self.stats.searches += 1
+        self.stats.search_s += elapsed
+        self.stats.max_search_s = max(self.stats.max_search_s, elapsed)
+        return top_scores, rows
+
+
+_SHARED: EmbeddingIndex | None = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_index() -> EmbeddingIndex:
+    """The process-wide index, so all cameras run by one process (e.g. a supervisor worker) share a gallery."""
+    global _SHARED
+    with _SHARED_LOCK:
+        if _SHARED is None:
+            _SHARED = EmbeddingIndex()
+        return _SHARED
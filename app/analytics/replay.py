@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import resource
+import sys
+import time
+from typing import TYPE_CHECKING, Any
+
+import cv2
+import numpy as np
+
+from app.analytics.detectors import DetectionBoxes, DetectionResult
+
+if TYPE_CHECKING:
+    from app.analytics.camera_tracking import CameraTrackerApp
+
+STUB_NAMES = {i: f"class_{i}" for i in range(80)} | {0: "person", 24: "backpack", 39: "bottle"}
+_BACKGROUND = (128, 128, 128)
+
+
+class SyntheticCapture:
+    """``cv2.VideoCapture`` stand-in that renders people walking across a flat gray floor.
+
+    People are saturated rectangles bouncing off the frame edges, so they move like tracks
+    and are easy for :class:`StubDetector` to find. ``frames`` bounds the stream (``None`` runs
+    until released).
+    """
+
+    def __init__(self, width: int, height: int, people: int = 8, frames: int | None = None, seed: int = 0) -> None:
+        rng = np.random.default_rng(seed)
+        self.width = width
+        self.height = height
+        self.frames = frames
+        self.sizes = np.column_stack([rng.integers(30, 60, people), rng.integers(80, 160, people)]).astype(np.float32)
+        self.positions = rng.uniform(0, 1, (people, 2)).astype(np.float32) * (np.array([width, height]) - self.sizes)
+        self.velocities = rng.uniform(-1.5, 1.5, (people, 2)).astype(np.float32)
+        hues = (np.arange(people) * 180 // max(people, 1)).astype(np.uint8)
+        hsv = np.stack([hues, np.full(people, 255, np.uint8), np.full(people, 230, np.uint8)], axis=1)
+        self.colors = [tuple(int(c) for c in bgr) for bgr in cv2.cvtColor(hsv[None], cv2.COLOR_HSV2BGR)[0]]
+        self._background = np.full((height, width, 3), _BACKGROUND, dtype=np.uint8)
+        self._emitted = 0
+        self._open = True
+
+    def isOpened(self) -> bool:
+        return self._open
+
+    def read(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        if not self._open or (self.frames is not None and self._emitted >= self.frames):
+            return False, None
+        self._step()
+        if image is not None and image.shape == self._background.shape:
+            np.copyto(image, self._background)
+            frame = image
+        else:
+            frame = self._background.copy()
+        for (x, y), (w, h), color in zip(self.positions.tolist(), self.sizes.tolist(), self.colors):
+            cv2.rectangle(frame, (int(x), int(y)), (int(x + w), int(y + h)), color, thickness=-1)
+        self._emitted += 1
+        return True, frame
+
+    def release(self) -> None:
+        self._open = False
+
+    def _step(self) -> None:
+        self.positions += self.velocities
+        limit = np.array([self.width, self.height], dtype=np.float32) - self.sizes
+        bounced = (self.positions < 0) | (self.positions > limit)
+        self.velocities[bounced] *= -1
+        np.clip(self.positions, 0, limit, out=self.positions)
+
+
+class VideoFileCapture:
+    """Replays a recorded file, optionally looping it ``loops`` times."""
+
+    def __init__(self, path: str, loops: int = 1) -> None:
+        self.path = path
+        self.loops = loops
+        self._cap = cv2.VideoCapture(path)
+        self._played = 1
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened()
+
+    def read(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        ok, frame = self._cap.read(image)
+        if not ok and self._played < self.loops:
+            self._played += 1
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self._cap.read(image)
+        return ok, frame
+
+    def release(self) -> None:
+        self._cap.release()
+
+
+class PacedCapture:
+    """Caps a capture at ``max_frames`` and, if ``rate`` > 0, releases frames at that FPS."""
+
+    def __init__(self, capture: Any, rate: float = 0.0, max_frames: int | None = None) -> None:
+        self.capture = capture
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.max_frames = max_frames
+        self.frames_read = 0
+        self._next_at: float | None = None
+
+    def isOpened(self) -> bool:
+        return self.capture.isOpened()
+
+    def read(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        if self.max_frames is not None and self.frames_read >= self.max_frames:
+            return False, None
+        if self.interval:
+            now = time.perf_counter()
+            if self._next_at is None:
+                self._next_at = now
+            if self._next_at > now:
+                time.sleep(self._next_at - now)
+            self._next_at += self.interval
+        ok, frame = self.capture.read(image)
+        if ok:
+            self.frames_read += 1
+        return ok, frame
+
+    def release(self) -> None:
+        self.capture.release()
+
+
+class StubDetector:
+    """Weight-free stand-in for ``YOLO`` with the same ``predict`` call shape.
+
+    Reports every strongly saturated blob as a ``person`` (the figures drawn by
+    :class:`SyntheticCapture`; colourful regions on recorded video). ``latency_ms`` adds a fixed
+    sleep per frame to imitate a real model's cost on the target hardware.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, min_area: int = 400, max_detections: int = 50) -> None:
+        self.names = STUB_NAMES
+        self.latency_s = latency_ms / 1000.0
+        self.min_area = min_area
+        self.max_detections = max_detections
+
+    def predict(self, source: Any, conf: float = 0.25, verbose: bool = False, **_: Any) -> list[DetectionResult]:
+        frames = source if isinstance(source, list) else [source]
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return [DetectionResult(DetectionBoxes(self._detect(frame, conf)), self.names) for frame in frames]
+
+    def _detect(self, frame: np.ndarray, conf: float) -> np.ndarray:
+        saturation = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)[:, :, 1]
+        _, mask = cv2.threshold(saturation, 120, 255, cv2.THRESH_BINARY)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=4)
+        stats = stats[1:]
+        stats = stats[stats[:, cv2.CC_STAT_AREA] >= self.min_area][: self.max_detections]
+        data = np.empty((stats.shape[0], 6), dtype=np.float32)
+        data[:, 0] = stats[:, cv2.CC_STAT_LEFT]
+        data[:, 1] = stats[:, cv2.CC_STAT_TOP]
+        data[:, 2] = data[:, 0] + stats[:, cv2.CC_STAT_WIDTH]
+        data[:, 3] = data[:, 1] + stats[:, cv2.CC_STAT_HEIGHT]
+        data[:, 4] = max(conf, 0.9)
+        data[:, 5] = 0
+        return data
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return round(peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0, 1)
+
+
+def run_replay(app: CameraTrackerApp, capture: Any) -> dict[str, Any]:
+    """Drive ``capture`` through the app's capture → detect → track → persist pipeline.
+
+    Frames are consumed as they arrive without rendering; the writer is flushed before timing
+    stops so ``rows_per_second`` covers rows actually committed. Returns a JSON-ready report.
+    """
+    app.cap = capture
+    pipeline = app.build_pipeline()
+    frames = 0
+
+    def consume(packet: Any) -> None:
+        nonlocal frames
+        frames += 1
+        app.release_frame(packet)
+
+    app.start_outputs()
+    started = time.perf_counter()
+    pipeline.start()
+    try:
+        pipeline.drain("sink", consume)
+    finally:
+        try:
+            pipeline.stop()
+        finally:
+            capture.release()
+            app.close_outputs()
+    frame_ring = app.frames.snapshot() if app.frames is not None else None
+    app.close_frames()
+    elapsed = time.perf_counter() - started
+
+    telemetry = app.writer.snapshot()
+    rows = sum(
+        int(telemetry[key])
+        for key in ("customers_written", "movements_written", "exits_written", "interactions_written", "alerts_written")
+    )
+    stages = {}
+    for stats in pipeline.stats.values():
+        stages[stats.name] = stats.as_dict() | stats.percentiles_ms()
+    return {
+        "frames": frames,
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2) if elapsed else 0.0,
+        "stages": stages,
+        "db": {"rows": rows, "rows_per_second": round(rows / elapsed, 1) if elapsed else 0.0, "writer": telemetry},
+        "cadence": app.cadence.snapshot() if app.cadence is not None else None,
+        "trajectories": app.trajectories.snapshot(),
+        "rules": app.rules.snapshot(),
+        "reid": app.reid.snapshot() if app.reid is not None else None,
+        "frame_ring": frame_ring,
+        "peak_rss_mb": peak_rss_mb(),
+    }
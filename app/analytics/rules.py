@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import json
+import pathlib
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from app.analytics.alerts import AlertEvent
+from app.config import settings
+
+if TYPE_CHECKING:
+    from app.analytics.alerts import AlertDispatcher
+    from app.analytics.zones import Zone
+
+# Each metric is evaluated per camera, per active track or per zone.
+METRICS = {
+    "occupancy": "camera",
+    "speed": "track",
+    "dwell": "track",
+    "zone_occupancy": "zone",
+    "shelf_stock": "zone",
+}
+_KEY_LABELS = {"track": "track_id", "zone": "zone"}
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A threshold on one metric that must hold for ``for_seconds`` before it fires.
+
+    ``op`` is ``">="`` or ``"<="``. Once fired, a key stays firing (and cannot fire again) until
+    its value is past ``clear`` (default: ``threshold``) for ``clear_seconds``, and a key never
+    fires twice within ``cooldown_seconds``. ``zones`` limits zone metrics to those zone names.
+    """
+
+    name: str
+    metric: str
+    threshold: float
+    op: str = ">="
+    clear: float | None = None
+    for_seconds: float = 0.0
+    clear_seconds: float = 0.0
+    cooldown_seconds: float = 0.0
+    severity: str = "medium"
+    zones: tuple[str, ...] = ()
+    enabled: bool = True
+
+    def __post_init__(self) -> None:
+        if self.metric not in METRICS:
+            raise ValueError(f"Rule {self.name!r}: unknown metric {self.metric!r} (expected one of {sorted(METRICS)})")
+        if self.op not in (">=", "<="):
+            raise ValueError(f"Rule {self.name!r}: op must be '>=' or '<=', got {self.op!r}")
+        if self.clear is not None and (self.clear > self.threshold if self.op == ">=" else self.clear < self.threshold):
+            raise ValueError(f"Rule {self.name!r}: clear={self.clear} is on the firing side of threshold={self.threshold}")
+
+    @property
+    def scope(self) -> str:
+        return METRICS[self.metric]
+
+    @property
+    def clear_value(self) -> float:
+        return self.threshold if self.clear is None else self.clear
+
+
+def default_rules() -> list[Rule]:
+    """The built-in rules, from the thresholds in ``settings.alerts``."""
+    alerts = settings.alerts
+    return [
+        Rule(
+            "overcrowding",
+            "occupancy",
+            alerts.overcrowding_threshold,
+            clear=alerts.overcrowding_threshold - alerts.overcrowding_hysteresis,
+            for_seconds=alerts.overcrowding_seconds,
+            clear_seconds=10.0,
+            cooldown_seconds=alerts.cooldown_seconds,
+            severity="high",
+        ),
+        Rule("loitering", "dwell", alerts.loitering_seconds, severity="medium"),
+        Rule(
+            "rapid_movement",
+            "speed",
+            alerts.rapid_movement_threshold,
+            clear=0.75 * alerts.rapid_movement_threshold,
+            cooldown_seconds=alerts.cooldown_seconds,
+            severity="high",
+        ),
+        Rule(
+            "shelf_empty",
+            "shelf_stock",
+            0,
+            op="<=",
+            # Stock counts are whole detections: a single restocked item (1 > 0.5) clears it.
+            clear=0.5,
+            for_seconds=alerts.shelf_empty_seconds,
+            clear_seconds=5.0,
+            cooldown_seconds=alerts.cooldown_seconds,
+            severity="medium",
+        ),
+    ]
+
+
+def _merge_rules(rules: list[Rule], entries: list[dict[str, Any]]) -> list[Rule]:
+    by_name = {rule.name: rule for rule in rules}
+    known = {f.name for f in fields(Rule)}
+    for entry in entries:
+        unknown = set(entry) - known
+        if unknown:
+            raise ValueError(f"Rule {entry.get('name')!r}: unknown keys {sorted(unknown)}")
+        values = dict(entry)
+        if "zones" in values:
+            values["zones"] = tuple(values["zones"])
+        base = by_name.get(values["name"])
+        by_name[values["name"]] = replace(base, **values) if base is not None else Rule(**values)
+    return list(by_name.values())
+
+
+def load_rule_config(path: str | pathlib.Path) -> dict[str, list[dict[str, Any]]]:
+    """Read ``{"defaults": [rule, ...], "cameras": {"<camera_id>": [rule, ...]}}``."""
+    raw = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+    config = {"*": list(raw.get("defaults", []))}
+    config.update({str(camera_id): list(entries) for camera_id, entries in raw.get("cameras", {}).items()})
+    return config
+
+
+def rules_for_camera(camera_id: str, path: str | pathlib.Path | None = settings.alerts.rules_path) -> list[Rule]:
+    """Built-in rules, overridden field by field (matched on ``name``) by the file's defaults, then its camera entries."""
+    rules = default_rules()
+    if path:
+        config = load_rule_config(path)
+        rules = _merge_rules(rules, config["*"])
+        rules = _merge_rules(rules, config.get(camera_id, []))
+    return [rule for rule in rules if rule.enabled]
+
+
+@dataclass
+class RuleInput:
+    """One frame of a camera's state as the rule engine consumes it.
+
+    Track arrays are aligned with ``track_ids`` (``speed`` is NaN where unknown); zone arrays are
+    aligned with the engine's zones. ``shelf_stock`` is ``None`` on frames without detections,
+    which leaves shelf rules where they were.
+    """
+
+    timestamp: float
+    track_ids: np.ndarray
+    speed: np.ndarray
+    dwell: np.ndarray
+    zone_occupancy: np.ndarray | None = None
+    shelf_stock: np.ndarray | None = None
+    camera_id: str = ""
+
+    def values(self, metric: str) -> np.ndarray | None:
+        if metric == "occupancy":
+            return np.array([len(self.track_ids)], dtype=np.float64)
+        return getattr(self, metric)
+
+    def as_dict(self) -> dict[str, Any]:
+        record: dict[str, Any] = {"camera_id": self.camera_id, "timestamp": self.timestamp}
+        for name in ("track_ids", "speed", "dwell", "zone_occupancy", "shelf_stock"):
+            value = getattr(self, name)
+            if value is None or value.dtype.kind != "f":
+                record[name] = None if value is None else value.tolist()
+            else:  # NaN (unknown) is written as null to keep the lines strict JSON
+                record[name] = [None if v != v else v for v in np.round(value, 3).tolist()]
+        return record
+
+    @classmethod
+    def from_dict(cls, record: dict[str, Any]) -> RuleInput:
+        def array(name: str, dtype: Any) -> np.ndarray | None:
+            value = record.get(name)
+            return None if value is None else np.asarray(value, dtype=dtype)
+
+        return cls(
+            timestamp=float(record["timestamp"]),
+            track_ids=np.asarray(record["track_ids"], dtype=np.int64),
+            speed=np.asarray(record["speed"], dtype=np.float64),
+            dwell=np.asarray(record["dwell"], dtype=np.float64),
+            zone_occupancy=array("zone_occupancy", np.float64),
+            shelf_stock=array("shelf_stock", np.float64),
+            camera_id=record.get("camera_id", ""),
+        )
+
+
+@dataclass
+class _KeyState:
+    seen: int = 0
+    since: float | None = None
+    clear_since: float | None = None
+    firing: bool = False
+    last_fired: float | None = None
+
+
+@dataclass
+class RuleStats:
+    frames: int = 0
+    evaluations: int = 0
+    resolved: int = 0
+    eval_seconds: float = 0.0
+    fired: dict[str, int] = field(default_factory=dict)
+
+
+class RuleEngine:
+    """Streaming evaluation of one camera's :class:`Rule` set against per-frame :class:`RuleInput`.
+
+    Each rule compares its metric for every key (the camera, each active track, each zone) in
+    one NumPy operation; per-key state is only kept for keys whose condition is holding, firing
+    or cooling down, so a frame costs O(active tracks) and keys of tracks that left are dropped.
+    Fired rules become :class:`AlertEvent` objects and go to the dispatcher when one is given.
+    """
+
+    def __init__(
+        self,
+        camera_id: str,
+        rules: Sequence[Rule],
+        zones: Sequence[Zone] = (),
+        dispatcher: AlertDispatcher | None = None,
+    ) -> None:
+        self.camera_id = camera_id
+        self.rules = [rule for rule in rules if rule.enabled]
+        self.zone_names = [zone.name for zone in zones]
+        self.dispatcher = dispatcher
+        self.stats = RuleStats()
+        self._states: list[dict[Any, _KeyState]] = [{} for _ in self.rules]
+        self._frame = 0
+        # Zone rules only look at their listed zones; shelf stock only exists for product zones.
+        self._zone_columns: list[np.ndarray | None] = []
+        for rule in self.rules:
+            if rule.scope != "zone":
+                self._zone_columns.append(None)
+                continue
+            self._zone_columns.append(
+                np.array(
+                    [
+                        index
+                        for index, zone in enumerate(zones)
+                        if (not rule.zones or zone.name in rule.zones)
+                        and (rule.metric != "shelf_stock" or zone.product_class)
+                    ],
+                    dtype=np.intp,
+                )
+            )
+
+    def update(self, frame: RuleInput) -> list[AlertEvent]:
+        started = time.perf_counter()
+        self._frame += 1
+        now = frame.timestamp
+        fired: list[AlertEvent] = []
+        track_keys: list[int] | None = None
+        for rule, states, columns in zip(self.rules, self._states, self._zone_columns):
+            values = frame.values(rule.metric)
+            if values is None:
+                continue
+            if rule.scope == "track":
+                if track_keys is None:
+                    track_keys = frame.track_ids.tolist()
+                keys: Sequence[Any] = track_keys
+            elif rule.scope == "zone":
+                values = values[columns]
+                keys = [self.zone_names[index] for index in columns.tolist()]
+            else:
+                keys = ("",)
+            self.stats.evaluations += len(values)
+            for key, value, held in self._evaluate(rule, states, keys, values, now):
+                fired.append(self._event(rule, key, value, held, now))
+
+        self.stats.frames += 1
+        self.stats.eval_seconds += time.perf_counter() - started
+        if self.dispatcher is not None:
+            for event in fired:
+                self.dispatcher.dispatch(
+                    alert_type=event.alert_type, camera_id=event.camera_id, severity=event.severity, details=event.details
+                )
+        return fired
+
+    def _evaluate(
+        self, rule: Rule, states: dict[Any, _KeyState], keys: Sequence[Any], values: np.ndarray, now: float
+    ) -> list[tuple[Any, float, float]]:
+        with np.errstate(invalid="ignore"):
+            if rule.op == ">=":
+                on, off = values >= rule.threshold, values < rule.clear_value
+            else:
+                on, off = values <= rule.threshold, values > rule.clear_value
+
+        fired: list[tuple[Any, float, float]] = []
+        for index in np.flatnonzero(on).tolist():
+            key = keys[index]
+            state = states.get(key)
+            if state is None:
+                state = states[key] = _KeyState()
+            state.seen = self._frame
+            state.clear_since = None
+            if state.since is None:
+                state.since = now
+            if (
+                not state.firing
+                and now - state.since >= rule.for_seconds
+                and (state.last_fired is None or now - state.last_fired >= rule.cooldown_seconds)
+            ):
+                state.firing = True
+                state.last_fired = now
+                fired.append((key, float(values[index]), now - state.since))
+
+        positions: dict[Any, int] | None = None
+        for key, state in list(states.items()):
+            if state.seen == self._frame:
+                continue
+            if positions is None:
+                positions = {k: i for i, k in enumerate(keys)}
+            index = positions.get(key)
+            if index is None:  # the track left (or the zone is no longer evaluated)
+                del states[key]
+                continue
+            state.since = None
+            if state.firing:
+                if off[index]:
+                    state.clear_since = now if state.clear_since is None else state.clear_since
+                    if now - state.clear_since >= rule.clear_seconds:
+                        state.firing = False
+                        self.stats.resolved += 1
+                else:
+                    state.clear_since = None
+            if not state.firing and (state.last_fired is None or now - state.last_fired >= rule.cooldown_seconds):
+                del states[key]
+        return fired
+
+    def _event(self, rule: Rule, key: Any, value: float, held: float, now: float) -> AlertEvent:
+        self.stats.fired[rule.name] = self.stats.fired.get(rule.name, 0) + 1
+        subject = f"{_KEY_LABELS[rule.scope]}={key}, " if rule.scope in _KEY_LABELS else ""
+        details = f"{subject}{rule.metric}={value:.1f}"
+        if held > 0:
+            details += f" for {held:.0f}s"
+        return AlertEvent(rule.name, self.camera_id, rule.severity, details, timestamp=datetime.fromtimestamp(now, timezone.utc))
+
+    def firing(self) -> dict[str, int]:
+        return {rule.name: sum(state.firing for state in states.values()) for rule, states in zip(self.rules, self._states)}
+
+    def snapshot(self) -> dict[str, Any]:
+        frames = self.stats.frames
+        return {
+            "rules": len(self.rules),
+            "frames": frames,
+            "evaluations": self.stats.evaluations,
+            "fired": dict(self.stats.fired),
+            "firing": self.firing(),
+            "resolved": self.stats.resolved,
+            "avg_eval_us": round(1e6 * self.stats.eval_seconds / frames, 2) if frames else 0.0,
+        }
@@ -0,0 +1,461 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import pathlib
+import queue
+import signal
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Keys of a camera entry that configure the supervisor rather than the tracker.
+_SUPERVISOR_KEYS = {"id", "source", "worker", "cpus", "fps", "zones"}
+# Worker that re-identification cameras without an explicit ``worker`` share (see load_camera_config).
+REID_WORKER = "reid"
+
+
+@dataclass
+class CameraSpec:
+    """One camera from the supervisor config; every other key is a tracker flag (``confidence`` → ``--confidence``)."""
+
+    camera_id: str
+    source: int | str
+    options: dict[str, Any] = field(default_factory=dict)
+    zones: list[dict[str, Any]] | None = None
+    fps: float | None = None
+
+    @property
+    def is_file(self) -> bool:
+        return isinstance(self.source, str)
+
+    def argv(self) -> list[str]:
+        argv = ["--camera-id", self.camera_id, "--headless"]
+        argv += ["--video", self.source] if isinstance(self.source, str) else ["--camera-index", str(self.source)]
+        for key, value in self.options.items():
+            flag = "--" + key.replace("_", "-")
+            if value is True:
+                argv.append(flag)
+            elif value is False or value is None:
+                continue
+            elif isinstance(value, (list, tuple)):
+                argv += [flag, ",".join(str(v) for v in value)]
+            else:
+                argv += [flag, str(value)]
+        return argv
+
+
+@dataclass
+class WorkerSpec:
+    name: str
+    cameras: list[CameraSpec]
+    cpus: list[int] = field(default_factory=list)
+
+
+def load_camera_config(
+    path: str | pathlib.Path,
+    low_fps_threshold: float = settings.supervisor.low_fps_threshold,
+    max_cameras_per_worker: int = settings.supervisor.max_cameras_per_worker,
+) -> list[WorkerSpec]:
+    """Read ``{"defaults": {...}, "cameras": [{"id", "source", "worker"?, "cpus"?, "fps"?, "zones"?, ...}]}``.
+
+    ``source`` is a camera index or a video path/URL. Cameras naming the same ``worker`` share a
+    process. Cameras with re-identification on (``reid``, default ``settings.reid.enabled``) and
+    no ``worker`` share the ``reid`` worker, since the embedding index is per process and only
+    matches customers across cameras of the same worker. Cameras declaring an ``fps`` at or below
+    ``low_fps_threshold`` are packed into shared workers of up to ``max_cameras_per_worker``;
+    every other camera gets a process of its own. ``zones`` is an inline list in the zones-file
+    format. ``cpus`` pins the worker to those cores.
+    """
+    raw = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+    defaults = raw.get("defaults", {})
+    groups: dict[str, WorkerSpec] = {}
+    low_fps: list[tuple[CameraSpec, list[int]]] = []
+    reid_workers: set[str] = set()
+    for entry in raw.get("cameras", []):
+        merged = defaults | entry
+        if "id" not in merged or "source" not in merged:
+            raise ValueError(f"Camera entries need an id and a source: {entry}")
+        camera = CameraSpec(
+            camera_id=str(merged["id"]),
+            source=merged["source"],
+            options={k: v for k, v in merged.items() if k not in _SUPERVISOR_KEYS},
+            zones=merged.get("zones"),
+            fps=merged.get("fps"),
+        )
+        cpus = [int(cpu) for cpu in merged.get("cpus", [])]
+        # Matches the tracker flag: "reid": false cannot turn off settings.reid.enabled.
+        reid = bool(merged.get("reid")) or settings.reid.enabled
+        worker = str(merged["worker"]) if "worker" in merged else REID_WORKER if reid else None
+        if worker is not None:
+            if reid:
+                reid_workers.add(worker)
+            group = groups.setdefault(worker, WorkerSpec(worker, []))
+            group.cameras.append(camera)
+            group.cpus = sorted(set(group.cpus) | set(cpus))
+        elif camera.fps is not None and camera.fps <= low_fps_threshold:
+            low_fps.append((camera, cpus))
+        else:
+            groups[camera.camera_id] = WorkerSpec(camera.camera_id, [camera], cpus)
+
+    for start in range(0, len(low_fps), max(max_cameras_per_worker, 1)):
+        chunk = low_fps[start : start + max_cameras_per_worker]
+        name = f"low-fps-{start // max_cameras_per_worker}"
+        groups[name] = WorkerSpec(name, [c for c, _ in chunk], sorted({cpu for _, cpus in chunk for cpu in cpus}))
+
+    camera_ids = [camera.camera_id for group in groups.values() for camera in group.cameras]
+    if len(set(camera_ids)) != len(camera_ids):
+        raise ValueError(f"Duplicate camera ids in {path}")
+    if len(reid_workers) > 1:
+        logger.warning("Re-identification cameras are split across workers %s; customers only match within one", sorted(reid_workers))
+    return list(groups.values())
+
+
+def _send(events: Any, message: tuple[Any, ...]) -> None:
+    try:
+        events.put_nowait(message)
+    except queue.Full:
+        pass
+
+
+def _worker_main(spec: WorkerSpec, events: Any, stop: Any, stats_interval_seconds: float) -> None:
+    """Worker process entry point: run every camera of ``spec`` on its own thread until ``stop``."""
+    if spec.cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, spec.cpus)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the supervisor owns shutdown via ``stop``
+
+    # Imported here so the supervisor (and the API embedding it) never loads torch/DeepSORT itself.
+    from app.analytics.camera_tracking import CameraTrackerApp, build_parser, validate_args
+    from app.analytics.detectors import load_detector
+    from app.analytics.inference import BatchedInferenceService
+
+    zones_file = None
+    inline_zones = {camera.camera_id: camera.zones for camera in spec.cameras if camera.zones}
+    if inline_zones:
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as handle:
+            json.dump({"cameras": inline_zones}, handle)
+        zones_file = handle.name
+
+    apps: list[CameraTrackerApp] = []
+    services: list[BatchedInferenceService] = []
+    try:
+        camera_args = []
+        for camera in spec.cameras:
+            argv = ["--stats-interval-seconds", str(stats_interval_seconds)] + camera.argv()
+            if camera.zones:
+                argv += ["--zones-file", zones_file]
+            camera_args.append(validate_args(build_parser().parse_args(argv)))
+
+        # Cameras of a worker with the same detector settings share one loaded model, fed through
+        # a BatchedInferenceService so their frames are predicted in micro-batches rather than
+        # one at a time. It runs at the lowest --confidence of its cameras; the others filter.
+        by_detector: dict[tuple[Any, ...], list[argparse.Namespace]] = {}
+        for args in camera_args:
+            by_detector.setdefault((args.backend, args.model, args.onnx_model, args.height, args.width), []).append(args)
+        for (backend, model, onnx_model, height, width), group in by_detector.items():
+            detector = load_detector(backend, model, onnx_model, imgsz=(height, width))
+            if len(group) == 1:
+                apps.append(CameraTrackerApp(group[0], model=detector))
+                continue
+            service = BatchedInferenceService(
+                detector,
+                max_batch_size=min(settings.inference.max_batch_size, len(group)),
+                confidence_threshold=min(args.confidence for args in group),
+            )
+            service.start()
+            services.append(service)
+            apps.extend(CameraTrackerApp(args, model=service.client(args.camera_id)) for args in group)
+        for app in apps:
+            app.report_stats = lambda report: _send(events, ("stats", spec.name, report))
+    except BaseException:
+        for service in services:
+            service.close()
+        raise
+    finally:
+        if zones_file is not None:
+            os.unlink(zones_file)
+
+    failed = threading.Event()
+
+    def run_camera(app: CameraTrackerApp) -> None:
+        try:
+            app.run()
+        except BaseException as exc:
+            logger.exception("Camera %s failed", app.args.camera_id)
+            _send(events, ("error", spec.name, app.args.camera_id, f"{type(exc).__name__}: {exc}"))
+            failed.set()
+
+    threads = [threading.Thread(target=run_camera, args=(app,), name=f"camera-{app.args.camera_id}") for app in apps]
+    for thread in threads:
+        thread.start()
+    _send(events, ("started", spec.name, os.getpid()))
+    # One failed camera restarts the whole worker: its peers share the process and the model.
+    while not stop.wait(0.5) and not failed.is_set() and any(thread.is_alive() for thread in threads):
+        pass
+    for app in apps:
+        app.stop()
+    for thread in threads:
+        thread.join()
+    for service in services:
+        service.close()
+    if failed.is_set():
+        raise SystemExit(1)
+
+
+@dataclass
+class _WorkerState:
+    spec: WorkerSpec
+    process: Any = None
+    started_at: float = 0.0
+    next_start_at: float = 0.0
+    backoff_s: float = 0.0
+    restarts: int = 0
+    last_exit_code: int | None = None
+    finished: bool = False
+
+
+@dataclass
+class _CameraState:
+    worker: str
+    last_report_at: float | None = None
+    report: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+class CameraSupervisor:
+    """Runs one tracker process per worker group and keeps it alive.
+
+    Workers are started with ``start_method`` (``spawn`` by default: no inherited threads,
+    sockets or CUDA state) and report per-camera stats over one ``multiprocessing`` queue. A
+    worker that exits is restarted after an exponential backoff, which resets once a run
+    outlives ``stable_seconds``; a worker whose cameras are all video files and that exits
+    cleanly is left finished. :meth:`snapshot` is what ``/health`` serves and what is written
+    to ``status_path`` for an API running in another process.
+    """
+
+    def __init__(
+        self,
+        workers: list[WorkerSpec],
+        status_path: str = settings.supervisor.status_path,
+        start_method: str = settings.supervisor.start_method,
+        stats_interval_seconds: float = settings.supervisor.stats_interval_seconds,
+        stale_after_seconds: float = settings.supervisor.stale_after_seconds,
+        restart_backoff_seconds: float = settings.supervisor.restart_backoff_seconds,
+        max_backoff_seconds: float = settings.supervisor.max_backoff_seconds,
+        stable_seconds: float = settings.supervisor.stable_seconds,
+        publish_occupancy: Callable[[str, int], None] | None = None,
+    ) -> None:
+        self.status_path = status_path
+        self.publish_occupancy = publish_occupancy
+        self.stats_interval_seconds = stats_interval_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self.restart_backoff_seconds = restart_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.stable_seconds = stable_seconds
+        self._context = mp.get_context(start_method)
+        self._events = self._context.Queue(maxsize=1000)
+        self._stop = self._context.Event()
+        self._closing = threading.Event()
+        self._lock = threading.Lock()
+        self._workers = {spec.name: _WorkerState(spec, backoff_s=restart_backoff_seconds) for spec in workers}
+        self._cameras = {camera.camera_id: _CameraState(spec.name) for spec in workers for camera in spec.cameras}
+        self._monitor: threading.Thread | None = None
+        self._status_written_at = 0.0
+
+    @classmethod
+    def from_config(cls, path: str | pathlib.Path, **kwargs: Any) -> CameraSupervisor:
+        return cls(load_camera_config(path), **kwargs)
+
+    def start(self) -> None:
+        for state in self._workers.values():
+            self._spawn(state)
+        self._monitor = threading.Thread(target=self._run_monitor, name="camera-supervisor", daemon=True)
+        self._monitor.start()
+
+    def close(self, timeout: float = 10.0) -> None:
+        self._closing.set()
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout=timeout)
+        deadline = time.monotonic() + timeout
+        for state in self._workers.values():
+            if state.process is None:
+                continue
+            state.process.join(timeout=max(deadline - time.monotonic(), 0.1))
+            if state.process.is_alive():
+                logger.warning("Worker %s did not stop in time; terminating", state.spec.name)
+                state.process.terminate()
+                state.process.join(timeout=1.0)
+        self._drain_events()
+        self._write_status()
+
+    def snapshot(self) -> dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            workers = {}
+            for name, state in self._workers.items():
+                alive = state.process is not None and state.process.is_alive()
+                workers[name] = {
+                    "pid": state.process.pid if alive else None,
+                    "alive": alive,
+                    "cpus": state.spec.cpus,
+                    "cameras": [camera.camera_id for camera in state.spec.cameras],
+                    "restarts": state.restarts,
+                    "last_exit_code": state.last_exit_code,
+                    "uptime_s": round(now - state.started_at, 1) if alive else 0.0,
+                }
+            cameras = {camera_id: self._camera_status(camera, now) for camera_id, camera in self._cameras.items()}
+        healthy = all(camera["status"] in ("ok", "starting", "finished") for camera in cameras.values())
+        return {"status": "ok" if healthy else "degraded", "updated_at": time.time(), "workers": workers, "cameras": cameras}
+
+    def _camera_status(self, camera: _CameraState, now: float) -> dict[str, Any]:
+        worker = self._workers[camera.worker]
+        alive = worker.process is not None and worker.process.is_alive()
+        if worker.finished:
+            status = "finished"
+        elif not alive:
+            status = "down"
+        elif camera.last_report_at is None or camera.last_report_at < worker.started_at:
+            # A restarted worker that has not reported yet is still failing, not starting.
+            fresh = camera.error is None and now - worker.started_at < self.stale_after_seconds
+            status = "starting" if fresh else "stale"
+        else:
+            status = "ok" if now - camera.last_report_at < self.stale_after_seconds else "stale"
+        return {
+            "status": status,
+            "worker": camera.worker,
+            "fps": camera.report.get("fps", 0.0),
+            "frames": camera.report.get("frames", 0),
+            "tracks": camera.report.get("tracks", 0),
+            "last_report_age_s": round(now - camera.last_report_at, 1) if camera.last_report_at is not None else None,
+            "error": camera.error,
+        }
+
+    def _spawn(self, state: _WorkerState) -> None:
+        process = self._context.Process(
+            target=_worker_main,
+            args=(state.spec, self._events, self._stop, self.stats_interval_seconds),
+            name=f"camera-worker-{state.spec.name}",
+            daemon=False,
+        )
+        process.start()
+        with self._lock:
+            state.process = process
+            state.started_at = time.monotonic()
+        logger.info("Started worker %s (pid %s) for %s", state.spec.name, process.pid, [c.camera_id for c in state.spec.cameras])
+
+    def _run_monitor(self) -> None:
+        while not self._closing.is_set():
+            self._drain_events(timeout=0.25)
+            now = time.monotonic()
+            for state in self._workers.values():
+                self._check_worker(state, now)
+            if now - self._status_written_at >= self.stats_interval_seconds:
+                self._write_status()
+
+    def _check_worker(self, state: _WorkerState, now: float) -> None:
+        if state.finished or self._closing.is_set():
+            return
+        process = state.process
+        if process is not None and process.is_alive():
+            return
+        if process is not None:
+            # First sighting of the exit: record it and schedule the restart.
+            with self._lock:
+                state.last_exit_code = process.exitcode
+                state.process = None
+                if process.exitcode == 0 and all(camera.is_file for camera in state.spec.cameras):
+                    state.finished = True
+                    logger.info("Worker %s finished its video sources", state.spec.name)
+                    return
+                if now - state.started_at >= self.stable_seconds:
+                    state.backoff_s = self.restart_backoff_seconds
+                state.next_start_at = now + state.backoff_s
+                logger.warning(
+                    "Worker %s exited with code %s; restarting in %.1fs", state.spec.name, process.exitcode, state.backoff_s
+                )
+                state.backoff_s = min(state.backoff_s * 2, self.max_backoff_seconds)
+            return
+        if now >= state.next_start_at:
+            state.restarts += 1
+            self._spawn(state)
+
+    def _drain_events(self, timeout: float = 0.0) -> None:
+        while True:
+            try:
+                event = self._events.get(timeout=timeout) if timeout else self._events.get_nowait()
+            except queue.Empty:
+                return
+            timeout = 0.0
+            kind = event[0]
+            with self._lock:
+                if kind == "stats":
+                    camera = self._cameras.get(str(event[2].get("camera_id")))
+                    if camera is not None:
+                        camera.last_report_at = time.monotonic()
+                        camera.report = event[2]
+                        camera.error = None
+                elif kind == "error":
+                    camera = self._cameras.get(event[2])
+                    if camera is not None:
+                        camera.error = event[3]
+            if kind == "stats" and self.publish_occupancy is not None and "people" in event[2]:
+                self.publish_occupancy(str(event[2]["camera_id"]), int(event[2]["people"]))
+
+    def _write_status(self) -> None:
+        self._status_written_at = time.monotonic()
+        if not self.status_path:
+            return
+        path = pathlib.Path(self.status_path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+        os.replace(tmp, path)  # readers never see a half-written file
+
+
+def read_status(path: str | pathlib.Path, stale_after_seconds: float = settings.supervisor.stale_after_seconds) -> dict[str, Any]:
+    """Load a supervisor's status file; cameras are reported ``stale`` if the supervisor stopped writing it."""
+    path = pathlib.Path(path)
+    try:
+        status = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"status": "unknown", "workers": {}, "cameras": {}}
+    if time.time() - status.get("updated_at", 0.0) > stale_after_seconds:
+        for camera in status.get("cameras", {}).values():
+            camera["status"] = "stale"
+        status["status"] = "degraded"
+    return status
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run one tracker process per camera group and restart failed ones")
+    parser.add_argument("--config", default=settings.supervisor.config_path or None, required=not settings.supervisor.config_path)
+    parser.add_argument("--status-path", default=settings.supervisor.status_path, help="Where to write camera health JSON.")
+    parser.add_argument("--start-method", choices=["spawn", "forkserver", "fork"], default=settings.supervisor.start_method)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    supervisor = CameraSupervisor.from_config(args.config, status_path=args.status_path, start_method=args.start_method)
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    supervisor.start()
+    try:
+        while not stopped.wait(supervisor.stats_interval_seconds):
+            summary = {camera_id: (c["status"], c["fps"]) for camera_id, c in supervisor.snapshot()["cameras"].items()}
+            logger.info("Cameras: %s", summary)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterable, Sequence
+
+import numpy as np
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from app.analytics.heatmap import OccupancyHeatmap
+
+
+class TrajectoryBuffer:
+    """Fixed-size per-track path storage.
+
+    The most recent ``capacity`` points live in a NumPy ring buffer. Points pushed out of it are
+    thinned to every ``history_stride``-th one and kept in a second ring of ``history_capacity``
+    points, so long-lived tracks keep a coarse outline of their older path at constant memory.
+    Rows are ``(x, y, t)`` with ``t`` in seconds since ``t0`` (the first point's epoch time).
+    In float32 that is finer than 1 ms for the first 8192 s (~2.3 h) of a track and coarsens
+    to ~7.8 ms after a day, still well under a 30 fps frame interval.
+    """
+
+    __slots__ = (
+        "t0",
+        "_recent",
+        "_recent_head",
+        "_recent_size",
+        "_history",
+        "_history_head",
+        "_history_size",
+        "_evicted",
+        "history_stride",
+    )
+
+    def __init__(
+        self,
+        capacity: int = settings.tracking.path_capacity,
+        history_capacity: int = settings.tracking.path_history_capacity,
+        history_stride: int = settings.tracking.path_history_stride,
+    ) -> None:
+        self.t0: float | None = None
+        self._recent = np.empty((max(1, capacity), 3), dtype=np.float32)
+        self._recent_head = 0
+        self._recent_size = 0
+        self._history = np.empty((max(0, history_capacity), 3), dtype=np.float32)
+        self._history_head = 0
+        self._history_size = 0
+        self._evicted = 0
+        self.history_stride = max(1, history_stride)
+
+    def __len__(self) -> int:
+        return self._recent_size + self._history_size
+
+    @property
+    def nbytes(self) -> int:
+        return self._recent.nbytes + self._history.nbytes
+
+    def append(self, x: float, y: float, t: float) -> None:
+        """Add a point observed at epoch time ``t``."""
+        if self.t0 is None:
+            self.t0 = t
+        capacity = self._recent.shape[0]
+        if self._recent_size == capacity:
+            self._retire(self._recent[self._recent_head])
+        else:
+            self._recent_size += 1
+        self._recent[self._recent_head] = (x, y, t - self.t0)
+        self._recent_head = (self._recent_head + 1) % capacity
+
+    def last(self) -> tuple[float, float] | None:
+        if self._recent_size == 0:
+            return None
+        x, y, _ = self._recent[self._recent_head - 1]
+        return float(x), float(y)
+
+    def fill_tail(self, out: np.ndarray) -> int:
+        """Copy the newest ``len(out)`` recent points into the end of ``out``; returns how many."""
+        count = min(out.shape[0], self._recent_size)
+        if count == 0:
+            return 0
+        capacity = self._recent.shape[0]
+        start = (self._recent_head - count) % capacity
+        if start + count <= capacity:
+            out[-count:] = self._recent[start : start + count]
+        else:
+            split = capacity - start
+            out[-count : -count + split] = self._recent[start:]
+            out[-count + split :] = self._recent[: count - split]
+        return count
+
+    def recent(self) -> np.ndarray:
+        return self._ordered(self._recent, self._recent_head, self._recent_size)
+
+    def history(self) -> np.ndarray:
+        return self._ordered(self._history, self._history_head, self._history_size)
+
+    def points(self) -> np.ndarray:
+        """Downsampled history followed by the recent points, oldest first."""
+        return np.concatenate([self.history(), self.recent()])
+
+    def _retire(self, point: np.ndarray) -> None:
+        self._evicted += 1
+        capacity = self._history.shape[0]
+        if capacity == 0 or self._evicted % self.history_stride:
+            return
+        self._history[self._history_head] = point
+        self._history_head = (self._history_head + 1) % capacity
+        self._history_size = min(self._history_size + 1, capacity)
+
+    @staticmethod
+    def _ordered(buffer: np.ndarray, head: int, size: int) -> np.ndarray:
+        if size < buffer.shape[0]:
+            return buffer[:size].copy()
+        return np.concatenate([buffer[head:], buffer[:head]])
+
+
+def trajectory_memory_report(camera_id: str, paths: Iterable[TrajectoryBuffer]) -> dict[str, Any]:
+    tracks = 0
+    points = 0
+    nbytes = 0
+    for path in paths:
+        tracks += 1
+        points += len(path)
+        nbytes += path.nbytes
+    return {"camera_id": camera_id, "tracks": tracks, "points": points, "path_bytes": nbytes}
+
+
+@dataclass
+class Kinematics:
+    """Motion of many tracks over each track's last ``seconds`` of points, one row per input path.
+
+    ``speed_px_per_s`` is net displacement over the window divided by its duration (robust to
+    box jitter), ``acceleration_px_per_s2`` compares the speed of the window's second half with
+    its first. Rows with fewer than three points, or whose points span less than half the
+    window, are not ``valid`` and read 0.
+    """
+
+    position: np.ndarray
+    speed_px_per_s: np.ndarray
+    acceleration_px_per_s2: np.ndarray
+    valid: np.ndarray
+
+
+def track_kinematics(
+    paths: Sequence[TrajectoryBuffer],
+    seconds: float = settings.tracking.kinematics_seconds,
+    max_points: int = settings.tracking.kinematics_points,
+) -> Kinematics:
+    """Kinematics of every path from its newest ``max_points`` points within the last ``seconds``."""
+    max_points = max(3, max_points)
+    tails = np.zeros((len(paths), max_points, 3), dtype=np.float32)
+    counts = np.fromiter((path.fill_tail(tail) for path, tail in zip(paths, tails)), dtype=np.intp, count=len(paths))
+    rows = np.arange(len(paths))
+    times = tails[:, :, 2]
+    last = tails[:, -1]
+    # Points are oldest-first, so the first point inside a time range is the first True.
+    filled = np.arange(max_points) >= (max_points - counts)[:, None]
+    first_index = np.argmax(filled & (times >= last[:, 2:3] - seconds), axis=1)
+    first = tails[rows, first_index]
+    middle_index = np.argmax(filled & (times >= (first[:, 2:3] + last[:, 2:3]) / 2), axis=1)
+    middle = tails[rows, middle_index]
+
+    first_half = middle[:, 2] - first[:, 2]
+    second_half = last[:, 2] - middle[:, 2]
+    valid = (counts >= 3) & (first_half > 0) & (second_half > 0) & (first_half + second_half >= seconds / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = np.hypot(*(last[:, :2] - first[:, :2]).T) / (first_half + second_half)
+        early = np.hypot(*(middle[:, :2] - first[:, :2]).T) / first_half
+        late = np.hypot(*(last[:, :2] - middle[:, :2]).T) / second_half
+        acceleration = (late - early) / ((first_half + second_half) / 2)
+    return Kinematics(
+        position=last[:, :2],
+        speed_px_per_s=np.where(valid, speed, 0.0),
+        acceleration_px_per_s2=np.where(valid, acceleration, 0.0),
+        valid=valid,
+    )
+
+
+class TrajectoryMonitor:
+    """Per-camera motion analytics over all active tracks at once.
+
+    Each :meth:`update` computes every active track's kinematics in one NumPy pass and adds the
+    track positions to the camera's decayed occupancy heatmap. The speeds feed the camera's
+    :class:`~app.analytics.rules.RuleEngine`.
+    """
+
+    def __init__(
+        self,
+        camera_id: str,
+        heatmap: OccupancyHeatmap | None = None,
+        seconds: float = settings.tracking.kinematics_seconds,
+    ) -> None:
+        self.camera_id = camera_id
+        self.heatmap = heatmap
+        self.seconds = seconds
+        self.max_speed_px_per_s = 0.0
+
+    def update(self, paths: Sequence[TrajectoryBuffer], now: float) -> Kinematics:
+        kinematics = track_kinematics(paths, self.seconds)
+        if self.heatmap is not None:
+            self.heatmap.add(kinematics.position, now)
+        if len(paths):
+            self.max_speed_px_per_s = max(self.max_speed_px_per_s, float(kinematics.speed_px_per_s.max()))
+        return kinematics
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"max_speed_px_per_s": round(self.max_speed_px_per_s, 1)}
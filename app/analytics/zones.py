@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import pathlib
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Zone:
+    name: str
+    polygon: tuple[tuple[float, float], ...]
+    product_class: str | None = None
+
+    @property
+    def label(self) -> str:
+        return self.product_class or self.name
+
+
+def rectangle_zone(name: str, x1: float, y1: float, x2: float, y2: float, product_class: str | None = None) -> Zone:
+    return Zone(name, ((x1, y1), (x2, y1), (x2, y2), (x1, y2)), product_class)
+
+
+def load_zone_config(path: str | pathlib.Path) -> dict[str, list[Zone]]:
+    """Read ``{"cameras": {"<camera_id>": [{"name", "polygon": [[x, y], ...], "product_class"?}]}}``."""
+    raw = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+    zones: dict[str, list[Zone]] = {}
+    for camera_id, entries in raw.get("cameras", {}).items():
+        zones[str(camera_id)] = [
+            Zone(
+                name=entry["name"],
+                polygon=tuple((float(x), float(y)) for x, y in entry["polygon"]),
+                product_class=entry.get("product_class"),
+            )
+            for entry in entries
+        ]
+    return zones
+
+
+class ZoneIndex:
+    """Rasterized lookup table answering "which zones contain this point" in O(1).
+
+    Every polygon is filled into a label grid of ``cell_size``-pixel cells. Each distinct set of
+    overlapping zones gets one integer id, so a lookup is one array read and zone entry/exit
+    between two ids is a cached set difference.
+    """
+
+    def __init__(self, zones: list[Zone], width: int, height: int, cell_size: int = 4) -> None:
+        self.zones = zones
+        self.cell_size = max(1, cell_size)
+        grid_shape = (-(-height // self.cell_size), -(-width // self.cell_size))
+        self.grid = np.zeros(grid_shape, dtype=np.int32)
+        self.combos: list[tuple[int, ...]] = [()]
+        self._transitions: dict[tuple[int, int], tuple[tuple[int, ...], tuple[int, ...]]] = {}
+
+        combo_ids: dict[tuple[int, ...], int] = {(): 0}
+        mask = np.zeros(grid_shape, dtype=np.uint8)
+        for zone_idx, zone in enumerate(zones):
+            mask[...] = 0
+            polygon = np.round(np.asarray(zone.polygon, dtype=np.float64) / self.cell_size).astype(np.int32)
+            cv2.fillPoly(mask, [polygon], 1)
+            inside = mask.astype(bool)
+            if not inside.any():
+                continue
+
+            previous = self.grid[inside]
+            unique_previous, inverse = np.unique(previous, return_inverse=True)
+            remap = np.empty(unique_previous.shape[0], dtype=np.int32)
+            for i, old in enumerate(unique_previous.tolist()):
+                combo = self.combos[old] + (zone_idx,)
+                new_id = combo_ids.get(combo)
+                if new_id is None:
+                    new_id = len(self.combos)
+                    combo_ids[combo] = new_id
+                    self.combos.append(combo)
+                remap[i] = new_id
+            self.grid[inside] = remap[inverse]
+
+        # membership[c, z] is 1 when combo id ``c`` includes zone ``z``.
+        self.membership = np.zeros((len(self.combos), len(zones)), dtype=np.int64)
+        for combo_id, combo in enumerate(self.combos):
+            self.membership[combo_id, list(combo)] = 1
+
+    def combo_at(self, x: float, y: float) -> int:
+        row = int(y) // self.cell_size
+        col = int(x) // self.cell_size
+        if 0 <= row < self.grid.shape[0] and 0 <= col < self.grid.shape[1]:
+            return int(self.grid[row, col])
+        return 0
+
+    def combos_at(self, points: np.ndarray) -> np.ndarray:
+        cells = np.floor_divide(np.asarray(points, dtype=np.float64), self.cell_size).astype(np.int64)
+        cols, rows = cells[:, 0], cells[:, 1]
+        valid = (rows >= 0) & (rows < self.grid.shape[0]) & (cols >= 0) & (cols < self.grid.shape[1])
+        out = np.zeros(cells.shape[0], dtype=np.int32)
+        out[valid] = self.grid[rows[valid], cols[valid]]
+        return out
+
+    def counts_at(self, points: np.ndarray) -> np.ndarray:
+        """Number of ``(N, 2)`` points inside each zone, in ``zones`` order."""
+        if len(points) == 0:
+            return np.zeros(len(self.zones), dtype=np.int64)
+        return np.bincount(self.combos_at(points), minlength=len(self.combos)) @ self.membership
+
+    def zones_at(self, x: float, y: float) -> list[Zone]:
+        return [self.zones[i] for i in self.combos[self.combo_at(x, y)]]
+
+    def transition(self, old: int, new: int) -> tuple[tuple[int, ...], tuple[int, ...]]:
+        """Return (entered, exited) zone indices when moving from combo ``old`` to ``new``."""
+        key = (old, new)
+        cached = self._transitions.get(key)
+        if cached is None:
+            before, after = set(self.combos[old]), set(self.combos[new])
+            cached = (tuple(sorted(after - before)), tuple(sorted(before - after)))
+            self._transitions[key] = cached
+        return cached
+
+
+@dataclass
+class ZoneExit:
+    zone: Zone
+    dwell_seconds: float
+
+
+@dataclass
+class ZoneDwell:
+    """Per-track zone occupancy and accumulated dwell, keyed by zone index."""
+
+    combo: int = 0
+    entered_at: dict[int, datetime] = field(default_factory=dict)
+    dwell_seconds: dict[int, float] = field(default_factory=dict)
+
+    def update(self, index: ZoneIndex, combo: int, now: datetime) -> list[ZoneExit]:
+        if combo == self.combo:
+            return []
+        entered, exited = index.transition(self.combo, combo)
+        self.combo = combo
+        for zone_idx in entered:
+            self.entered_at[zone_idx] = now
+        return [self._exit(index, zone_idx, now) for zone_idx in exited]
+
+    def close(self, index: ZoneIndex, now: datetime) -> list[ZoneExit]:
+        exits = [self._exit(index, zone_idx, now) for zone_idx in list(self.entered_at)]
+        self.combo = 0
+        return exits
+
+    def total_seconds(self, now: datetime | None = None) -> float:
+        total = sum(self.dwell_seconds.values())
+        if now is not None:
+            total += sum((now - started).total_seconds() for started in self.entered_at.values())
+        return total
+
+    def _exit(self, index: ZoneIndex, zone_idx: int, now: datetime) -> ZoneExit:
+        started = self.entered_at.pop(zone_idx)
+        seconds = (now - started).total_seconds()
+        self.dwell_seconds[zone_idx] = self.dwell_seconds.get(zone_idx, 0.0) + seconds
+        return ZoneExit(index.zones[zone_idx], seconds)
+
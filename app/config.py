@@ -9,13 +9,155 @@ class DetectionConfig(BaseModel):
     confidence_threshold: float = 0.5
     target_classes: list[str] = ["person", "bottle", "backpack"]
     custom_product_classes: list[str] = []
+    backend: str = "auto"
+    onnx_model_path: str = ""
+    onnx_intra_op_threads: int = 0
+    onnx_inter_op_threads: int = 1
+    onnx_providers: list[str] = ["CPUExecutionProvider"]
+    iou_threshold: float = 0.45
+    warmup_runs: int = 2
 
 
 class AlertConfig(BaseModel):
     loitering_seconds: int = 300
     overcrowding_threshold: int = 20
+    overcrowding_seconds: float = 30.0
+    overcrowding_hysteresis: int = 2
     rapid_movement_threshold: float = 220.0
     shelf_empty_seconds: int = 90
+    rules_path: str = ""
+    cooldown_seconds: float = 60.0
+    coalesce_seconds: float = 2.0
+    max_retries: int = 3
+    retry_backoff_seconds: float = 1.0
+    queue_size: int = 1000
+    log_path: str = ""
+    persist_to_db: bool = True
+
+
+class TrackingConfig(BaseModel):
+    lost_timeout_seconds: float = 2.0
+    path_capacity: int = 256
+    path_history_capacity: int = 256
+    path_history_stride: int = 10
+    kinematics_points: int = 32
+    kinematics_seconds: float = 1.0
+
+
+class ReIdConfig(BaseModel):
+    enabled: bool = False
+    similarity_threshold: float = 0.7
+    window_seconds: float = 1800.0
+    active_seconds: float = 1.0
+    embedding_momentum: float = 0.9
+    search: str = "auto"
+    approximate_min_size: int = 5000
+    projection_dim: int = 96
+    rerank_candidates: int = 64
+
+
+class HeatmapConfig(BaseModel):
+    cell_size: int = 16
+    half_life_seconds: float = 900.0
+    save_interval_seconds: float = 60.0
+    batch_chunk_rows: int = 50000
+
+
+class CadenceConfig(BaseModel):
+    enabled: bool = False
+    min_interval: int = 1
+    max_interval: int = 5
+    motion_threshold: float = 0.015
+    motion_width: int = 80
+
+
+class PipelineConfig(BaseModel):
+    queue_size: int = 4
+    drop_policy: str = "drop_oldest"
+
+
+class DatabaseConfig(BaseModel):
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout_seconds: float = 30.0
+    pool_recycle_seconds: float = 1800.0
+    pool_pre_ping: bool = True
+    query_cache_size: int = 500
+    prepared_statement_cache_size: int = 100
+    transaction_pooler: bool | None = None
+    pooler_recycle_seconds: float = 300.0
+
+
+class TelemetryConfig(BaseModel):
+    batch_size: int = 2000
+    flush_interval_seconds: float = 1.0
+    max_pending_events: int = 50000
+    max_flush_attempts: int = 5
+    retry_backoff_seconds: float = 0.5
+    max_backoff_seconds: float = 10.0
+
+
+class RetentionConfig(BaseModel):
+    partition_days_ahead: int = 7
+    movements_retention_days: int = 90
+    downsample_after_days: int = 14
+    downsample_seconds: float = 5.0
+    detach_lock_timeout_ms: int = 2000
+
+
+class ExportConfig(BaseModel):
+    output_dir: str = "exports"
+    chunk_rows: int = 50000
+    row_group_rows: int = 250000
+    parquet_compression: str = "zstd"
+    csv_compresslevel: int = 6
+    api_base_url: str = "http://127.0.0.1:8000"
+
+
+class InferenceConfig(BaseModel):
+    max_batch_size: int = 8
+    max_wait_ms: float = 10.0
+
+
+class PreviewConfig(BaseModel):
+    fps: float = 2.0
+    jpeg_quality: int = 80
+
+
+class RealtimeConfig(BaseModel):
+    coalesce_seconds: float = 0.25
+    client_queue_size: int = 32
+    # A tracker POSTs its people count here with each stats report (e.g. http://api:8000/occupancy).
+    publish_url: str = ""
+
+
+class IngestConfig(BaseModel):
+    enabled: bool = True
+    max_body_bytes: int = 8_000_000
+    max_batch_events: int = 20000
+    max_errors_reported: int = 20
+    retry_after_seconds: float = 1.0
+
+
+class MetricsConfig(BaseModel):
+    enabled: bool = True
+    profiler_enabled: bool = False
+    max_profile_seconds: float = 60.0
+    profile_hz: float = 100.0
+
+
+class SupervisorConfig(BaseModel):
+    config_path: str = ""
+    embedded: bool = False
+    status_path: str = ""
+    start_method: str = "spawn"
+    stats_interval_seconds: float = 5.0
+    stale_after_seconds: float = 15.0
+    restart_backoff_seconds: float = 1.0
+    max_backoff_seconds: float = 60.0
+    stable_seconds: float = 60.0
+    low_fps_threshold: float = 8.0
+    max_cameras_per_worker: int = 4
 
 
 class Settings(BaseSettings):
@@ -30,6 +172,21 @@ class Settings(BaseSettings):
 
     detection: DetectionConfig = DetectionConfig()
     alerts: AlertConfig = AlertConfig()
+    tracking: TrackingConfig = TrackingConfig()
+    reid: ReIdConfig = ReIdConfig()
+    heatmap: HeatmapConfig = HeatmapConfig()
+    cadence: CadenceConfig = CadenceConfig()
+    pipeline: PipelineConfig = PipelineConfig()
+    database: DatabaseConfig = DatabaseConfig()
+    telemetry: TelemetryConfig = TelemetryConfig()
+    retention: RetentionConfig = RetentionConfig()
+    export: ExportConfig = ExportConfig()
+    inference: InferenceConfig = InferenceConfig()
+    preview: PreviewConfig = PreviewConfig()
+    realtime: RealtimeConfig = RealtimeConfig()
+    ingest: IngestConfig = IngestConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    supervisor: SupervisorConfig = SupervisorConfig()
 
 
 settings = Settings()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import threading
+import uuid
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import URL, Engine, create_engine, make_url
+
+from app.config import DatabaseConfig, settings
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+# Supabase's transaction-mode pooler listens on 6543; direct and session-mode connections use 5432.
+TRANSACTION_POOLER_PORT = 6543
+
+
+def uses_transaction_pooler(url: str | URL, config: DatabaseConfig = settings.database) -> bool:
+    """Whether ``url`` goes through a transaction-mode pooler (``database.transaction_pooler``,
+    or a PostgreSQL URL on port 6543 when that is unset)."""
+    if config.transaction_pooler is not None:
+        return config.transaction_pooler
+    url = make_url(url)
+    return url.get_backend_name() == "postgresql" and url.port == TRANSACTION_POOLER_PORT
+
+
+def async_url(url: str | URL) -> URL:
+    """``url`` with the asyncio driver: asyncpg for PostgreSQL, aiosqlite for SQLite."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        query = dict(url.query)
+        # libpq's sslmode=require is asyncpg's ssl=require.
+        sslmode = query.pop("sslmode", None)
+        if sslmode is not None:
+            query["ssl"] = sslmode
+        return url.set(drivername="postgresql+asyncpg", query=query)
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def _pool_options(url: URL, config: DatabaseConfig) -> dict[str, Any]:
+    if url.get_backend_name() == "sqlite":
+        return {}
+    recycle = config.pool_recycle_seconds
+    if uses_transaction_pooler(url, config):
+        # Poolers drop idle client connections; recycle ours before they do.
+        recycle = min(recycle, config.pooler_recycle_seconds)
+    return {
+        "pool_size": config.pool_size,
+        "max_overflow": config.max_overflow,
+        "pool_timeout": config.pool_timeout_seconds,
+        "pool_recycle": recycle,
+        "pool_pre_ping": config.pool_pre_ping,
+    }
+
+
+def create_db_engine(url: str | URL | None = None, config: DatabaseConfig = settings.database, **kwargs: Any) -> Engine:
+    """A pooled engine for ``url`` (default ``settings.postgres_url``) sized by ``settings.database``.
+
+    psycopg2 never prepares statements server-side, so the same options work directly and
+    behind a transaction pooler. SQLite URLs (local testing) keep SQLAlchemy's default pool.
+    """
+    url = make_url(url or settings.postgres_url)
+    options: dict[str, Any] = {"query_cache_size": config.query_cache_size, **_pool_options(url, config)}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    options.update(kwargs)
+    return create_engine(url, **options)
+
+
+def create_async_db_engine(
+    url: str | URL | None = None, config: DatabaseConfig = settings.database, **kwargs: Any
+) -> AsyncEngine:
+    """The asyncio counterpart of :func:`create_db_engine`, for the API's endpoints.
+
+    asyncpg prepares every statement and caches it per connection. Behind a transaction pooler
+    consecutive transactions can land on different server connections, so that cache is turned
+    off and statements get unique names; SQLAlchemy's compiled-SQL cache
+    (``query_cache_size``) still applies.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_url(url or settings.postgres_url)
+    options: dict[str, Any] = {"query_cache_size": config.query_cache_size, **_pool_options(url, config)}
+    if url.get_backend_name() == "postgresql":
+        if uses_transaction_pooler(url, config):
+            url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4().hex}__",
+            }
+        else:
+            url = url.update_query_dict({"prepared_statement_cache_size": str(config.prepared_statement_cache_size)})
+    options.update(kwargs)
+    return create_async_engine(url, **options)
+
+
+def async_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    # Rows are serialized after the session closes, so keep attributes loaded on commit.
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+_ENGINES: dict[str, Engine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def shared_engine(url: str | URL | None = None) -> Engine:
+    """One pooled :func:`create_db_engine` per URL for the whole process."""
+    key = make_url(url or settings.postgres_url).render_as_string(hide_password=False)
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = _ENGINES[key] = create_db_engine(key)
+        return engine
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import csv
+import io
+import os
+import shutil
+import time
+import urllib.parse
+import zlib
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import DateTime, Engine, Float, Integer, Row, Select, select
+
+from app.config import settings
+from app.db.models import Alert, Customer, Movement, ProductInteraction
+
+FORMATS = ("parquet", "csv")
+# Hive's name for a NULL partition value, which pyarrow/Spark/DuckDB read back as null.
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _movements(start: datetime, end: datetime) -> Select[Any]:
+    return (
+        select(
+            Movement.id,
+            Movement.customer_id,
+            Movement.camera_id,
+            Movement.timestamp,
+            Movement.x_coordinate,
+            Movement.y_coordinate,
+        )
+        .where(Movement.timestamp >= start, Movement.timestamp < end)
+        .order_by(Movement.camera_id, Movement.timestamp)
+    )
+
+
+def _customers(start: datetime, end: datetime) -> Select[Any]:
+    return (
+        select(
+            Customer.id,
+            Customer.customer_key,
+            Customer.camera_id,
+            Customer.entry_time,
+            Customer.exit_time,
+            Customer.total_time_spent,
+        )
+        .where(Customer.entry_time >= start, Customer.entry_time < end)
+        .order_by(Customer.camera_id, Customer.entry_time)
+    )
+
+
+def _alerts(start: datetime, end: datetime) -> Select[Any]:
+    return (
+        select(Alert.id, Alert.alert_type, Alert.camera_id, Alert.timestamp, Alert.severity)
+        .where(Alert.timestamp >= start, Alert.timestamp < end)
+        .order_by(Alert.camera_id, Alert.timestamp)
+    )
+
+
+def _product_interactions(start: datetime, end: datetime) -> Select[Any]:
+    # Interactions have no timestamp of their own; they are dated by the customer's entry.
+    return (
+        select(
+            ProductInteraction.id,
+            ProductInteraction.customer_id,
+            Customer.camera_id,
+            Customer.entry_time,
+            ProductInteraction.product_class,
+            ProductInteraction.dwell_time,
+        )
+        .join(Customer, Customer.id == ProductInteraction.customer_id)
+        .where(Customer.entry_time >= start, Customer.entry_time < end)
+        .order_by(Customer.camera_id, Customer.entry_time)
+    )
+
+
+# Each query is ordered by camera (served by the (camera_id, time) indexes), so the Parquet
+# writer only ever has one camera's file open and one row group buffered.
+EXPORT_TABLES: dict[str, Callable[[datetime, datetime], Select[Any]]] = {
+    "movements": _movements,
+    "customers": _customers,
+    "alerts": _alerts,
+    "product_interactions": _product_interactions,
+}
+
+
+@dataclass
+class ExportResult:
+    table: str
+    format: str
+    days: int = 0
+    rows: int = 0
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "table": self.table,
+            "format": self.format,
+            "days": self.days,
+            "rows": self.rows,
+            "files": self.files,
+            "mb": round(self.bytes / (1024.0 * 1024.0), 2),
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows / self.seconds, 1) if self.seconds else 0.0,
+        }
+
+
+def _query(table: str, start: datetime, end: datetime) -> Select[Any]:
+    try:
+        build = EXPORT_TABLES[table]
+    except KeyError:
+        raise ValueError(f"Unknown export table {table!r}; expected one of {sorted(EXPORT_TABLES)}") from None
+    return build(start, end)
+
+
+def _days(start: date, end: date) -> Iterator[tuple[date, datetime, datetime]]:
+    day = start
+    while day <= end:
+        window_start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        yield day, window_start, window_start + timedelta(days=1)
+        day += timedelta(days=1)
+
+
+def iter_chunks(
+    engine: Engine, table: str, start: datetime, end: datetime, chunk_rows: int = settings.export.chunk_rows
+) -> Iterator[Sequence[Row[Any]]]:
+    """``table``'s rows in ``[start, end)`` as lists of at most ``chunk_rows`` rows.
+
+    ``yield_per`` makes psycopg2 use a server-side (named) cursor, so only one chunk is in
+    memory at a time; SQLite fetches the same way from its own cursor. Rows come from a Core
+    connection: the ORM's per-row processing would cost more than the export itself.
+    """
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=chunk_rows).execute(_query(table, start, end))
+        yield from result.partitions()
+
+
+def column_names(table: str) -> list[str]:
+    return [column.name for column in _query(table, datetime.min, datetime.max).selected_columns]
+
+
+def iter_csv_gzip(
+    engine: Engine,
+    table: str,
+    start: date,
+    end: date,
+    chunk_rows: int = settings.export.chunk_rows,
+    compresslevel: int = settings.export.csv_compresslevel,
+    result: ExportResult | None = None,
+) -> Iterator[bytes]:
+    """Gzip-compressed CSV of ``table`` for the days ``start``..``end`` (UTC), one piece per chunk.
+
+    The pieces concatenate into a single gzip member, so they can be written to a file or sent
+    as an HTTP body as they come. Rows are counted into ``result`` when given.
+    """
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 31)  # wbits 31: gzip framing
+    text = io.StringIO()
+    writer = csv.writer(text, lineterminator="\n")
+    writer.writerow(column_names(table))
+    for _, window_start, window_end in _days(start, end):
+        for chunk in iter_chunks(engine, table, window_start, window_end, chunk_rows):
+            writer.writerows(chunk)
+            if result is not None:
+                result.rows += len(chunk)
+            piece = compressor.compress(text.getvalue().encode())
+            text.seek(0)
+            text.truncate()
+            if piece:
+                yield piece
+    yield compressor.compress(text.getvalue().encode()) + compressor.flush()
+
+
+def _export_csv(engine: Engine, table: str, start: date, end: date, out_dir: Path, result: ExportResult, **options: Any) -> None:
+    path = out_dir / f"{table}_{start.isoformat()}_{end.isoformat()}.csv.gz"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".tmp")
+    with partial.open("wb") as handle:
+        for piece in iter_csv_gzip(engine, table, start, end, result=result, **options):
+            handle.write(piece)
+    os.replace(partial, path)
+    result.days = (end - start).days + 1
+    result.files = 1
+    result.bytes = path.stat().st_size
+
+
+def _arrow_schema(table: str) -> Any:
+    import pyarrow as pa
+
+    fields = []
+    for column in _query(table, datetime.min, datetime.max).selected_columns:
+        if isinstance(column.type, DateTime):
+            kind = pa.timestamp("us", tz="UTC")
+        elif isinstance(column.type, Integer):
+            kind = pa.int64()
+        elif isinstance(column.type, Float):
+            kind = pa.float64()
+        else:
+            kind = pa.string()
+        fields.append(pa.field(column.name, kind))
+    return pa.schema(fields)
+
+
+class _ParquetDay:
+    """Writes one day of rows, ordered by camera, as ``camera_id=<id>/part-0.parquet`` files under
+    ``day_dir`` with row groups of up to ``row_group_rows``."""
+
+    def __init__(self, day_dir: Path, schema: Any, row_group_rows: int, compression: str) -> None:
+        import pyarrow.parquet as pq
+
+        self._pq = pq
+        self.day_dir = day_dir
+        self.schema = schema
+        self.camera_index = schema.get_field_index("camera_id")
+        # camera_id is the partition directory, not a column in the file.
+        self.file_schema = schema.remove(self.camera_index)
+        self.row_group_rows = row_group_rows
+        self.compression = compression
+        self.files: list[Path] = []
+        self.rows = 0
+        self._writer: Any = None
+        self._camera_id: str | None = None
+        self._partial: Path | None = None
+        self._buffer: list[Row[Any]] = []
+
+    def write(self, chunk: Sequence[Row[Any]]) -> None:
+        for camera_id, rows in groupby(chunk, key=itemgetter(self.camera_index)):
+            if self._writer is None or camera_id != self._camera_id:
+                self._close_file()
+                self._open_file(camera_id)
+            self._buffer.extend(rows)
+            if len(self._buffer) >= self.row_group_rows:
+                self._flush()
+
+    def close(self) -> None:
+        self._close_file()
+
+    def _open_file(self, camera_id: str | None) -> None:
+        partition = NULL_PARTITION if camera_id is None else urllib.parse.quote(str(camera_id), safe="")
+        path = self.day_dir / f"camera_id={partition}" / "part-0.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._camera_id = camera_id
+        self._partial = path.with_name(path.name + ".tmp")
+        self._writer = self._pq.ParquetWriter(self._partial, self.file_schema, compression=self.compression)
+
+    def _flush(self) -> None:
+        import pyarrow as pa
+
+        if not self._buffer:
+            return
+        columns = list(zip(*self._buffer))
+        del columns[self.camera_index]
+        arrays = [pa.array(values, type=field.type) for values, field in zip(columns, self.file_schema)]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.file_schema), row_group_size=self.row_group_rows)
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+    def _close_file(self) -> None:
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.close()
+        assert self._partial is not None
+        final = self._partial.with_name(self._partial.name.removesuffix(".tmp"))
+        os.replace(self._partial, final)
+        self.files.append(final)
+        self._writer = None
+
+
+def _export_parquet(
+    engine: Engine,
+    table: str,
+    start: date,
+    end: date,
+    out_dir: Path,
+    result: ExportResult,
+    chunk_rows: int,
+    row_group_rows: int,
+    compression: str,
+) -> None:
+    try:
+        schema = _arrow_schema(table)
+    except ImportError as exc:
+        raise RuntimeError("pyarrow is required for Parquet exports (or use --format csv)") from exc
+    for day, window_start, window_end in _days(start, end):
+        # Replace the whole day so a re-run drops cameras that no longer have rows.
+        day_dir = out_dir / table / f"date={day.isoformat()}"
+        shutil.rmtree(day_dir, ignore_errors=True)
+        writer = _ParquetDay(day_dir, schema, row_group_rows, compression)
+        try:
+            for chunk in iter_chunks(engine, table, window_start, window_end, chunk_rows):
+                writer.write(chunk)
+        finally:
+            writer.close()
+        result.days += 1
+        result.rows += writer.rows
+        result.files += len(writer.files)
+        result.bytes += sum(path.stat().st_size for path in writer.files)
+
+
+def export_table(
+    engine: Engine,
+    table: str,
+    start: date,
+    end: date,
+    out_dir: str | Path = settings.export.output_dir,
+    fmt: str = "parquet",
+    chunk_rows: int = settings.export.chunk_rows,
+    row_group_rows: int = settings.export.row_group_rows,
+    compression: str = settings.export.parquet_compression,
+    compresslevel: int = settings.export.csv_compresslevel,
+) -> ExportResult:
+    """Stream ``table``'s rows for the days ``start``..``end`` (UTC) to files under ``out_dir``.
+
+    ``parquet`` writes ``<table>/date=YYYY-MM-DD/camera_id=<id>/part-0.parquet`` (Hive-style
+    partitions that pyarrow, DuckDB and Spark read as columns); ``csv`` writes one
+    ``<table>_<start>_<end>.csv.gz``. Memory stays at one ``chunk_rows`` chunk plus one
+    ``row_group_rows`` row group whatever the range, and re-running a range replaces its files.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}, got {fmt!r}")
+    _query(table, datetime.min, datetime.max)  # validate the table name before touching files
+    result = ExportResult(table, fmt)
+    started = time.perf_counter()
+    if fmt == "csv":
+        _export_csv(engine, table, start, end, Path(out_dir), result, chunk_rows=chunk_rows, compresslevel=compresslevel)
+    else:
+        _export_parquet(engine, table, start, end, Path(out_dir), result, chunk_rows, row_group_rows, compression)
+    result.seconds = time.perf_counter() - started
+    return result
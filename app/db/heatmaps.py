@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.models import Heatmap
+
+# numpy is only imported to decode grids, so the API's telemetry writer does not load it.
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+LIVE = "live"
+DAILY = "daily"
+
+
+def upsert_heatmaps(session: Session, rows: list[tuple[str, str, datetime, NDArray[Any], int]]) -> int:
+    """Insert or replace ``(kind, camera_id, bucket_start, grid, cell_size)`` heatmaps."""
+    if not rows:
+        return 0
+    now = datetime.now(timezone.utc)
+    values = [
+        {
+            "kind": kind,
+            "camera_id": camera_id,
+            "bucket_start": bucket_start,
+            "grid_rows": grid.shape[0],
+            "grid_cols": grid.shape[1],
+            "cell_size": cell_size,
+            "counts": grid.astype("<f4", copy=False).tobytes(),
+            "total": float(grid.sum()),
+            "updated_at": now,
+        }
+        for kind, camera_id, bucket_start, grid, cell_size in rows
+    ]
+    insert = postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = insert(Heatmap)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["kind", "camera_id", "bucket_start"],
+        set_={
+            column: stmt.excluded[column]
+            for column in ("grid_rows", "grid_cols", "cell_size", "counts", "total", "updated_at")
+        },
+    )
+    session.execute(stmt, values)
+    return len(values)
+
+
+def load_heatmaps(
+    session: Session,
+    kind: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    camera_id: str | None = None,
+) -> list[dict[str, Any]]:
+    """Stored heatmaps of ``kind`` with ``start <= bucket_start < end``, each with its ``grid`` decoded."""
+    import numpy as np
+
+    query = select(Heatmap).where(Heatmap.kind == kind)
+    if start is not None:
+        query = query.where(Heatmap.bucket_start >= start)
+    if end is not None:
+        query = query.where(Heatmap.bucket_start < end)
+    if camera_id is not None:
+        query = query.where(Heatmap.camera_id == camera_id)
+    return [
+        {
+            "camera_id": row.camera_id,
+            "bucket_start": row.bucket_start,
+            "cell_size": row.cell_size,
+            "updated_at": row.updated_at,
+            "grid": np.frombuffer(row.counts, dtype="<f4").reshape(row.grid_rows, row.grid_cols),
+        }
+        for row in session.scalars(query.order_by(Heatmap.camera_id, Heatmap.bucket_start))
+    ]
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Row, Select, func, select
+
+from app.db.models import Alert, Customer
+
+# The queries are plain Selects so the API (AsyncSession) and scripts (Session) run the same SQL.
+
+
+def alert_history_query(
+    camera_id: str | None = None, alert_type: str | None = None, since: datetime | None = None, limit: int = 100
+) -> Select[Any]:
+    """Newest alerts first, optionally for one camera and/or type; ``idx_alerts_camera_time`` covers the camera filter."""
+    query = select(Alert.id, Alert.alert_type, Alert.timestamp, Alert.camera_id, Alert.severity)
+    if camera_id is not None:
+        query = query.where(Alert.camera_id == camera_id)
+    if alert_type is not None:
+        query = query.where(Alert.alert_type == alert_type)
+    if since is not None:
+        query = query.where(Alert.timestamp >= since)
+    return query.order_by(Alert.timestamp.desc(), Alert.id.desc()).limit(limit)
+
+
+def in_store_query(hours: float = 12.0, now: datetime | None = None) -> Select[Any]:
+    """Customers per camera who entered in the last ``hours`` and have not exited.
+
+    The window keeps tracks that never got an exit (a crashed tracker) from counting forever.
+    """
+    since = (now or datetime.now(timezone.utc)) - timedelta(hours=hours)
+    return (
+        select(Customer.camera_id, func.count().label("customers"), func.min(Customer.entry_time).label("earliest_entry"))
+        .where(Customer.exit_time.is_(None), Customer.entry_time >= since)
+        .group_by(Customer.camera_id)
+        .order_by(Customer.camera_id)
+    )
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        # SQLite hands back naive datetimes; the writers store UTC.
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def alert_rows(rows: list[Row[Any]]) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": row.id,
+            "alert_type": row.alert_type,
+            "timestamp": _isoformat(row.timestamp),
+            "camera_id": row.camera_id,
+            "severity": row.severity,
+        }
+        for row in rows
+    ]
+
+
+def in_store_rows(rows: list[Row[Any]]) -> dict[str, Any]:
+    cameras = {
+        row.camera_id or "unknown": {"customers": row.customers, "earliest_entry": _isoformat(row.earliest_entry)}
+        for row in rows
+    }
+    return {"total": sum(camera["customers"] for camera in cameras.values()), "cameras": cameras}
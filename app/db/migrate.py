@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import pathlib
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import Connection, Engine, text
+
+MIGRATIONS_DIR = pathlib.Path(__file__).with_name("migrations")
+_MIGRATION_FILE = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+# Arbitrary constant key so concurrent migrators (e.g. several API replicas starting) serialize.
+_ADVISORY_LOCK_KEY = 0x52565343
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode("utf-8")).hexdigest()
+
+    @property
+    def label(self) -> str:
+        return f"{self.version:04d}_{self.name}"
+
+
+def split_sql_statements(sql_text: str) -> list[str]:
+    """Split on top-level semicolons, keeping ``$$``-quoted bodies (DO blocks, functions) intact."""
+    chunks = []
+    current: list[str] = []
+    in_dollar_quote = False
+    for line in sql_text.splitlines():
+        stripped = line.strip()
+        if not in_dollar_quote and (not stripped or stripped.startswith("--")):
+            continue
+        current.append(line)
+        if line.count("$$") % 2 == 1:
+            in_dollar_quote = not in_dollar_quote
+        if not in_dollar_quote and stripped.endswith(";"):
+            chunks.append("\n".join(current).strip())
+            current = []
+    if current:
+        chunks.append("\n".join(current).strip())
+    return chunks
+
+
+def discover_migrations(directory: pathlib.Path = MIGRATIONS_DIR) -> list[Migration]:
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        match = _MIGRATION_FILE.match(path.name)
+        if match is None:
+            raise MigrationError(f"Unexpected migration file name: {path.name} (expected NNNN_name.sql)")
+        migrations.append(Migration(int(match.group(1)), match.group(2), path.read_text(encoding="utf-8")))
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise MigrationError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def _ensure_version_table(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(120) NOT NULL,
+            checksum VARCHAR(64) NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+    )
+
+
+def applied_versions(conn: Connection) -> dict[int, str]:
+    _ensure_version_table(conn)
+    return {version: checksum for version, checksum in conn.execute(text("SELECT version, checksum FROM schema_migrations"))}
+
+
+def pending_migrations(engine: Engine, migrations: list[Migration] | None = None) -> list[Migration]:
+    migrations = discover_migrations() if migrations is None else migrations
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+    _check_drift(migrations, applied)
+    return [m for m in migrations if m.version not in applied]
+
+
+def migrate(engine: Engine, target: int | None = None, migrations: list[Migration] | None = None) -> list[Migration]:
+    """Apply pending migrations up to ``target`` in order, each in its own transaction.
+
+    Re-running is a no-op. A migration whose file changed after it was applied is an error
+    rather than being silently skipped or re-applied.
+    """
+    if engine.dialect.name != "postgresql":
+        raise MigrationError(
+            f"Migrations target PostgreSQL; {engine.dialect.name} databases are created from app.db.models"
+        )
+    migrations = discover_migrations() if migrations is None else migrations
+    applied_now = []
+    for migration in migrations:
+        if target is not None and migration.version > target:
+            break
+        with engine.begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+            applied = applied_versions(conn)
+            _check_drift(migrations, applied)
+            if migration.version in applied:
+                continue
+            # Raw cursor without parameters: DBAPI paramstyles would treat the ``%`` in format()
+            # calls inside DO blocks as placeholders.
+            with conn.connection.cursor() as cursor:
+                for statement in split_sql_statements(migration.sql):
+                    cursor.execute(statement)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name, checksum) VALUES (:version, :name, :checksum)"),
+                {"version": migration.version, "name": migration.name, "checksum": migration.checksum},
+            )
+        applied_now.append(migration)
+    return applied_now
+
+
+def _check_drift(migrations: list[Migration], applied: dict[int, str]) -> None:
+    for migration in migrations:
+        checksum = applied.get(migration.version)
+        if checksum is not None and checksum != migration.checksum:
+            raise MigrationError(f"Migration {migration.label} was modified after it was applied")
@@ -1,10 +1,17 @@
 CREATE TABLE IF NOT EXISTS customers (
     id SERIAL PRIMARY KEY,
+    customer_key VARCHAR(36) UNIQUE,
+    camera_id VARCHAR(80),
     entry_time TIMESTAMPTZ NOT NULL,
     exit_time TIMESTAMPTZ,
     total_time_spent DOUBLE PRECISION
 );
 
+ALTER TABLE customers ADD COLUMN IF NOT EXISTS customer_key VARCHAR(36);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_customers_customer_key ON customers(customer_key);
+ALTER TABLE customers ADD COLUMN IF NOT EXISTS camera_id VARCHAR(80);
+CREATE INDEX IF NOT EXISTS idx_customers_exit_time ON customers(exit_time);
+
 CREATE TABLE IF NOT EXISTS movements (
     id SERIAL PRIMARY KEY,
     customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
@@ -33,3 +40,20 @@ CREATE TABLE IF NOT EXISTS product_interactions (
 );
 
 CREATE INDEX IF NOT EXISTS idx_product_interactions_customer ON product_interactions(customer_id);
+
+CREATE TABLE IF NOT EXISTS analytics_rollups (
+    granularity VARCHAR(8) NOT NULL,
+    metric VARCHAR(40) NOT NULL,
+    bucket_start TIMESTAMPTZ NOT NULL,
+    camera_id VARCHAR(80) NOT NULL,
+    dimension VARCHAR(120) NOT NULL,
+    value_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    value_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, metric, bucket_start, camera_id, dimension)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    source VARCHAR(40) PRIMARY KEY,
+    last_id INTEGER,
+    last_timestamp TIMESTAMPTZ
+);
@@ -0,0 +1,52 @@
+-- Camera-scoped indexes for time-window queries, and daily range partitioning of movements so
+-- retention drops whole partitions instead of deleting rows. Existing movements are copied into
+-- per-day partitions; app/db/partitions.py creates upcoming days and applies retention.
+
+CREATE INDEX IF NOT EXISTS idx_customers_camera_entry ON customers(camera_id, entry_time);
+CREATE INDEX IF NOT EXISTS idx_customers_entry_time ON customers(entry_time);
+CREATE INDEX IF NOT EXISTS idx_alerts_camera_time ON alerts(camera_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_alerts_time ON alerts(timestamp DESC);
+
+ALTER TABLE movements RENAME TO movements_legacy;
+ALTER INDEX IF EXISTS idx_movements_customer_time RENAME TO idx_movements_legacy_customer_time;
+ALTER SEQUENCE IF EXISTS movements_id_seq RENAME TO movements_legacy_id_seq;
+
+CREATE TABLE movements (
+    id BIGSERIAL,
+    customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+    camera_id VARCHAR(80),
+    timestamp TIMESTAMPTZ NOT NULL,
+    x_coordinate DOUBLE PRECISION NOT NULL,
+    y_coordinate DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE movements_default PARTITION OF movements DEFAULT;
+
+DO $$
+DECLARE
+    day DATE;
+BEGIN
+    FOR day IN SELECT DISTINCT (timestamp AT TIME ZONE 'UTC')::date FROM movements_legacy LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF movements FOR VALUES FROM (%L) TO (%L)',
+            'movements_p' || to_char(day, 'YYYYMMDD'),
+            day::timestamp AT TIME ZONE 'UTC',
+            (day + 1)::timestamp AT TIME ZONE 'UTC'
+        );
+    END LOOP;
+END
+$$;
+
+INSERT INTO movements (id, customer_id, camera_id, timestamp, x_coordinate, y_coordinate)
+SELECT m.id, m.customer_id, c.camera_id, m.timestamp, m.x_coordinate, m.y_coordinate
+FROM movements_legacy m
+JOIN customers c ON c.id = m.customer_id;
+
+SELECT setval('movements_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM movements;
+
+DROP TABLE movements_legacy;
+
+CREATE INDEX idx_movements_camera_time ON movements(camera_id, timestamp);
+CREATE INDEX idx_movements_customer_time ON movements(customer_id, timestamp);
+CREATE INDEX idx_movements_time_brin ON movements USING BRIN (timestamp);
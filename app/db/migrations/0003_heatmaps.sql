@@ -0,0 +1,15 @@
+-- Per-camera occupancy heatmaps: the tracker's live decayed grid and daily grids rebuilt from
+-- movements (app/analytics/heatmap.py). Counts are little-endian float32, row-major.
+
+CREATE TABLE IF NOT EXISTS heatmaps (
+    kind VARCHAR(16) NOT NULL,
+    camera_id VARCHAR(80) NOT NULL,
+    bucket_start TIMESTAMPTZ NOT NULL,
+    grid_rows INTEGER NOT NULL,
+    grid_cols INTEGER NOT NULL,
+    cell_size INTEGER NOT NULL,
+    counts BYTEA NOT NULL,
+    total DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (kind, camera_id, bucket_start)
+);
@@ -0,0 +1,6 @@
+-- Settled id horizon for the id-watermarked rollup sources (app/db/rollups.py): the highest id
+-- seen on one run is only folded in once it has been visible for settle_seconds, so a lower id
+-- whose transaction committed late is not skipped.
+
+ALTER TABLE rollup_watermarks ADD COLUMN IF NOT EXISTS pending_id INTEGER;
+ALTER TABLE rollup_watermarks ADD COLUMN IF NOT EXISTS pending_since TIMESTAMPTZ;
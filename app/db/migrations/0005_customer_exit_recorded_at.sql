@@ -0,0 +1,7 @@
+-- When the writer stored a customer's exit. The dwell rollup (app/db/rollups.py) watermarks on
+-- this write time instead of the device-supplied exit_time, so exits uploaded late are not
+-- skipped. Existing exits are backfilled with exit_time, which the old watermark already used.
+
+ALTER TABLE customers ADD COLUMN IF NOT EXISTS exit_recorded_at TIMESTAMPTZ;
+UPDATE customers SET exit_recorded_at = exit_time WHERE exit_time IS NOT NULL AND exit_recorded_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_customers_exit_recorded ON customers (exit_recorded_at);
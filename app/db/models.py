@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, LargeBinary, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -10,21 +10,37 @@ class Base(DeclarativeBase):
 
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        Index("idx_customers_camera_entry", "camera_id", "entry_time"),
+        Index("idx_customers_exit_recorded", "exit_recorded_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    customer_key: Mapped[str | None] = mapped_column(String(36), nullable=True, unique=True)
+    camera_id: Mapped[str | None] = mapped_column(String(80), nullable=True)
     entry_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     exit_time: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     total_time_spent: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Write time of the latest exit update (exit_time is the device's clock); see app.db.rollups.
+    exit_recorded_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     movements: Mapped[list["Movement"]] = relationship(back_populates="customer", cascade="all, delete-orphan")
     product_interactions: Mapped[list["ProductInteraction"]] = relationship(back_populates="customer", cascade="all, delete-orphan")
 
 
 class Movement(Base):
+    """On PostgreSQL this table is range-partitioned by day with primary key (id, timestamp); see
+    app/db/migrations. The ORM keeps ``id`` alone as identity so SQLite can autoincrement it."""
+
     __tablename__ = "movements"
+    __table_args__ = (
+        Index("idx_movements_camera_time", "camera_id", "timestamp"),
+        Index("idx_movements_customer_time", "customer_id", "timestamp"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id", ondelete="CASCADE"), index=True)
+    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id", ondelete="CASCADE"))
+    camera_id: Mapped[str | None] = mapped_column(String(80), nullable=True)
     timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     x_coordinate: Mapped[float] = mapped_column(Float, nullable=False)
     y_coordinate: Mapped[float] = mapped_column(Float, nullable=False)
@@ -34,10 +50,11 @@ class Movement(Base):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (Index("idx_alerts_camera_time", "camera_id", "timestamp"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     alert_type: Mapped[str] = mapped_column(String(80), nullable=False, index=True)
-    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
     camera_id: Mapped[str] = mapped_column(String(80), nullable=False)
     severity: Mapped[str] = mapped_column(String(20), nullable=False)
 
@@ -51,3 +68,42 @@ class ProductInteraction(Base):
     dwell_time: Mapped[float] = mapped_column(Float, nullable=False)
 
     customer: Mapped[Customer] = relationship(back_populates="product_interactions")
+
+
+class AnalyticsRollup(Base):
+    __tablename__ = "analytics_rollups"
+
+    granularity: Mapped[str] = mapped_column(String(8), primary_key=True)
+    metric: Mapped[str] = mapped_column(String(40), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    camera_id: Mapped[str] = mapped_column(String(80), primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(120), primary_key=True)
+    value_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    value_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    source: Mapped[str] = mapped_column(String(40), primary_key=True)
+    last_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    last_timestamp: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    pending_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    pending_since: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class Heatmap(Base):
+    """A camera's occupancy grid: ``live`` is the tracker's decayed grid (overwritten in place),
+    ``daily`` is rebuilt from movements. ``counts`` holds ``grid_rows * grid_cols`` float32 values."""
+
+    __tablename__ = "heatmaps"
+
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)
+    camera_id: Mapped[str] = mapped_column(String(80), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    grid_rows: Mapped[int] = mapped_column(Integer, nullable=False)
+    grid_cols: Mapped[int] = mapped_column(Integer, nullable=False)
+    cell_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    counts: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    total: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import Connection, Engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DOWNSAMPLED_COMMENT = "downsampled"
+# SQLSTATE lock_not_available, raised when lock_timeout expires.
+_LOCK_NOT_AVAILABLE = "55P03"
+
+
+def partition_name(table: str, day: date) -> str:
+    return f"{table}_p{day:%Y%m%d}"
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+@dataclass
+class MaintenanceResult:
+    created: list[str] = field(default_factory=list)
+    downsampled: dict[str, int] = field(default_factory=dict)
+    dropped: list[str] = field(default_factory=list)
+
+
+class PartitionManager:
+    """Keeps a daily range-partitioned table (``movements``) ready ahead of time and trimmed behind.
+
+    ``ensure`` creates partitions from yesterday to ``days_ahead`` days out, plus any day that has
+    rows sitting in the default partition, moving those rows into their new partition. ``apply_retention`` thins
+    partitions older than ``downsample_after_days`` to one point per customer per
+    ``downsample_seconds`` (recorded in the partition's comment so it runs once) and drops
+    partitions older than ``retention_days`` outright, which costs the same regardless of size.
+
+    Expired partitions are detached first and dropped once they are plain tables, so the drop
+    never locks the parent. ``DETACH ... CONCURRENTLY`` (PostgreSQL 14+) is used when the table
+    has no default partition; otherwise the detach waits at most ``detach_lock_timeout_ms`` for
+    its brief ACCESS EXCLUSIVE lock on the parent instead of queueing every reader behind it, and
+    a partition that times out is left for the next run.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        table: str = "movements",
+        days_ahead: int = settings.retention.partition_days_ahead,
+        retention_days: int = settings.retention.movements_retention_days,
+        downsample_after_days: int = settings.retention.downsample_after_days,
+        downsample_seconds: float = settings.retention.downsample_seconds,
+        detach_lock_timeout_ms: int = settings.retention.detach_lock_timeout_ms,
+    ) -> None:
+        self.engine = engine
+        self.table = table
+        self.days_ahead = days_ahead
+        self.retention_days = retention_days
+        self.downsample_after_days = downsample_after_days
+        self.downsample_seconds = downsample_seconds
+        self.detach_lock_timeout_ms = detach_lock_timeout_ms
+
+    def partitions(self, conn: Connection) -> dict[date, tuple[str, str | None]]:
+        """Daily partitions by day, with each partition's comment."""
+        rows = conn.execute(
+            text(
+                """
+                SELECT child.relname, obj_description(child.oid, 'pg_class')
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = :table
+                """
+            ),
+            {"table": self.table},
+        )
+        prefix = f"{self.table}_p"
+        found = {}
+        for name, comment in rows:
+            if name.startswith(prefix):
+                found[datetime.strptime(name[len(prefix) :], "%Y%m%d").date()] = (name, comment)
+        return found
+
+    def run_once(self, today: date | None = None) -> MaintenanceResult:
+        today = today or datetime.now(timezone.utc).date()
+        result = MaintenanceResult()
+        result.created = self.ensure(today)
+        result.downsampled, result.dropped = self.apply_retention(today)
+        return result
+
+    def ensure(self, today: date | None = None) -> list[str]:
+        today = today or datetime.now(timezone.utc).date()
+        created = []
+        with self.engine.begin() as conn:
+            existing = self.partitions(conn)
+            wanted = {today + timedelta(days=offset) for offset in range(-1, self.days_ahead + 1)}
+            wanted.update(self._days_in_default(conn))
+            for day in sorted(wanted - existing.keys()):
+                created.append(self._create(conn, day))
+        return created
+
+    def apply_retention(self, today: date | None = None) -> tuple[dict[str, int], list[str]]:
+        today = today or datetime.now(timezone.utc).date()
+        drop_before = today - timedelta(days=self.retention_days)
+        downsample_before = today - timedelta(days=self.downsample_after_days)
+        downsampled: dict[str, int] = {}
+        dropped: list[str] = []
+
+        with self.engine.begin() as conn:
+            existing = self.partitions(conn)
+            concurrent = self._can_detach_concurrently(conn)
+            leftovers = self._detached(conn) if self.retention_days > 0 else {}
+        # Detached by an earlier run that stopped before its drop.
+        for day, name in sorted(leftovers.items()):
+            if day < drop_before:
+                with self.engine.begin() as conn:
+                    conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{name}"')
+                dropped.append(name)
+        lock_busy = False
+        for day, (name, comment) in sorted(existing.items()):
+            if self.retention_days > 0 and day < drop_before:
+                # Once one detach times out the parent is busy; leave the rest for the next run.
+                lock_busy = lock_busy or not self._detach(name, concurrent)
+                if lock_busy:
+                    continue
+                with self.engine.begin() as conn:
+                    conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{name}"')
+                dropped.append(name)
+            elif (
+                self.downsample_after_days > 0
+                and day < downsample_before
+                and not (comment or "").startswith(DOWNSAMPLED_COMMENT)
+            ):
+                with self.engine.begin() as conn:
+                    downsampled[name] = self._downsample(conn, name)
+        return downsampled, dropped
+
+    def _can_detach_concurrently(self, conn: Connection) -> bool:
+        # CONCURRENTLY needs PostgreSQL 14 and is refused while the table has a default partition.
+        if conn.dialect.server_version_info < (14,):
+            return False
+        has_default = conn.execute(
+            text(
+                """
+                SELECT partdefid <> 0 FROM pg_partitioned_table
+                WHERE partrelid = to_regclass(:table)
+                """
+            ),
+            {"table": self.table},
+        ).scalar()
+        return not has_default
+
+    def _detached(self, conn: Connection) -> dict[date, str]:
+        """Daily partition tables that exist but are no longer attached to the parent."""
+        rows = conn.execute(
+            text(
+                """
+                SELECT relname FROM pg_class
+                WHERE relkind = 'r' AND relnamespace = to_regnamespace(current_schema())
+                  AND relname LIKE :prefix || '%'
+                  AND NOT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = pg_class.oid)
+                """
+            ),
+            {"prefix": f"{self.table}_p"},
+        )
+        prefix = f"{self.table}_p"
+        found = {}
+        for (name,) in rows:
+            try:
+                found[datetime.strptime(name[len(prefix) :], "%Y%m%d").date()] = name
+            except ValueError:
+                continue
+        return found
+
+    def _detach(self, name: str, concurrent: bool) -> bool:
+        """Detach ``name`` from the parent; ``False`` if the lock was not granted in time."""
+        try:
+            if concurrent:
+                # Runs in two transactions of its own, so it cannot be inside a transaction block.
+                with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    pending = conn.execute(
+                        text("SELECT inhdetachpending FROM pg_inherits WHERE inhrelid = to_regclass(:name)"),
+                        {"name": name},
+                    ).scalar()
+                    # A concurrent detach that was interrupted has to be finished with FINALIZE.
+                    action = "FINALIZE" if pending else "CONCURRENTLY"
+                    conn.exec_driver_sql(f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}" {action}')
+            else:
+                with self.engine.begin() as conn:
+                    conn.exec_driver_sql(f"SET LOCAL lock_timeout = {int(self.detach_lock_timeout_ms)}")
+                    conn.exec_driver_sql(f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}"')
+        except OperationalError as exc:
+            if getattr(exc.orig, "pgcode", None) != _LOCK_NOT_AVAILABLE:
+                raise
+            logger.warning("Detaching %s timed out waiting for its lock; retrying on the next run", name)
+            return False
+        return True
+
+    def _days_in_default(self, conn: Connection) -> list[date]:
+        # Late or backfilled rows land in the default partition; give each such day its own
+        # partition so the default stays small and retention can drop them with their day.
+        rows = conn.exec_driver_sql(
+            f"SELECT DISTINCT (timestamp AT TIME ZONE 'UTC')::date FROM \"{self.table}_default\""
+        )
+        return [day for (day,) in rows]
+
+    def _create(self, conn: Connection, day: date) -> str:
+        name = partition_name(self.table, day)
+        start, end = _day_bounds(day)
+        # Create detached, move any rows the default partition caught for this day, then attach;
+        # attaching over a default partition that still holds matching rows would fail.
+        conn.exec_driver_sql(f'CREATE TABLE "{name}" (LIKE "{self.table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        conn.execute(
+            text(
+                f"""
+                WITH moved AS (
+                    DELETE FROM "{self.table}_default" WHERE timestamp >= :start AND timestamp < :end RETURNING *
+                )
+                INSERT INTO "{name}" SELECT * FROM moved
+                """
+            ),
+            {"start": start, "end": end},
+        )
+        conn.exec_driver_sql(
+            f'ALTER TABLE "{self.table}" ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        return name
+
+    def _downsample(self, conn: Connection, name: str) -> int:
+        deleted = conn.execute(
+            text(
+                f"""
+                DELETE FROM "{name}" WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, row_number() OVER (
+                            PARTITION BY customer_id, floor(extract(epoch FROM timestamp) / :seconds)
+                            ORDER BY timestamp
+                        ) AS rank
+                        FROM "{name}"
+                    ) ranked
+                    WHERE rank > 1
+                )
+                """
+            ),
+            {"seconds": self.downsample_seconds},
+        ).rowcount
+        conn.exec_driver_sql(f"COMMENT ON TABLE \"{name}\" IS '{DOWNSAMPLED_COMMENT}:{self.downsample_seconds:g}s'")
+        return deleted
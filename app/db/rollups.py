@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import ColumnElement, Engine, func, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.models import Alert, AnalyticsRollup, Customer, ProductInteraction, RollupWatermark
+
+GRANULARITIES = ("hour", "day")
+UNKNOWN_CAMERA = ""
+
+
+@dataclass
+class RollupResult:
+    source: str
+    rows: int
+    buckets: int
+
+
+def _bucket(column: Any, granularity: str, dialect: str) -> ColumnElement[Any]:
+    if dialect == "postgresql":
+        return func.date_trunc(granularity, column)
+    fmt = "%Y-%m-%d %H:00:00" if granularity == "hour" else "%Y-%m-%d 00:00:00"
+    return func.strftime(fmt, column)
+
+
+def _as_datetime(value: Any) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class RollupJob:
+    """Folds new raw telemetry rows into ``analytics_rollups`` incrementally.
+
+    Each source keeps a watermark in ``rollup_watermarks``: the last processed id for
+    append-only tables, and the last processed ``exit_recorded_at`` for customer exits (dwell is
+    only known once a customer leaves). Exits written less than ``settle_seconds`` ago are left
+    for the next run so transactions still in flight are not skipped.
+
+    Ids are assigned at INSERT, not at commit, so a transaction holding a lower id can commit
+    after a higher one is already visible. The id sources therefore roll up to a settled
+    horizon: the highest id seen on one run is recorded as ``pending_id`` and only folded in
+    once it has been visible for ``settle_seconds``, by which time every lower id has committed
+    (or rolled back).
+    """
+
+    def __init__(self, engine: Engine, settle_seconds: float = 30.0) -> None:
+        self.engine = engine
+        self.dialect = engine.dialect.name
+        self.settle_seconds = settle_seconds
+
+    def run_once(self) -> list[RollupResult]:
+        return [
+            self._roll_by_id("customers", Customer.id, self._footfall_query),
+            self._roll_exits(),
+            self._roll_by_id("product_interactions", ProductInteraction.id, self._interactions_query),
+            self._roll_by_id("alerts", Alert.id, self._alerts_query),
+        ]
+
+    def _footfall_query(self, granularity: str) -> Any:
+        bucket = _bucket(Customer.entry_time, granularity, self.dialect)
+        camera = func.coalesce(Customer.camera_id, UNKNOWN_CAMERA)
+        query = select(bucket, camera, literal("footfall"), literal(""), func.count(), func.count()).group_by(bucket, camera)
+        return query, Customer.id
+
+    def _interactions_query(self, granularity: str) -> Any:
+        bucket = _bucket(Customer.entry_time, granularity, self.dialect)
+        camera = func.coalesce(Customer.camera_id, UNKNOWN_CAMERA)
+        query = (
+            select(
+                bucket,
+                camera,
+                literal("interactions"),
+                ProductInteraction.product_class,
+                func.sum(ProductInteraction.dwell_time),
+                func.count(),
+            )
+            .join(Customer, Customer.id == ProductInteraction.customer_id)
+            .group_by(bucket, camera, ProductInteraction.product_class)
+        )
+        return query, ProductInteraction.id
+
+    def _alerts_query(self, granularity: str) -> Any:
+        bucket = _bucket(Alert.timestamp, granularity, self.dialect)
+        query = select(bucket, Alert.camera_id, literal("alerts"), Alert.alert_type, func.count(), func.count()).group_by(
+            bucket, Alert.camera_id, Alert.alert_type
+        )
+        return query, Alert.id
+
+    def _roll_by_id(self, source: str, id_column: Any, build_query: Any) -> RollupResult:
+        with Session(self.engine) as session:
+            watermark = self._watermark(session, source)
+            low = watermark.last_id or 0
+            now = datetime.now(timezone.utc)
+            if watermark.pending_id is None:
+                self._observe_horizon(session, watermark, id_column, now)
+            pending_since = watermark.pending_since and _as_datetime(watermark.pending_since)
+            if watermark.pending_id is None or pending_since > now - timedelta(seconds=self.settle_seconds):
+                session.commit()
+                return RollupResult(source, 0, 0)
+
+            high = watermark.pending_id
+            buckets = 0
+            for granularity in GRANULARITIES:
+                query, id_col = build_query(granularity)
+                rows = session.execute(query.where(id_col > low, id_col <= high)).all()
+                buckets += self._upsert(session, granularity, rows)
+
+            watermark.last_id = high
+            watermark.pending_id = None
+            watermark.pending_since = None
+            self._observe_horizon(session, watermark, id_column, now)
+            session.commit()
+            return RollupResult(source, high - low, buckets)
+
+    def _observe_horizon(self, session: Session, watermark: RollupWatermark, id_column: Any, now: datetime) -> None:
+        visible = session.scalar(select(func.max(id_column)))
+        if visible is not None and visible > (watermark.last_id or 0):
+            watermark.pending_id = visible
+            watermark.pending_since = now
+
+    def _roll_exits(self) -> RollupResult:
+        """Recompute the dwell buckets of customers whose exit was written since the last run.
+
+        The watermark is ``exit_recorded_at``, the writer's time, so an exit uploaded long after it
+        happened is still picked up. Affected buckets are re-aggregated from every exited customer
+        in them and replaced, so a customer whose exit is written twice is not counted twice.
+        """
+        source = "customer_exits"
+        with Session(self.engine) as session:
+            watermark = self._watermark(session, source)
+            low = watermark.last_timestamp
+            high = datetime.now(timezone.utc) - timedelta(seconds=self.settle_seconds)
+            changed = [Customer.exit_recorded_at.is_not(None), Customer.exit_recorded_at <= high]
+            if low is not None:
+                changed.append(Customer.exit_recorded_at > low)
+            camera = func.coalesce(Customer.camera_id, UNKNOWN_CAMERA)
+            rows_seen = session.scalar(select(func.count()).select_from(Customer).where(*changed)) or 0
+
+            buckets = 0
+            for granularity, span in (("hour", timedelta(hours=1)), ("day", timedelta(days=1))):
+                if not rows_seen:
+                    break
+                bucket = _bucket(Customer.entry_time, granularity, self.dialect)
+                affected = {
+                    (_as_datetime(bucket_start), camera_id)
+                    for bucket_start, camera_id in session.execute(select(bucket, camera).where(*changed).distinct())
+                }
+                starts = [bucket_start for bucket_start, _ in affected]
+                query = (
+                    select(
+                        bucket,
+                        camera,
+                        literal("dwell"),
+                        literal(""),
+                        func.sum(Customer.total_time_spent),
+                        func.count(),
+                    )
+                    .where(
+                        Customer.exit_time.is_not(None),
+                        Customer.entry_time >= min(starts),
+                        Customer.entry_time < max(starts) + span,
+                        camera.in_(sorted({camera_id for _, camera_id in affected})),
+                    )
+                    .group_by(bucket, camera)
+                )
+                rows = [row for row in session.execute(query) if (_as_datetime(row[0]), row[1]) in affected]
+                buckets += self._upsert(session, granularity, rows, replace=True)
+
+            watermark.last_timestamp = high
+            session.commit()
+            return RollupResult(source, rows_seen, buckets)
+
+    def _watermark(self, session: Session, source: str) -> RollupWatermark:
+        watermark = session.get(RollupWatermark, source)
+        if watermark is None:
+            watermark = RollupWatermark(source=source)
+            session.add(watermark)
+        return watermark
+
+    def _upsert(self, session: Session, granularity: str, rows: list[Any], replace: bool = False) -> int:
+        """Add ``rows`` to their buckets, or overwrite the buckets with them when ``replace``."""
+        if not rows:
+            return 0
+        values = [
+            {
+                "granularity": granularity,
+                "bucket_start": _as_datetime(bucket),
+                "camera_id": camera_id or UNKNOWN_CAMERA,
+                "metric": metric,
+                "dimension": dimension or "",
+                "value_sum": float(value_sum or 0.0),
+                "value_count": int(value_count),
+            }
+            for bucket, camera_id, metric, dimension, value_sum, value_count in rows
+        ]
+        insert = postgresql.insert if self.dialect == "postgresql" else sqlite.insert
+        stmt = insert(AnalyticsRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["granularity", "metric", "bucket_start", "camera_id", "dimension"],
+            set_={
+                "value_sum": stmt.excluded.value_sum if replace else AnalyticsRollup.value_sum + stmt.excluded.value_sum,
+                "value_count": stmt.excluded.value_count if replace else AnalyticsRollup.value_count + stmt.excluded.value_count,
+            },
+        )
+        session.execute(stmt, values)
+        return len(values)
+
+
+def load_rollups(
+    session: Session,
+    metric: str,
+    start: datetime,
+    end: datetime,
+    granularity: str = "day",
+    camera_id: str | None = None,
+) -> list[dict[str, Any]]:
+    """Read pre-aggregated rows for ``metric`` with ``start <= bucket_start < end``."""
+    query = select(
+        AnalyticsRollup.bucket_start,
+        AnalyticsRollup.camera_id,
+        AnalyticsRollup.dimension,
+        AnalyticsRollup.value_sum,
+        AnalyticsRollup.value_count,
+    ).where(
+        AnalyticsRollup.granularity == granularity,
+        AnalyticsRollup.metric == metric,
+        AnalyticsRollup.bucket_start >= start,
+        AnalyticsRollup.bucket_start < end,
+    )
+    if camera_id is not None:
+        query = query.where(AnalyticsRollup.camera_id == camera_id)
+    return [row._asdict() for row in session.execute(query.order_by(AnalyticsRollup.bucket_start))]
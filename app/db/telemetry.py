@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import Engine, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.engine import shared_engine
+from app.db.heatmaps import upsert_heatmaps
+from app.db.models import Alert, Base, Customer, Movement, ProductInteraction
+from app.metrics import DB_FLUSH_SECONDS, DB_PENDING, DB_ROWS, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Every live writer in the process, so /metrics can report their combined backlog.
+_WRITERS: weakref.WeakSet[TelemetryWriter] = weakref.WeakSet()
+_ROWS = {kind: DB_ROWS.labels(kind) for kind in ("customers", "movements", "interactions", "exits", "alerts", "heatmaps")}
+
+
+def _collect_pending() -> None:
+    DB_PENDING.set(sum(writer.pending() for writer in list(_WRITERS)))
+
+
+REGISTRY.add_collector("telemetry", _collect_pending)
+
+
+@dataclass
+class WriterStats:
+    flushes: int = 0
+    customers_written: int = 0
+    movements_written: int = 0
+    exits_written: int = 0
+    interactions_written: int = 0
+    alerts_written: int = 0
+    heatmaps_written: int = 0
+    orphan_events: int = 0
+    failed_flushes: int = 0
+    dropped_batches: int = 0
+    dropped_events: int = 0
+    last_error: str = ""
+    backpressure_waits: int = 0
+    backpressure_seconds: float = 0.0
+    total_flush_s: float = 0.0
+    last_flush_s: float = 0.0
+    max_flush_s: float = 0.0
+
+    def as_dict(self, pending: int) -> dict[str, float | int | str]:
+        return {
+            "pending_events": pending,
+            "flushes": self.flushes,
+            "customers_written": self.customers_written,
+            "movements_written": self.movements_written,
+            "exits_written": self.exits_written,
+            "interactions_written": self.interactions_written,
+            "alerts_written": self.alerts_written,
+            "heatmaps_written": self.heatmaps_written,
+            "orphan_events": self.orphan_events,
+            "failed_flushes": self.failed_flushes,
+            "dropped_batches": self.dropped_batches,
+            "dropped_events": self.dropped_events,
+            "last_error": self.last_error,
+            "backpressure_waits": self.backpressure_waits,
+            "backpressure_seconds": round(self.backpressure_seconds, 3),
+            "avg_flush_ms": round(1000.0 * self.total_flush_s / self.flushes, 3) if self.flushes else 0.0,
+            "last_flush_ms": round(1000.0 * self.last_flush_s, 3),
+            "max_flush_ms": round(1000.0 * self.max_flush_s, 3),
+        }
+
+
+def create_telemetry_engine(url: str) -> Engine:
+    """The process's pooled engine for ``url`` (writers of one process share it); SQLite URLs get
+    the schema created in place for local testing."""
+    engine = shared_engine(url)
+    if url.startswith("sqlite"):
+        Base.metadata.create_all(engine)
+    return engine
+
+
+class TelemetryWriter:
+    """Buffers customer lifecycle, movement, interaction, alert and heatmap events and writes them in bulk on a background thread.
+
+    Customers are identified by a client-generated ``customer_key`` so trackers never wait for
+    an INSERT round-trip to learn a primary key. Each flush inserts new customers with a single
+    ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` (so replayed keys are harmless), then movements, interactions and alerts as executemany inserts,
+    then all exits as one bulk UPDATE. A flush happens when ``batch_size`` events are pending or ``flush_interval_seconds``
+    has elapsed; producers block once ``max_pending_events`` are queued.
+
+    A failed flush (a database restart, a dropped pooler connection) is rolled back and retried
+    with exponential backoff; after ``max_flush_attempts`` the batch is dropped and counted in
+    ``dropped_events``, and the thread carries on with the next one. Producers never see the
+    error. Events put after :meth:`close` (or while blocked on a full queue when the writer
+    stops) are dropped the same way.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        batch_size: int = 2000,
+        flush_interval_seconds: float = 1.0,
+        max_pending_events: int = 50000,
+        max_flush_attempts: int = settings.telemetry.max_flush_attempts,
+        retry_backoff_seconds: float = settings.telemetry.retry_backoff_seconds,
+        max_backoff_seconds: float = settings.telemetry.max_backoff_seconds,
+    ) -> None:
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending_events = max_pending_events
+        self.max_flush_attempts = max(1, max_flush_attempts)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.stats = WriterStats()
+        self._events: queue.Queue[tuple[Any, ...]] = queue.Queue(maxsize=max_pending_events)
+        self._customer_ids: dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        _WRITERS.add(self)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> TelemetryWriter:
+        return cls(create_telemetry_engine(url), **kwargs)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 30.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        else:
+            self.flush()
+
+    def customer_entered(self, customer_key: str, entry_time: datetime, camera_id: str | None = None) -> None:
+        self._put(("customer", customer_key, entry_time, camera_id))
+
+    def movement(self, customer_key: str, timestamp: datetime, x: float, y: float, camera_id: str | None = None) -> None:
+        self._put(("movement", customer_key, timestamp, x, y, camera_id))
+
+    def product_interaction(self, customer_key: str, product_class: str, dwell_time: float) -> None:
+        self._put(("interaction", customer_key, product_class, dwell_time))
+
+    def customer_exited(self, customer_key: str, exit_time: datetime, total_time_spent: float) -> None:
+        self._put(("exit", customer_key, exit_time, total_time_spent))
+
+    def alert(self, alert_type: str, timestamp: datetime, camera_id: str, severity: str) -> None:
+        self._put(("alert", alert_type, timestamp, camera_id, severity))
+
+    def heatmap(self, kind: str, camera_id: str, bucket_start: datetime, grid: Any, cell_size: int) -> None:
+        """Replace a stored heatmap; ``grid`` must not be modified afterwards."""
+        self._put(("heatmap", kind, camera_id, bucket_start, grid, cell_size))
+
+    def submit(self, events: list[tuple[Any, ...]]) -> None:
+        """Queue already-built event tuples, in the form the methods above produce, in one call."""
+        for event in events:
+            self._put(event)
+
+    def pending(self) -> int:
+        return self._events.qsize()
+
+    def snapshot(self) -> dict[str, float | int | str]:
+        return self.stats.as_dict(self.pending())
+
+    def flush(self) -> None:
+        """Write everything queued so far on the calling thread."""
+        batch: list[tuple[Any, ...]] = []
+        while True:
+            try:
+                batch.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write_with_retry(batch)
+                batch = []
+        if batch:
+            self._write_with_retry(batch)
+
+    def _put(self, event: tuple[Any, ...]) -> None:
+        if self._stop.is_set():
+            self.stats.dropped_events += 1
+            return
+        try:
+            self._events.put_nowait(event)
+        except queue.Full:
+            started = time.perf_counter()
+            self.stats.backpressure_waits += 1
+            while True:
+                try:
+                    self._events.put(event, timeout=0.1)
+                    break
+                except queue.Full:
+                    # Nothing will drain the queue once the writer is closed or its thread is gone.
+                    if self._stop.is_set() or (self._thread is not None and not self._thread.is_alive()):
+                        self.stats.dropped_events += 1
+                        break
+            self.stats.backpressure_seconds += time.perf_counter() - started
+
+    def _run(self) -> None:
+        batch: list[tuple[Any, ...]] = []
+        deadline = time.monotonic() + self.flush_interval_seconds
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                batch.append(self._events.get(timeout=min(timeout, 0.1)))
+            except queue.Empty:
+                pass
+
+            if self._stop.is_set():
+                if batch:
+                    self._write_with_retry(batch)
+                self.flush()
+                return
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch:
+                    self._write_with_retry(batch)
+                    batch = []
+                deadline = time.monotonic() + self.flush_interval_seconds
+
+    def _write_with_retry(self, batch: list[tuple[Any, ...]]) -> None:
+        """Write ``batch``, retrying failures with backoff; drop it after ``max_flush_attempts``."""
+        backoff = self.retry_backoff_seconds
+        for attempt in range(1, self.max_flush_attempts + 1):
+            try:
+                self._write(batch)
+                return
+            except Exception as exc:
+                self.stats.failed_flushes += 1
+                self.stats.last_error = f"{type(exc).__name__}: {exc}"[:500]
+                if attempt == self.max_flush_attempts:
+                    self.stats.dropped_batches += 1
+                    self.stats.dropped_events += len(batch)
+                    logger.error("Dropping %d telemetry events after %d failed flushes", len(batch), attempt, exc_info=True)
+                    return
+                logger.warning("Telemetry flush failed (attempt %d/%d), retrying in %.1fs: %s", attempt, self.max_flush_attempts, backoff, exc)
+                # Closing cuts the wait short; the remaining attempts still run before the batch is dropped.
+                self._stop.wait(backoff)
+                backoff = min(2.0 * backoff, self.max_backoff_seconds)
+
+    def _write(self, batch: list[tuple[Any, ...]]) -> None:
+        started = time.perf_counter()
+        new_customers: dict[str, dict[str, Any]] = {}
+        movements: list[tuple[str, datetime, float, float, str | None]] = []
+        interactions: list[tuple[str, str, float]] = []
+        alerts: list[dict[str, Any]] = []
+        heatmaps: dict[tuple[str, str, datetime], tuple[Any, ...]] = {}
+        exits: list[tuple[str, datetime, float]] = []
+        for event in batch:
+            kind = event[0]
+            if kind == "customer":
+                new_customers.setdefault(event[1], {"customer_key": event[1], "entry_time": event[2], "camera_id": event[3]})
+            elif kind == "movement":
+                movements.append(event[1:])
+            elif kind == "interaction":
+                interactions.append(event[1:])
+            elif kind == "alert":
+                alerts.append({"alert_type": event[1], "timestamp": event[2], "camera_id": event[3], "severity": event[4]})
+            elif kind == "heatmap":
+                heatmaps[event[1:4]] = event[1:]  # only the newest grid per key matters
+            else:
+                exits.append(event[1:])
+
+        customers_written = 0
+        orphans = 0
+        # Ids learned in this flush only reach the cache once it commits, so a rolled-back flush
+        # never leaves ids behind for rows that do not exist.
+        ids: dict[str, int] = {}
+        exited: list[str] = []
+
+        def customer_id_for(key: str) -> int | None:
+            return ids.get(key, self._customer_ids.get(key))
+
+        with Session(self.engine) as session:
+            if new_customers:
+                # A key that already exists (e.g. a retried ingest batch) keeps its original row.
+                dialect_insert = postgresql.insert if self.engine.dialect.name == "postgresql" else sqlite.insert
+                rows = session.execute(
+                    dialect_insert(Customer)
+                    .on_conflict_do_nothing(index_elements=["customer_key"])
+                    .returning(Customer.customer_key, Customer.id),
+                    list(new_customers.values()),
+                ).all()
+                ids.update({key: cid for key, cid in rows})
+                customers_written = len(rows)
+
+            missing = {key for key, *_ in movements + interactions + exits if customer_id_for(key) is None}
+            if missing:
+                rows = session.execute(select(Customer.customer_key, Customer.id).where(Customer.customer_key.in_(missing)))
+                ids.update({key: cid for key, cid in rows})
+
+            movement_rows = []
+            for key, timestamp, x, y, camera_id in movements:
+                customer_id = customer_id_for(key)
+                if customer_id is None:
+                    orphans += 1
+                    continue
+                movement_rows.append(
+                    {
+                        "customer_id": customer_id,
+                        "camera_id": camera_id,
+                        "timestamp": timestamp,
+                        "x_coordinate": float(x),
+                        "y_coordinate": float(y),
+                    }
+                )
+            if movement_rows:
+                session.execute(insert(Movement), movement_rows)
+
+            interaction_rows = []
+            for key, product_class, dwell_time in interactions:
+                customer_id = customer_id_for(key)
+                if customer_id is None:
+                    orphans += 1
+                    continue
+                interaction_rows.append({"customer_id": customer_id, "product_class": product_class, "dwell_time": dwell_time})
+            if interaction_rows:
+                session.execute(insert(ProductInteraction), interaction_rows)
+
+            exit_rows = []
+            recorded_at = datetime.now(timezone.utc)
+            for key, exit_time, total_time_spent in exits:
+                customer_id = customer_id_for(key)
+                if customer_id is None:
+                    orphans += 1
+                    continue
+                exited.append(key)
+                exit_rows.append(
+                    {"id": customer_id, "exit_time": exit_time, "total_time_spent": total_time_spent, "exit_recorded_at": recorded_at}
+                )
+            if exit_rows:
+                session.execute(update(Customer), exit_rows)
+
+            if alerts:
+                session.execute(insert(Alert), alerts)
+
+            upsert_heatmaps(session, list(heatmaps.values()))
+
+            session.commit()
+
+        self._customer_ids.update(ids)
+        for key in exited:
+            self._customer_ids.pop(key, None)
+        elapsed = time.perf_counter() - started
+        self.stats.flushes += 1
+        self.stats.orphan_events += orphans
+        self.stats.customers_written += customers_written
+        self.stats.movements_written += len(movement_rows)
+        self.stats.exits_written += len(exit_rows)
+        self.stats.interactions_written += len(interaction_rows)
+        self.stats.alerts_written += len(alerts)
+        self.stats.heatmaps_written += len(heatmaps)
+        self.stats.total_flush_s += elapsed
+        self.stats.last_flush_s = elapsed
+        self.stats.max_flush_s = max(self.stats.max_flush_s, elapsed)
+        DB_FLUSH_SECONDS.observe(elapsed)
+        for kind, rows in (
+            ("customers", customers_written),
+            ("movements", len(movement_rows)),
+            ("interactions", len(interaction_rows)),
+            ("exits", len(exit_rows)),
+            ("alerts", len(alerts)),
+            ("heatmaps", len(heatmaps)),
+        ):
+            if rows:
+                _ROWS[kind].inc(rows)
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import json
+import math
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+
+from app.analytics.alerts import AlertDispatcher, overcrowding_trigger
+from app.config import settings
+from app.realtime import OccupancyHub
+
+if TYPE_CHECKING:
+    from app.db.telemetry import TelemetryWriter
+
+# Event lines are JSON arrays led by a one-letter type; timestamps are Unix epoch seconds.
+ENTER = "e"  # ["e", camera_id, customer_key, ts]
+MOVE = "m"  # ["m", camera_id, customer_key, ts, x, y]
+EXIT = "x"  # ["x", camera_id, customer_key, ts, total_time_spent]
+INTERACTION = "i"  # ["i", camera_id, customer_key, product_class, dwell_seconds]
+OCCUPANCY = "o"  # ["o", camera_id, ts, people_count]
+
+_ARITY = {ENTER: 4, MOVE: 6, EXIT: 5, INTERACTION: 5, OCCUPANCY: 4}
+_NUMBER = (int, float)
+_MAX_TIMESTAMP = 253402300799  # 9999-12-31T23:59:59Z, the last second datetime can represent
+# Column widths in app.db.models; longer values would fail the whole writer flush.
+_CAMERA_ID_LENGTH = 80
+_CUSTOMER_KEY_LENGTH = 36
+_PRODUCT_CLASS_LENGTH = 120
+
+
+class IngestError(Exception):
+    """A batch that was refused as a whole; ``status_code`` is the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class IngestStats:
+    batches: int = 0
+    events_accepted: int = 0
+    events_rejected: int = 0
+    batches_refused: int = 0
+    bytes_received: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "batches": self.batches,
+            "events_accepted": self.events_accepted,
+            "events_rejected": self.events_rejected,
+            "batches_refused": self.batches_refused,
+            "bytes_received": self.bytes_received,
+        }
+
+
+def decode_lines(body: bytes) -> list[tuple[int, Any]]:
+    """Parse an NDJSON body into ``(line_number, value)`` pairs; undecodable lines get ``ValueError`` values.
+
+    The whole body is decoded with one ``json.loads`` by joining the lines into an array; only
+    when that fails (or yields a different number of values) are lines parsed one by one to find
+    the bad ones.
+    """
+    numbered = [(number, line) for number, line in enumerate(body.split(b"\n"), start=1) if line.strip()]
+    if not numbered:
+        return []
+    try:
+        values = json.loads(b"[" + b",".join(line for _, line in numbered) + b"]")
+        if len(values) == len(numbered):
+            return [(number, value) for (number, _), value in zip(numbered, values)]
+    except ValueError:
+        pass
+    decoded: list[tuple[int, Any]] = []
+    for number, line in numbered:
+        try:
+            decoded.append((number, json.loads(line)))
+        except ValueError as exc:
+            decoded.append((number, exc))
+    return decoded
+
+
+def gunzip_bounded(body: bytes, max_bytes: int) -> bytes:
+    """Decompress a gzip body, refusing it with 413 as soon as the output passes ``max_bytes``.
+
+    A small compressed body can expand a thousandfold, so the output is produced at most
+    ``max_bytes + 1`` bytes at a time instead of all at once. Concatenated gzip members are
+    accepted, as ``gzip.decompress`` does.
+    """
+    output = bytearray()
+    data = body
+    while data:
+        decompressor = zlib.decompressobj(31)  # wbits 31: gzip framing
+        try:
+            output += decompressor.decompress(data, max_bytes + 1 - len(output))
+            if len(output) > max_bytes or decompressor.unconsumed_tail:
+                raise IngestError(413, f"Batch body exceeds {max_bytes} bytes once decompressed")
+            output += decompressor.flush()
+        except zlib.error as exc:
+            raise IngestError(400, f"Invalid gzip body: {exc}") from exc
+        if not decompressor.eof:
+            raise IngestError(400, "Invalid gzip body: truncated stream")
+        data = decompressor.unused_data
+    return bytes(output)
+
+
+def _timestamp(value: Any) -> datetime:
+    # The range test also rejects NaN and values datetime cannot hold (OverflowError otherwise).
+    if type(value) not in _NUMBER or not 0 < value <= _MAX_TIMESTAMP:
+        raise ValueError("timestamp must be positive epoch seconds")
+    return datetime.fromtimestamp(value, timezone.utc)
+
+
+def _number(value: Any, name: str) -> float:
+    if type(value) not in _NUMBER:
+        raise ValueError(f"{name} must be a finite number")
+    try:
+        number = float(value)  # an int past float's range raises OverflowError here, not later
+    except OverflowError:
+        raise ValueError(f"{name} must be a finite number") from None
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a finite number")
+    return number
+
+
+def _text(value: Any, name: str, max_length: int) -> str:
+    if type(value) is not str or not value or len(value) > max_length:
+        raise ValueError(f"{name} must be a non-empty string of at most {max_length} characters")
+    return value
+
+
+class BulkIngestor:
+    """Accepts batched NDJSON telemetry from edge trackers and hands it to the batched DB writer.
+
+    Each line is checked with plain type tests (no per-event model instantiation); bad lines are
+    skipped and reported in the batch ack, everything else is queued on the shared
+    :class:`TelemetryWriter`. Occupancy lines update the :class:`OccupancyHub` with the newest
+    count per camera in the batch. A batch that would overflow the writer queue is refused with
+    503 before any of it is queued, so the edge can retry it whole instead of blocking here.
+    """
+
+    def __init__(
+        self,
+        writer: TelemetryWriter,
+        occupancy: OccupancyHub | None = None,
+        dispatcher: AlertDispatcher | None = None,
+        max_body_bytes: int = settings.ingest.max_body_bytes,
+        max_batch_events: int = settings.ingest.max_batch_events,
+        max_errors_reported: int = settings.ingest.max_errors_reported,
+    ) -> None:
+        self.writer = writer
+        self.occupancy = occupancy
+        self.dispatcher = dispatcher
+        self.max_body_bytes = max_body_bytes
+        self.max_batch_events = max_batch_events
+        self.max_errors_reported = max_errors_reported
+        self.stats = IngestStats()
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return self.stats.as_dict()
+
+    def ingest(self, body: bytes, content_encoding: str | None = None) -> dict[str, Any]:
+        """Validate and enqueue one NDJSON batch and return its ack."""
+        try:
+            return self._ingest(body, content_encoding)
+        except IngestError:
+            with self._lock:
+                self.stats.batches_refused += 1
+            raise
+
+    def _ingest(self, body: bytes, content_encoding: str | None) -> dict[str, Any]:
+        if content_encoding == "gzip":
+            body = gunzip_bounded(body, self.max_body_bytes)
+        elif content_encoding not in (None, "", "identity"):
+            raise IngestError(415, f"Unsupported content encoding {content_encoding!r}")
+        if len(body) > self.max_body_bytes:
+            raise IngestError(413, f"Batch body exceeds {self.max_body_bytes} bytes")
+
+        lines = decode_lines(body)
+        if len(lines) > self.max_batch_events:
+            raise IngestError(413, f"Batch has {len(lines)} events; the limit is {self.max_batch_events}")
+
+        events: list[tuple[Any, ...]] = []
+        counts: dict[str, tuple[datetime, int]] = {}
+        errors: list[dict[str, Any]] = []
+        rejected = 0
+        for number, value in lines:
+            try:
+                if isinstance(value, ValueError):
+                    raise ValueError(f"invalid JSON: {value}")
+                kind = value[0] if type(value) is list and value else None
+                if kind not in _ARITY or len(value) != _ARITY[kind]:
+                    raise ValueError("expected [type, camera_id, ...] with a known type and field count")
+                camera_id = _text(value[1], "camera_id", _CAMERA_ID_LENGTH)
+                if kind == OCCUPANCY:
+                    people_count = value[3]
+                    if type(people_count) is not int or people_count < 0:
+                        raise ValueError("people_count must be a non-negative integer")
+                    timestamp = _timestamp(value[2])
+                    latest = counts.get(camera_id)
+                    if latest is None or timestamp >= latest[0]:
+                        counts[camera_id] = (timestamp, people_count)
+                    continue
+                customer_key = _text(value[2], "customer_key", _CUSTOMER_KEY_LENGTH)
+                if kind == MOVE:
+                    events.append(
+                        ("movement", customer_key, _timestamp(value[3]), _number(value[4], "x"), _number(value[5], "y"), camera_id)
+                    )
+                elif kind == ENTER:
+                    events.append(("customer", customer_key, _timestamp(value[3]), camera_id))
+                elif kind == EXIT:
+                    events.append(("exit", customer_key, _timestamp(value[3]), _number(value[4], "total_time_spent")))
+                else:
+                    events.append(
+                        ("interaction", customer_key, _text(value[3], "product_class", _PRODUCT_CLASS_LENGTH), _number(value[4], "dwell_seconds"))
+                    )
+            except ValueError as exc:
+                rejected += 1
+                if len(errors) < self.max_errors_reported:
+                    errors.append({"line": number, "error": str(exc)})
+
+        if self.writer.pending() + len(events) > self.writer.max_pending_events:
+            raise IngestError(503, "Telemetry writer is saturated; retry the batch later")
+        self.writer.submit(events)
+        for camera_id, (_, people_count) in counts.items():
+            if self.occupancy is not None:
+                self.occupancy.publish(camera_id, people_count)
+            if self.dispatcher is not None and overcrowding_trigger(people_count):
+                self.dispatcher.dispatch(
+                    alert_type="overcrowding",
+                    camera_id=camera_id,
+                    severity="high",
+                    details=f"people_count={people_count}",
+                )
+
+        accepted = len(lines) - rejected
+        with self._lock:
+            self.stats.batches += 1
+            self.stats.events_accepted += accepted
+            self.stats.events_rejected += rejected
+            self.stats.bytes_received += len(body)
+        return {"accepted": accepted, "rejected": rejected, "errors": errors, "pending": self.writer.pending()}
@@ -1,17 +1,142 @@
-from datetime import datetime, timezone
+import json
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Any
 
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from app.analytics.alerts import (
-    TelegramAlerter,
-    format_alert,
+    AlertDispatcher,
+    build_dispatcher,
     loitering_trigger,
     overcrowding_trigger,
 )
+from app.analytics.supervisor import CameraSupervisor, read_status
+from app.config import settings
+from app.ingest import BulkIngestor, IngestError
+from app.metrics import CONTENT_TYPE, HTTP_SECONDS, REGISTRY
+from app.profiler import PROFILER, ProfilerBusy
+from app.realtime import OccupancyHub
 
-app = FastAPI(title="Retail Vision API")
-alerter = TelegramAlerter()
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _shutdown_step(name: str) -> Iterator[None]:
+    """Log a failing shutdown step instead of raising, so the steps after it still run."""
+    try:
+        yield
+    except Exception:
+        logger.exception("Shutting down the %s failed", name)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    writer = None
+    if settings.alerts.persist_to_db or settings.ingest.enabled:
+        # SQLAlchemy is only imported by API processes that write telemetry.
+        from app.db.telemetry import TelemetryWriter
+
+        writer = TelemetryWriter.from_url(
+            settings.postgres_url,
+            batch_size=settings.telemetry.batch_size,
+            flush_interval_seconds=settings.telemetry.flush_interval_seconds,
+            max_pending_events=settings.telemetry.max_pending_events,
+        )
+        writer.start()
+    app.state.writer = writer
+    app.state.dispatcher = build_dispatcher(writer if settings.alerts.persist_to_db else None)
+    app.state.dispatcher.start()
+    app.state.occupancy = OccupancyHub()
+    app.state.occupancy.start()
+    app.state.ingestor = None
+    if settings.ingest.enabled and writer is not None:
+        app.state.ingestor = BulkIngestor(writer, app.state.occupancy, app.state.dispatcher)
+    app.state.db_engine = None
+    app.state.db_sessions = None
+    app.state.supervisor = None
+    if settings.supervisor.embedded and settings.supervisor.config_path:
+        # Worker stats reports carry each camera's people count; feed them to the occupancy hub.
+        app.state.supervisor = CameraSupervisor.from_config(
+            settings.supervisor.config_path, publish_occupancy=app.state.occupancy.publish
+        )
+        app.state.supervisor.start()
+    try:
+        yield
+    finally:
+        if app.state.supervisor is not None:
+            with _shutdown_step("camera supervisor"):
+                app.state.supervisor.close()
+        with _shutdown_step("occupancy hub"):
+            await app.state.occupancy.close()
+        with _shutdown_step("alert dispatcher"):
+            app.state.dispatcher.close()
+        if writer is not None:
+            # Flushes what is queued; with the database down the writer drops it after its
+            # retries (counted in /health's telemetry stats) rather than failing shutdown.
+            with _shutdown_step("telemetry writer"):
+                writer.close()
+        if app.state.db_engine is not None:
+            with _shutdown_step("database engine"):
+                await app.state.db_engine.dispose()
+
+
+app = FastAPI(title="Retail Vision API", lifespan=lifespan)
+
+
+if settings.metrics.enabled:
+
+    @app.middleware("http")
+    async def time_requests(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+        started = time.perf_counter()
+        response = await call_next(request)
+        # The route template keeps the label set bounded (/cameras/{id}, not every id).
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        HTTP_SECONDS.labels(request.method, path, response.status_code).observe(time.perf_counter() - started)
+        return response
+
+
+def dispatcher() -> AlertDispatcher:
+    return app.state.dispatcher
+
+
+def occupancy() -> OccupancyHub:
+    return app.state.occupancy
+
+
+def ingestor() -> BulkIngestor:
+    if app.state.ingestor is None:
+        raise IngestError(503, "Bulk ingestion is disabled")
+    return app.state.ingestor
+
+
+def db_sessions() -> "async_sessionmaker[AsyncSession]":
+    """Async sessions for read endpoints. The engine is built on first use, so processes that
+    never query (and their cold start) do not import SQLAlchemy's asyncio layer."""
+    if app.state.db_sessions is None:
+        from app.db.engine import async_session_factory, create_async_db_engine
+
+        engine: AsyncEngine = create_async_db_engine(settings.postgres_url)
+        app.state.db_engine = engine
+        app.state.db_sessions = async_session_factory(engine)
+    return app.state.db_sessions
+
+
+def _ingest_error_body(exc: IngestError) -> dict[str, Any]:
+    body: dict[str, Any] = {"error": str(exc)}
+    if exc.status_code == 503:
+        body["retry_after"] = settings.ingest.retry_after_seconds
+    return body
 
 
 class OccupancyPayload(BaseModel):
@@ -26,21 +151,60 @@ class LoiteringPayload(BaseModel):
 
 
 @app.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok", "service": "retail-vision"}
+def health() -> dict[str, Any]:
+    body: dict[str, Any] = {"status": "ok", "service": "retail-vision"}
+    cameras = None
+    if app.state.supervisor is not None:
+        cameras = app.state.supervisor.snapshot()
+    elif settings.supervisor.status_path:
+        cameras = read_status(settings.supervisor.status_path)
+    if cameras is not None:
+        body["status"] = "ok" if cameras["status"] == "ok" else "degraded"
+        body["cameras"] = cameras["cameras"]
+        body["workers"] = cameras["workers"]
+    if app.state.writer is not None:
+        body["telemetry"] = app.state.writer.snapshot()
+    return body
+
+
+@app.get("/metrics")
+def metrics() -> Response:
+    if not settings.metrics.enabled:
+        return PlainTextResponse("Metrics are disabled", status_code=404)
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/debug/profile")
+async def profile(seconds: float = 10.0, hz: float = settings.metrics.profile_hz) -> Response:
+    """Sample every thread of the API process for ``seconds``; the body is folded stacks for a flame graph."""
+    if not settings.metrics.profiler_enabled:
+        return PlainTextResponse("Profiling is disabled (set metrics.profiler_enabled)", status_code=404)
+    try:
+        folded = await run_in_threadpool(PROFILER.profile, seconds, hz)
+    except ValueError as exc:
+        return PlainTextResponse(str(exc), status_code=400)
+    except ProfilerBusy as exc:
+        return PlainTextResponse(str(exc), status_code=409)
+    return PlainTextResponse(folded)
+
+
+@app.post("/occupancy")
+def publish_occupancy(payload: OccupancyPayload) -> dict[str, str]:
+    occupancy().publish(payload.camera_id, payload.people_count)
+    return {"status": "ok"}
 
 
 @app.post("/alerts/occupancy")
 def occupancy_alert(payload: OccupancyPayload) -> dict[str, str | bool]:
+    occupancy().publish(payload.camera_id, payload.people_count)
     triggered = overcrowding_trigger(payload.people_count)
     if triggered:
-        alert_msg = format_alert(
+        dispatcher().dispatch(
             alert_type="overcrowding",
             camera_id=payload.camera_id,
             severity="high",
             details=f"people_count={payload.people_count}",
         )
-        alerter.send(alert_msg)
     return {"triggered": triggered, "timestamp": datetime.now(timezone.utc).isoformat()}
 
 
@@ -48,30 +212,111 @@ def occupancy_alert(payload: OccupancyPayload) -> dict[str, str | bool]:
 def loitering_alert(payload: LoiteringPayload) -> dict[str, str | bool]:
     triggered = loitering_trigger(payload.dwell_seconds)
     if triggered:
-        alert_msg = format_alert(
+        dispatcher().dispatch(
             alert_type="loitering",
             camera_id=payload.camera_id,
             severity="medium",
             details=f"customer_id={payload.customer_id}, dwell_seconds={payload.dwell_seconds:.1f}",
         )
-        alerter.send(alert_msg)
     return {"triggered": triggered, "timestamp": datetime.now(timezone.utc).isoformat()}
 
 
-@app.websocket("/ws/occupancy")
-async def ws_occupancy(websocket: WebSocket) -> None:
+@app.get("/alerts/history")
+async def alert_history(
+    camera_id: str | None = None,
+    alert_type: str | None = None,
+    since: datetime | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+) -> dict[str, Any]:
+    """Persisted alerts, newest first, read without blocking the event loop."""
+    from app.db.history import alert_history_query, alert_rows
+
+    async with db_sessions()() as session:
+        rows = (await session.execute(alert_history_query(camera_id, alert_type, since, limit))).all()
+    return {"alerts": alert_rows(rows)}
+
+
+@app.get("/occupancy/in-store")
+async def in_store(hours: float = Query(12.0, gt=0, le=168)) -> dict[str, Any]:
+    """Customers who entered in the last ``hours`` and have no exit yet, per camera."""
+    from app.db.history import in_store_query, in_store_rows
+
+    async with db_sessions()() as session:
+        rows = (await session.execute(in_store_query(hours))).all()
+    return in_store_rows(rows)
+
+
+@app.get("/export/{table}")
+def export(table: str, start: date, end: date) -> Response:
+    """Stream ``table``'s rows for the days ``start``..``end`` (UTC) as gzip'd CSV, chunk by chunk
+    from a server-side cursor, so a months-long download never sits in the API's memory."""
+    from app.db.engine import shared_engine
+    from app.db.export import EXPORT_TABLES, iter_csv_gzip
+
+    if table not in EXPORT_TABLES:
+        return JSONResponse({"error": f"Unknown table {table!r}", "tables": sorted(EXPORT_TABLES)}, status_code=404)
+    if start > end:
+        return JSONResponse({"error": "start must not be after end"}, status_code=400)
+    filename = f"{table}_{start.isoformat()}_{end.isoformat()}.csv.gz"
+    return StreamingResponse(
+        iter_csv_gzip(shared_engine(settings.postgres_url), table, start, end),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def _read_body(request: Request, max_bytes: int) -> bytes:
+    """The request body, refused with 413 before reading (by ``Content-Length``) or while reading
+    once more than ``max_bytes`` have arrived, so an oversized batch is never buffered whole."""
+    declared = request.headers.get("content-length")
+    if declared is not None:
+        if not declared.isdigit():
+            raise IngestError(400, "Invalid Content-Length")
+        if int(declared) > max_bytes:
+            raise IngestError(413, f"Batch body exceeds {max_bytes} bytes")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise IngestError(413, f"Batch body exceeds {max_bytes} bytes")
+    return bytes(body)
+
+
+@app.post("/ingest")
+async def ingest(request: Request) -> JSONResponse:
+    """Bulk NDJSON telemetry from edge trackers (see ``app.ingest``); one ack per batch."""
+    try:
+        target = ingestor()
+        body = await _read_body(request, target.max_body_bytes)
+        ack = await run_in_threadpool(target.ingest, body, request.headers.get("content-encoding"))
+    except IngestError as exc:
+        headers = {"Retry-After": str(settings.ingest.retry_after_seconds)} if exc.status_code == 503 else None
+        return JSONResponse(_ingest_error_body(exc), status_code=exc.status_code, headers=headers)
+    return JSONResponse(ack)
+
+
+@app.websocket("/ws/ingest")
+async def ws_ingest(websocket: WebSocket) -> None:
+    """Streamed variant of ``/ingest``: every message is one NDJSON batch, acked in order with its ``seq``."""
     await websocket.accept()
+    seq = 0
     try:
         while True:
-            payload = await websocket.receive_json()
-            people_count = payload.get("people_count", 0)
-            await websocket.send_json(
-                {
-                    "event": "occupancy_update",
-                    "people_count": people_count,
-                    "triggered": overcrowding_trigger(people_count),
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                }
-            )
-    except Exception:
-        await websocket.close()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            body = message.get("bytes") or (message.get("text") or "").encode()
+            seq += 1
+            try:
+                ack = await run_in_threadpool(ingestor().ingest, body)
+            except IngestError as exc:
+                ack = {**_ingest_error_body(exc), "status": exc.status_code}
+            await websocket.send_text(json.dumps({"seq": seq, **ack}))
+    except WebSocketDisconnect:
+        return
+
+
+@app.websocket("/ws/occupancy")
+async def ws_occupancy(websocket: WebSocket) -> None:
+    await websocket.accept()
+    await occupancy().serve(websocket)
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from app.config import settings
+from app.profiler import ProfilerBusy, SamplingProfiler
+
+# Seconds; spans a sub-millisecond queue put up to a multi-second DB flush.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: Any, **kwargs: Any) -> Any:
+        """The child for one label combination; keep a reference to it on hot paths."""
+        key = tuple(str(v) for v in values) if values else tuple(str(kwargs[name]) for name in self.labelnames)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def remove(self, *values: Any) -> None:
+        with self._lock:
+            self._children.pop(tuple(str(v) for v in values), None)
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def _default(self) -> Any:
+        return self.labels() if not self.labelnames else None
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.copy().items()):
+            lines.extend(child.render(self.name, self.labelnames, key))
+        return lines
+
+
+class _Value:
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def render(self, name: str, labelnames: Sequence[str], key: Sequence[str]) -> list[str]:
+        return [f"{name}{_label_text(labelnames, key)} {_format_value(self.value)}"]
+
+
+class _HistogramValue:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def render(self, name: str, labelnames: Sequence[str], key: Sequence[str]) -> list[str]:
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, math.inf), counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{name}_bucket{_label_text(labelnames, key, le)} {cumulative}")
+        lines.append(f"{name}_sum{_label_text(labelnames, key)} {_format_value(total)}")
+        lines.append(f"{name}_count{_label_text(labelnames, key)} {cumulative}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in the Prometheus text exposition format (0.0.4).
+
+    Hot paths update counters and histograms directly (a lock and a bisect each). Values that
+    already live elsewhere, such as queue depths or writer backlogs, are read by collectors,
+    callbacks that run at scrape time and set gauges.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered with a different type or labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, key: str, collect: Callable[[], None]) -> None:
+        """Run ``collect`` before every render; a later collector with the same ``key`` replaces it."""
+        with self._lock:
+            self._collectors[key] = collect
+
+    def remove_collector(self, key: str) -> None:
+        with self._lock:
+            self._collectors.pop(key, None)
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors.values())
+            metrics = list(self._metrics.values())
+        for collect in collectors:
+            collect()
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "retail_vision_step_seconds",
+    "Time spent in each tracker step (read, resize, predict, postprocess, track, analytics, persist, render).",
+    ["camera", "step"],
+)
+PIPELINE_PROCESSED = REGISTRY.counter(
+    "retail_vision_pipeline_processed_total", "Items a pipeline stage has processed.", ["camera", "stage"]
+)
+PIPELINE_DROPPED = REGISTRY.counter(
+    "retail_vision_pipeline_dropped_total", "Items a stage's input queue has dropped.", ["camera", "stage"]
+)
+QUEUE_DEPTH = REGISTRY.gauge("retail_vision_queue_depth", "Items waiting in a stage's input queue.", ["camera", "stage"])
+TRACKED_OBJECTS = REGISTRY.gauge("retail_vision_tracked_objects", "Confirmed tracks in the latest frame.", ["camera"])
+CAMERA_FPS = REGISTRY.gauge("retail_vision_fps", "Smoothed frames per second leaving the pipeline.", ["camera"])
+DB_FLUSH_SECONDS = REGISTRY.histogram("retail_vision_db_flush_seconds", "Telemetry writer flush (one DB transaction) latency.")
+DB_ROWS = REGISTRY.counter(
+    "retail_vision_db_rows_written_total", "Rows written by telemetry writers (exits are customer updates).", ["kind"]
+)
+DB_PENDING = REGISTRY.gauge("retail_vision_db_pending_events", "Events queued in telemetry writers.")
+ALERT_DISPATCH_SECONDS = REGISTRY.histogram(
+    "retail_vision_alert_dispatch_seconds",
+    "Time from an alert being raised to its delivery by a sink.",
+    ["sink"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+ALERTS = REGISTRY.counter("retail_vision_alerts_total", "Alerts accepted for delivery.", ["alert_type"])
+HTTP_SECONDS = REGISTRY.histogram("retail_vision_http_request_seconds", "API request latency.", ["method", "route", "status"])
+
+
+class MetricsServer:
+    """Serves ``/metrics`` (and, when ``profiler`` is set, ``/debug/profile?seconds=N&hz=H``) for
+    processes without the API, such as trackers and supervisor workers."""
+
+    def __init__(
+        self, port: int, host: str = "0.0.0.0", registry: MetricsRegistry = REGISTRY, profiler: SamplingProfiler | None = None
+    ) -> None:
+        self.registry = registry
+        self.profiler = profiler
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.owner = self  # type: ignore[attr-defined]
+        self.port = self._server.server_address[1]
+
+    def start(self) -> None:
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server: Any
+
+    def do_GET(self) -> None:  # noqa: N802
+        owner: MetricsServer = self.server.owner
+        url = urlparse(self.path)
+        if url.path == "/metrics":
+            self._reply(200, CONTENT_TYPE, owner.registry.render().encode())
+            return
+        if url.path == "/debug/profile":
+            if owner.profiler is None:
+                self.send_error(404, "Profiling is disabled (--enable-profiler)")
+                return
+            query = parse_qs(url.query)
+            try:
+                seconds = float(query.get("seconds", ["10"])[0])
+                hz = float(query.get("hz", [str(settings.metrics.profile_hz)])[0])
+            except ValueError:
+                self.send_error(400, "seconds and hz must be numbers")
+                return
+            try:
+                folded = owner.profiler.profile(seconds, hz)
+            except ValueError as exc:
+                self.send_error(400, str(exc))
+                return
+            except ProfilerBusy as exc:
+                self.send_error(409, str(exc))
+                return
+            self._reply(200, "text/plain; charset=utf-8", folded.encode())
+            return
+        self.send_error(404)
+
+    def _reply(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
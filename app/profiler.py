@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from app.config import settings
+
+
+class ProfilerBusy(RuntimeError):
+    """A profile is already being taken in this process."""
+
+
+def _frame_label(code: object) -> str:
+    filename = os.path.basename(getattr(code, "co_filename", "?"))
+    return f"{getattr(code, 'co_qualname', getattr(code, 'co_name', '?'))} ({filename})"
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler over every thread of this process.
+
+    Every ``1 / hz`` seconds it walks ``sys._current_frames()`` and counts each thread's stack,
+    so there is no tracing overhead between samples and nothing runs until a profile is asked
+    for. The result is in the folded-stack format (``thread;outer;...;inner count`` per line)
+    read by ``flamegraph.pl`` and speedscope. Threads blocked on a queue or lock are sampled too,
+    which is what shows a pipeline stage waiting on its neighbour.
+    """
+
+    def __init__(self, max_seconds: float = 60.0, max_hz: float = 1000.0) -> None:
+        self.max_seconds = max_seconds
+        self.max_hz = max_hz
+        self._lock = threading.Lock()
+
+    def profile(self, seconds: float, hz: float = 100.0) -> str:
+        # NaN slips through min/max clamping (every comparison is False), so reject it up front.
+        if not (math.isfinite(seconds) and math.isfinite(hz)):
+            raise ValueError("seconds and hz must be finite numbers")
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            return self._sample(min(max(seconds, 0.0), self.max_seconds), min(max(hz, 1.0), self.max_hz))
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, hz: float) -> str:
+        stacks: Counter[str] = Counter()
+        labels: dict[object, str] = {}
+        me = threading.get_ident()
+        interval = 1.0 / hz
+        deadline = time.perf_counter() + seconds
+        next_at = time.perf_counter()
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                parts: list[str] = []
+                current = frame
+                while current is not None:
+                    code = current.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    parts.append(label)
+                    current = current.f_back
+                parts.append(names.get(ident, f"thread-{ident}"))
+                stacks[";".join(reversed(parts))] += 1
+            next_at += interval
+            if next_at >= deadline:
+                break
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+PROFILER = SamplingProfiler(settings.metrics.max_profile_seconds)
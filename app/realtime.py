@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi import WebSocket
+
+from app.analytics.alerts import overcrowding_trigger
+from app.config import settings
+
+
+@dataclass
+class CameraOccupancy:
+    people_count: int
+    published_at: float
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "people_count": self.people_count,
+            "triggered": overcrowding_trigger(self.people_count),
+            "published_at": self.published_at,
+        }
+
+
+class _Subscriber:
+    def __init__(self, websocket: WebSocket, queue_size: int) -> None:
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.closed = asyncio.Event()
+
+    def offer(self, message: str) -> bool:
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+
+class OccupancyHub:
+    """In-process occupancy store that fans changes out to WebSocket subscribers.
+
+    ``publish`` is thread-safe and only marks a camera dirty. A single flush task broadcasts the
+    changed cameras at most once per ``coalesce_seconds``, serializing each delta once for all
+    clients. Every client has a bounded send queue; a client whose queue is full is disconnected
+    (it gets a fresh snapshot when it reconnects) so one slow tablet cannot hold back the rest.
+    """
+
+    def __init__(
+        self,
+        coalesce_seconds: float = settings.realtime.coalesce_seconds,
+        client_queue_size: int = settings.realtime.client_queue_size,
+        ping_seconds: float = settings.websocket_ping_seconds,
+    ) -> None:
+        self.coalesce_seconds = coalesce_seconds
+        self.client_queue_size = client_queue_size
+        self.ping_seconds = ping_seconds
+        self.cameras: dict[str, CameraOccupancy] = {}
+        self.slow_consumers_dropped = 0
+        self.broadcasts = 0
+
+        self._dirty: set[str] = set()
+        self._lock = threading.Lock()
+        self._subscribers: set[_Subscriber] = set()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, camera_id: str, people_count: int) -> None:
+        with self._lock:
+            current = self.cameras.get(camera_id)
+            if current is not None and current.people_count == people_count:
+                return
+            self.cameras[camera_id] = CameraOccupancy(people_count, time.time())
+            self._dirty.add(camera_id)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            cameras = {camera_id: state.as_dict() for camera_id, state in self.cameras.items()}
+        return {"event": "occupancy_snapshot", "cameras": cameras, "timestamp": _now_iso()}
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "subscribers": self.subscriber_count,
+            "cameras": len(self.cameras),
+            "broadcasts": self.broadcasts,
+            "slow_consumers_dropped": self.slow_consumers_dropped,
+        }
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        for subscriber in list(self._subscribers):
+            subscriber.closed.set()
+
+    async def serve(self, websocket: WebSocket) -> None:
+        """Stream a snapshot then deltas to ``websocket``; inbound counts are published to the hub."""
+        subscriber = _Subscriber(websocket, self.client_queue_size)
+        subscriber.offer(json.dumps(self.snapshot()))
+        self._subscribers.add(subscriber)
+        sender = asyncio.create_task(self._send_loop(subscriber))
+        receiver = asyncio.create_task(self._receive_loop(subscriber))
+        try:
+            await subscriber.closed.wait()
+        finally:
+            self._subscribers.discard(subscriber)
+            for task in (sender, receiver):
+                task.cancel()
+            await asyncio.gather(sender, receiver, return_exceptions=True)
+            try:
+                await websocket.close()
+            except Exception:
+                pass
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.coalesce_seconds)
+            with self._lock:
+                if not self._dirty:
+                    continue
+                changed = {camera_id: self.cameras[camera_id].as_dict() for camera_id in self._dirty}
+                self._dirty.clear()
+            self._broadcast(json.dumps({"event": "occupancy_delta", "cameras": changed, "timestamp": _now_iso()}))
+
+    def _broadcast(self, message: str) -> None:
+        self.broadcasts += 1
+        for subscriber in list(self._subscribers):
+            if not subscriber.offer(message):
+                self.slow_consumers_dropped += 1
+                self._subscribers.discard(subscriber)
+                subscriber.closed.set()
+
+    async def _send_loop(self, subscriber: _Subscriber) -> None:
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=self.ping_seconds)
+                except asyncio.TimeoutError:
+                    message = json.dumps({"event": "ping", "timestamp": _now_iso()})
+                await subscriber.websocket.send_text(message)
+        except Exception:
+            subscriber.closed.set()
+
+    async def _receive_loop(self, subscriber: _Subscriber) -> None:
+        try:
+            while True:
+                try:
+                    payload = await subscriber.websocket.receive_json()
+                    camera_id, people_count = str(payload["camera_id"]), int(payload["people_count"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self.publish(camera_id, people_count)
+        except Exception:
+            subscriber.closed.set()
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
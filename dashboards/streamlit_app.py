@@ -1,8 +1,20 @@
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta, timezone
+from urllib.parse import urlencode
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.engine import create_db_engine
+from app.db.export import EXPORT_TABLES
+from app.db.heatmaps import DAILY, LIVE, load_heatmaps
+from app.db.rollups import load_rollups
+
+ROLLUP_TTL_SECONDS = 60
 
 st.set_page_config(page_title="Retail Vision Management", layout="wide")
 st.title("Retail Vision — Management Analytics")
@@ -15,30 +27,136 @@ if start_date > end_date:
     st.error("Start date must be before end date")
     st.stop()
 
+
+@st.cache_resource
+def _engine():
+    return create_db_engine(settings.postgres_url)
+
+
+@st.cache_data(ttl=ROLLUP_TTL_SECONDS)
+def _rollups(metric: str, start: date, end: date) -> pd.DataFrame:
+    window_start = datetime.combine(start, time.min, tzinfo=timezone.utc)
+    window_end = datetime.combine(end + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    with Session(_engine()) as session:
+        rows = load_rollups(session, metric, window_start, window_end)
+    frame = pd.DataFrame(rows, columns=["bucket_start", "camera_id", "dimension", "value_sum", "value_count"])
+    frame["date"] = pd.to_datetime(frame["bucket_start"]).dt.tz_localize(None).dt.normalize()
+    return frame
+
+
+@st.cache_data(ttl=ROLLUP_TTL_SECONDS)
+def _heatmaps(kind: str, start: date, end: date) -> dict[str, np.ndarray]:
+    """Per-camera grids summed over the date range (``live`` rows hold the current decayed grid)."""
+    window_start = datetime.combine(start, time.min, tzinfo=timezone.utc)
+    window_end = datetime.combine(end + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    with Session(_engine()) as session:
+        rows = load_heatmaps(session, kind, window_start, window_end)
+    grids: dict[str, np.ndarray] = {}
+    for row in rows:
+        grid = grids.get(row["camera_id"])
+        grids[row["camera_id"]] = row["grid"].copy() if grid is None or grid.shape != row["grid"].shape else grid + row["grid"]
+    return grids
+
+
+def _daily(frame: pd.DataFrame, column: str, dates: pd.DatetimeIndex) -> pd.Series:
+    return frame.groupby("date")[column].sum().reindex(dates, fill_value=0)
+
+
 date_series = pd.date_range(start=start_date, end=end_date, freq="D")
-index = range(len(date_series))
-mock_data = pd.DataFrame(
-    {
-        "date": date_series,
-        "footfall": [180 + (i * 9) % 110 for i in index],
-        "product_popularity": [70 + (i * 7) % 40 for i in index],
-    }
-)
+try:
+    footfall = _rollups("footfall", start_date, end_date)
+    interactions = _rollups("interactions", start_date, end_date)
+    dwell = _rollups("dwell", start_date, end_date)
+    alerts = _rollups("alerts", start_date, end_date)
+except (SQLAlchemyError, ImportError):
+    st.warning("Analytics database unavailable — showing sample data.")
+    index = range(len(date_series))
+    report = pd.DataFrame(
+        {
+            "date": date_series,
+            "footfall": [180 + (i * 9) % 110 for i in index],
+            "product_popularity": [70 + (i * 7) % 40 for i in index],
+        }
+    )
+    by_product = pd.DataFrame(columns=["dimension", "value_count"])
+    by_alert = pd.DataFrame(columns=["dimension", "value_count"])
+else:
+    dwell_sum = _daily(dwell, "value_sum", date_series)
+    dwell_count = _daily(dwell, "value_count", date_series)
+    report = pd.DataFrame(
+        {
+            "date": date_series,
+            "footfall": _daily(footfall, "value_count", date_series).to_numpy(),
+            "product_popularity": _daily(interactions, "value_count", date_series).to_numpy(),
+            "avg_dwell_seconds": (dwell_sum / dwell_count.where(dwell_count > 0)).fillna(0.0).round(1).to_numpy(),
+            "alerts": _daily(alerts, "value_count", date_series).to_numpy(),
+        }
+    )
+    by_product = interactions.groupby("dimension", as_index=False)["value_count"].sum()
+    by_alert = alerts.groupby("dimension", as_index=False)["value_count"].sum()
 
 st.subheader("Historical Reports")
 c1, c2 = st.columns(2)
 with c1:
-    st.plotly_chart(px.line(mock_data, x="date", y="footfall", title="Daily Footfall Trends"), use_container_width=True)
+    st.plotly_chart(px.line(report, x="date", y="footfall", title="Daily Footfall Trends"), use_container_width=True)
 with c2:
     st.plotly_chart(
-        px.bar(mock_data, x="date", y="product_popularity", title="Product Popularity (Interactions)"),
+        px.bar(report, x="date", y="product_popularity", title="Product Popularity (Interactions)"),
         use_container_width=True,
     )
 
+if "avg_dwell_seconds" in report:
+    c3, c4 = st.columns(2)
+    with c3:
+        st.plotly_chart(
+            px.line(report, x="date", y="avg_dwell_seconds", title="Average Dwell Time (s)"),
+            use_container_width=True,
+        )
+    with c4:
+        st.plotly_chart(
+            px.bar(by_product, x="dimension", y="value_count", title="Interactions by Product"),
+            use_container_width=True,
+        )
+    if not by_alert.empty:
+        st.plotly_chart(px.bar(by_alert, x="dimension", y="value_count", title="Alerts by Type"), use_container_width=True)
+
+st.subheader("Occupancy Heatmaps")
+try:
+    daily_heatmaps = _heatmaps(DAILY, start_date, end_date)
+    live_heatmaps = _heatmaps(LIVE, end_date, end_date)
+except (SQLAlchemyError, ImportError):
+    daily_heatmaps, live_heatmaps = {}, {}
+cameras = sorted(set(daily_heatmaps) | set(live_heatmaps))
+if not cameras:
+    st.info("No heatmaps yet — they appear as trackers run, or after `python -m scripts.build_heatmaps`.")
+else:
+    camera = st.selectbox("Camera", cameras)
+    h1, h2 = st.columns(2)
+    with h1:
+        if camera in daily_heatmaps:
+            st.plotly_chart(
+                px.imshow(daily_heatmaps[camera], color_continuous_scale="Inferno", title="Occupancy over the date range"),
+                use_container_width=True,
+            )
+    with h2:
+        if camera in live_heatmaps:
+            st.plotly_chart(
+                px.imshow(live_heatmaps[camera], color_continuous_scale="Inferno", title="Live occupancy (decayed)"),
+                use_container_width=True,
+            )
+
 st.subheader("Export")
+# The report is one row per day, so it is built in memory; raw telemetry is streamed by the API.
 st.download_button(
     "Export CSV report",
-    data=mock_data.to_csv(index=False),
+    data=report.to_csv(index=False),
     file_name="retail_vision_report.csv",
     mime="text/csv",
 )
+export_table = st.selectbox("Raw telemetry", list(EXPORT_TABLES))
+export_query = urlencode({"start": start_date.isoformat(), "end": end_date.isoformat()})
+st.link_button(
+    f"Download {export_table} (.csv.gz)",
+    f"{settings.export.api_base_url.rstrip('/')}/export/{export_table}?{export_query}",
+)
+st.caption("Streamed from the API chunk by chunk. For scheduled Parquet exports use `python -m scripts.export_telemetry`.")
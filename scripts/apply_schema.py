@@ -1,39 +1,36 @@
 from __future__ import annotations
 
-import pathlib
-
-from sqlalchemy import create_engine
+import argparse
 
 from app.config import settings
-
-
-def split_sql_statements(sql_text: str) -> list[str]:
-    chunks = []
-    current = []
-    for line in sql_text.splitlines():
-        stripped = line.strip()
-        if not stripped or stripped.startswith("--"):
-            continue
-        current.append(line)
-        if stripped.endswith(";"):
-            chunks.append("\n".join(current).strip())
-            current = []
-    if current:
-        chunks.append("\n".join(current).strip())
-    return chunks
+from app.db.engine import create_db_engine
+from app.db.migrate import discover_migrations, migrate, pending_migrations
+from app.db.partitions import PartitionManager
 
 
 def main() -> None:
-    schema_path = pathlib.Path("app/db/schema.sql")
-    sql_text = schema_path.read_text(encoding="utf-8")
-    statements = split_sql_statements(sql_text)
-
-    engine = create_engine(settings.postgres_url, future=True)
-    with engine.begin() as conn:
-        for stmt in statements:
-            conn.exec_driver_sql(stmt)
-
-    print(f"Applied {len(statements)} SQL statements to {settings.postgres_url}")
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations from app/db/migrations")
+    parser.add_argument("--url", default=settings.postgres_url, help="Use a direct or session-mode URL, not a transaction pooler.")
+    parser.add_argument("--target", type=int, default=None, help="Stop after this migration version.")
+    parser.add_argument("--status", action="store_true", help="List applied and pending migrations without applying.")
+    args = parser.parse_args()
+
+    engine = create_db_engine(args.url)
+    if args.status:
+        pending = {m.version for m in pending_migrations(engine)}
+        for migration in discover_migrations():
+            print(f"{'pending' if migration.version in pending else 'applied'}  {migration.label}")
+        return
+
+    applied = migrate(engine, target=args.target)
+    for migration in applied:
+        print(f"Applied {migration.label}")
+    print(f"{len(applied)} migration(s) applied to {engine.url.render_as_string(hide_password=True)}")
+
+    if not pending_migrations(engine):
+        created = PartitionManager(engine).ensure()
+        if created:
+            print(f"Created partitions: {', '.join(created)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+"""Compare per-frame CPU detection latency across detector backends.
+
+Each backend is loaded (and warmed up) once, then timed over the same frames: the synthetic
+replay scene, or frames from --video. ONNX Runtime is measured at every --onnx-threads value.
+Backends that cannot load on this machine are reported with the reason instead of failing.
+
+    python -m scripts.bench_detectors --onnx-model yolov8n.onnx --onnx-threads 1,2,4 --frames 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+from app.analytics.detectors import OnnxDetector, UltralyticsDetector, warm_up
+from app.analytics.replay import StubDetector, SyntheticCapture, VideoFileCapture
+from app.config import settings
+
+
+def _frames(args: argparse.Namespace) -> list[np.ndarray]:
+    import cv2
+
+    source: Any = VideoFileCapture(args.video) if args.video else SyntheticCapture(args.width, args.height)
+    frames = []
+    while len(frames) < args.frames:
+        ok, frame = source.read()
+        if not ok:
+            break
+        frames.append(cv2.resize(frame, (args.width, args.height)))
+    source.release()
+    return frames
+
+
+def _measure(build: Callable[[], Any], frames: list[np.ndarray], imgsz: tuple[int, int], warmup: int) -> dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        detector = build()
+    except Exception as exc:  # missing package or weights: report and move on
+        return {"error": f"{type(exc).__name__}: {exc}"}
+    load_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    warm_up(detector, imgsz, warmup)
+    warmup_s = time.perf_counter() - started
+
+    latencies = np.empty(len(frames))
+    boxes = 0
+    for i, frame in enumerate(frames):
+        started = time.perf_counter()
+        result = detector.predict(frame, conf=settings.detection.confidence_threshold, verbose=False)[0]
+        latencies[i] = time.perf_counter() - started
+        boxes += len(result.boxes.data)
+
+    ms = latencies * 1000.0
+    return {
+        "load_s": round(load_s, 3),
+        "warmup_s": round(warmup_s, 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "fps": round(1000.0 / float(ms.mean()), 1),
+        "boxes_per_frame": round(boxes / len(frames), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=settings.detection.model_path, help="Weights for the ultralytics backend.")
+    parser.add_argument("--onnx-model", default=settings.detection.onnx_model_path)
+    parser.add_argument("--onnx-threads", default="0", help="Comma-separated intra-op thread counts (0 = ORT default).")
+    parser.add_argument("--video", default=None)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--width", type=int, default=settings.detection.frame_width)
+    parser.add_argument("--height", type=int, default=settings.detection.frame_height)
+    parser.add_argument("--warmup", type=int, default=settings.detection.warmup_runs)
+    parser.add_argument("--skip-ultralytics", action="store_true")
+    args = parser.parse_args()
+
+    imgsz = (args.height, args.width)
+    frames = _frames(args)
+    backends: dict[str, Callable[[], Any]] = {"stub": StubDetector}
+    if not args.skip_ultralytics:
+        backends[f"ultralytics:{args.model}"] = lambda: UltralyticsDetector(args.model, imgsz)
+    if args.onnx_model:
+        for threads in (int(t) for t in args.onnx_threads.split(",")):
+            backends[f"onnxruntime:threads={threads}"] = lambda threads=threads: OnnxDetector(
+                args.onnx_model,
+                imgsz,
+                intra_op_threads=threads,
+                inter_op_threads=settings.detection.onnx_inter_op_threads,
+                providers=settings.detection.onnx_providers,
+                iou_threshold=settings.detection.iou_threshold,
+            )
+
+    report = {
+        "frames": len(frames),
+        "imgsz": list(imgsz),
+        "cpu_count": os.cpu_count(),
+        "backends": {name: _measure(build, frames, imgsz, args.warmup) for name, build in backends.items()},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Measure export throughput and peak memory on a generated multi-million-row dataset.
+
+Fills a database with ``scripts.generate_synthetic_data`` (a temporary SQLite file unless --url
+or --db is given; --db keeps the file so later runs skip generation), then exports --table over
+the whole generated range once per mode, each in a fresh process: the streaming ``parquet`` and
+``csv`` (gzip) exports, and ``pandas``, the read-everything-then-``to_csv`` approach they replace.
+The report has rows/s, output size and the process's peak RSS above its post-import baseline.
+
+    python -m scripts.bench_export --customers 50000 --movements-per-customer 40 --db /tmp/export_bench.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func, select
+
+from app.db.engine import create_db_engine
+from app.db.models import Base, Movement
+from scripts.generate_synthetic_data import generate
+
+MODES = ("parquet", "csv", "pandas")
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def run_child(options: dict[str, Any]) -> dict[str, Any]:
+    """One export in this process; prints its result with peak RSS before and after."""
+    from app.db.export import EXPORT_TABLES, export_table
+
+    engine = create_db_engine(options["url"])
+    start, end = date.fromisoformat(options["start"]), date.fromisoformat(options["end"])
+    out = Path(options["out"])
+    if options["mode"] == "pandas":
+        import pandas as pd
+
+        baseline = _peak_rss_mb()
+        started = time.perf_counter()
+        query = EXPORT_TABLES[options["table"]](
+            datetime(start.year, start.month, start.day, tzinfo=timezone.utc),
+            datetime(end.year, end.month, end.day, tzinfo=timezone.utc) + timedelta(days=1),
+        )
+        with engine.connect() as connection:
+            frame = pd.read_sql(query, connection)
+        path = out / f"{options['table']}.csv.gz"
+        frame.to_csv(path, index=False, compression="gzip")
+        stats = {"rows": len(frame), "files": 1, "mb": round(path.stat().st_size / (1024.0 * 1024.0), 2)}
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        stats["rows_per_second"] = round(stats["rows"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+    else:
+        if options["mode"] == "parquet":
+            # Loaded before the baseline so the library itself is not counted as export memory.
+            importlib.import_module("pyarrow.parquet")
+
+        baseline = _peak_rss_mb()
+        stats = export_table(
+            engine, options["table"], start, end, out, options["mode"], chunk_rows=options["chunk_rows"]
+        ).as_dict()
+    peak = _peak_rss_mb()
+    return {**stats, "baseline_rss_mb": round(baseline, 1), "peak_rss_mb": round(peak, 1), "export_rss_mb": round(peak - baseline, 1)}
+
+
+def _seed(url: str, args: argparse.Namespace) -> int:
+    engine = create_db_engine(url)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+    with engine.connect() as connection:
+        existing = int(connection.scalar(select(func.count()).select_from(Movement)))
+    if existing == 0:
+        started = time.perf_counter()
+        counts = generate(engine, args.customers, args.movements_per_customer, cameras=args.cameras, days=args.days)
+        print(f"Generated {counts} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    with engine.connect() as connection:
+        return int(connection.scalar(select(func.count()).select_from(Movement)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Database to export from (default: SQLite at --db or a temporary file).")
+    parser.add_argument("--db", default=None, help="SQLite file to generate into and reuse across runs.")
+    parser.add_argument("--customers", type=int, default=50_000)
+    parser.add_argument("--movements-per-customer", type=int, default=40)
+    parser.add_argument("--cameras", type=int, default=8)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--table", default="movements")
+    parser.add_argument("--mode", action="append", choices=MODES, help="Modes to run (default: all).")
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{args.db or Path(tmp) / 'export_bench.db'}"
+        movements = _seed(url, args)
+        # The generator spreads rows over the --days before now; one spare day covers the edges.
+        end = datetime.now(timezone.utc).date()
+        start = end - timedelta(days=args.days + 1)
+        results: dict[str, Any] = {}
+        for mode in args.mode or MODES:
+            out = Path(tmp) / mode
+            out.mkdir()
+            options = {
+                "mode": mode,
+                "url": url,
+                "table": args.table,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "out": str(out),
+                "chunk_rows": args.chunk_rows,
+            }
+            done = subprocess.run(
+                [sys.executable, "-W", "ignore", "-m", "scripts.bench_export", "--child", json.dumps(options)],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            results[mode] = json.loads(done.stdout.strip().splitlines()[-1])
+
+    report = {
+        "database": url.split("://", 1)[0],
+        "movements": movements,
+        "table": args.table,
+        "chunk_rows": args.chunk_rows,
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
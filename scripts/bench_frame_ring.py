@@ -0,0 +1,128 @@
+"""Compare handing frames to another process by pickling them vs. through a shared-memory ring.
+
+Each camera is a producer process that renders 1280x720 frames at --fps, resizes them to the
+model size and sends them to the consumer (this process) either as pickled arrays over a
+``multiprocessing`` queue or as ``FrameRef`` slot indices into its ``FrameRing``. The consumer
+touches every frame and reports throughput, hand-off latency, ring overruns and peak RSS.
+
+    python -m scripts.bench_frame_ring --cameras 4 --fps 30 --seconds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import queue
+import time
+from typing import Any
+
+import cv2
+import numpy as np
+
+from app.analytics.frame_ring import FrameRing, FrameRingSpec
+from app.analytics.replay import SyntheticCapture, peak_rss_mb
+from app.config import settings
+
+
+def _producer(
+    camera: int, mode: str, spec: FrameRingSpec | None, out: Any, args: argparse.Namespace, stop: Any
+) -> None:
+    capture = SyntheticCapture(1280, 720, seed=camera)
+    ring = FrameRing.attach(spec) if spec is not None else None
+    raw = None
+    resized = np.empty((args.height, args.width, 3), dtype=np.uint8)
+    interval = 1.0 / args.fps
+    next_at = time.perf_counter()
+    frame_id = 0
+    while not stop.is_set():
+        ok, raw = capture.read(raw)
+        frame_id += 1
+        if ring is not None:
+            ref = ring.write(raw, frame_id, time.time(), str(camera))
+            if ref is not None:
+                out.put(ref)
+        else:
+            cv2.resize(raw, (args.width, args.height), dst=resized)
+            out.put((camera, frame_id, time.time(), resized))
+        next_at += interval
+        time.sleep(max(next_at - time.perf_counter(), 0.0))
+    if ring is not None:
+        ring.close()
+
+
+def run(mode: str, args: argparse.Namespace) -> dict[str, Any]:
+    context = mp.get_context("spawn")
+    frames_in: Any = context.Queue(maxsize=args.cameras * 64)
+    stop = context.Event()
+    rings = [FrameRing.create(args.slots, args.height, args.width) for _ in range(args.cameras)] if mode == "ring" else []
+    producers = [
+        context.Process(target=_producer, args=(i, mode, rings[i].spec if rings else None, frames_in, args, stop))
+        for i in range(args.cameras)
+    ]
+    for process in producers:
+        process.start()
+
+    latencies: list[float] = []
+    checksum = 0
+    item = frames_in.get()  # start the clock once the (spawned) producers are running
+    started = time.perf_counter()
+    deadline = started + args.seconds
+    while time.perf_counter() < deadline:
+        if item is None:
+            try:
+                item = frames_in.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        if mode == "ring":
+            ring = rings[int(item.camera_id)]
+            frame, captured_at = ring.frame(item), item.captured_at
+        else:
+            _, _, captured_at, frame = item
+        checksum += int(frame[::64, ::64, 0].sum())
+        latencies.append(time.time() - captured_at)
+        if mode == "ring":
+            ring.release(item)
+        item = None
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    while any(process.is_alive() for process in producers):
+        # Keep draining so producers blocked on a full queue can see ``stop``.
+        try:
+            frames_in.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    ms = np.asarray(latencies) * 1000.0
+    report: dict[str, Any] = {
+        "frames": len(latencies),
+        "fps": round(len(latencies) / elapsed, 1),
+        "target_fps": args.cameras * args.fps,
+        "handoff_p50_ms": round(float(np.percentile(ms, 50)), 3) if len(ms) else 0.0,
+        "handoff_p99_ms": round(float(np.percentile(ms, 99)), 3) if len(ms) else 0.0,
+        "consumer_peak_rss_mb": peak_rss_mb(),
+    }
+    if rings:
+        report["overruns"] = sum(ring.snapshot()["overruns"] for ring in rings)
+        for ring in rings:
+            ring.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cross-process frame hand-off")
+    parser.add_argument("--cameras", type=int, default=4)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--slots", type=int, default=8, help="Ring slots per camera.")
+    parser.add_argument("--width", type=int, default=settings.detection.frame_width)
+    parser.add_argument("--height", type=int, default=settings.detection.frame_height)
+    parser.add_argument("--mode", choices=["pickle", "ring", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["pickle", "ring"] if args.mode == "both" else [args.mode]
+    print(json.dumps({mode: run(mode, args) for mode in modes}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
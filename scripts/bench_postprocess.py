@@ -0,0 +1,140 @@
+"""Compare the per-box detection loop against the vectorized ClassFilter path.
+
+Runs on synthetic ultralytics-like results. Uses torch tensors when torch is installed so the
+device-to-host copies are realistic, otherwise a small NumPy-backed stand-in.
+
+    python -m scripts.bench_postprocess --boxes 50 --frames 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any
+
+import numpy as np
+
+from app.analytics.postprocess import ClassFilter
+
+NAMES = {i: f"class_{i}" for i in range(80)} | {0: "person", 24: "backpack", 39: "bottle"}
+TARGETS = {"person", "bottle", "backpack"}
+
+
+class _Tensor:
+    def __init__(self, array: np.ndarray) -> None:
+        self.array = array
+
+    def cpu(self) -> _Tensor:
+        return self
+
+    def numpy(self) -> np.ndarray:
+        return self.array
+
+    def item(self) -> float:
+        return self.array.item()
+
+    def __getitem__(self, index: Any) -> _Tensor:
+        return _Tensor(self.array[index])
+
+
+class _Box:
+    def __init__(self, row: Any, tensor: Any) -> None:
+        self.xyxy = tensor(row[None, :4])
+        self.conf = tensor(row[4:5])
+        self.cls = tensor(row[5:6])
+
+
+class _Boxes:
+    def __init__(self, data: np.ndarray, tensor: Any) -> None:
+        self.data = tensor(data)
+        self._boxes = [_Box(row, tensor) for row in data]
+
+    def __iter__(self):
+        return iter(self._boxes)
+
+
+class _Result:
+    def __init__(self, data: np.ndarray, tensor: Any) -> None:
+        self.names = NAMES
+        self.boxes = _Boxes(data, tensor)
+
+
+def _tensor_factory() -> tuple[Any, str]:
+    try:
+        import torch
+
+        return (lambda a: torch.from_numpy(np.ascontiguousarray(a))), "torch"
+    except ImportError:
+        return _Tensor, "numpy"
+
+
+def make_results(frames: int, boxes: int, seed: int = 0) -> tuple[list[_Result], str]:
+    tensor, backend = _tensor_factory()
+    rng = np.random.default_rng(seed)
+    results = []
+    for _ in range(frames):
+        xy = rng.uniform(0, 600, size=(boxes, 2)).astype(np.float32)
+        wh = rng.uniform(10, 120, size=(boxes, 2)).astype(np.float32)
+        conf = rng.uniform(0.5, 1.0, size=(boxes, 1)).astype(np.float32)
+        cls = rng.choice([0, 0, 0, 24, 39, 56, 62], size=(boxes, 1)).astype(np.float32)
+        results.append(_Result(np.hstack([xy, xy + wh, conf, cls]), tensor))
+    return results, backend
+
+
+def per_box_loop(result: Any, target_classes: set[str]) -> list[tuple[list[float], float, str]]:
+    deep_sort_input = []
+    names = result.names
+    for box in result.boxes:
+        class_id = int(box.cls.item())
+        confidence = float(box.conf.item())
+        label = names[class_id]
+        if label not in target_classes:
+            continue
+        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().tolist()
+        if label == "person":
+            deep_sort_input.append(([x1, y1, x2 - x1, y2 - y1], confidence, label))
+    return deep_sort_input
+
+
+def vectorized(result: Any, class_filter: ClassFilter) -> list[tuple[list[float], float, str]]:
+    return class_filter.tracked(class_filter.apply(result)).to_deep_sort()
+
+
+def _time(fn: Any, results: list[Any]) -> float:
+    started = time.perf_counter()
+    for result in results:
+        fn(result)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--boxes", type=int, default=50)
+    args = parser.parse_args()
+
+    results, backend = make_results(args.frames, args.boxes)
+    class_filter = ClassFilter(NAMES, TARGETS)
+
+    assert len(per_box_loop(results[0], TARGETS)) == len(vectorized(results[0], class_filter))
+    loop_s = _time(lambda r: per_box_loop(r, TARGETS), results)
+    vec_s = _time(lambda r: vectorized(r, class_filter), results)
+
+    print(
+        json.dumps(
+            {
+                "backend": backend,
+                "frames": args.frames,
+                "boxes_per_frame": args.boxes,
+                "per_box_loop_us_per_frame": round(1e6 * loop_s / args.frames, 2),
+                "vectorized_us_per_frame": round(1e6 * vec_s / args.frames, 2),
+                "speedup": round(loop_s / vec_s, 2) if vec_s else None,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Measure re-identification query latency and recall as the embedding gallery grows.
+
+Fills an ``EmbeddingIndex`` with synthetic customers (a random unit "identity" vector plus
+per-view noise) and, at each gallery size, times batches of nearest-neighbour queries from new
+views of known customers with the exact and the approximate search. The report has per-batch
+latency percentiles for both paths, how often the approximate top-1 agrees with the exact one,
+how often the exact top-1 is the right customer, and the gallery's memory.
+
+    python -m scripts.bench_reid --dim 512 --sizes 1000,5000,10000,25000,50000 --batch 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any
+
+import numpy as np
+
+from app.analytics.reid import EmbeddingIndex, normalize
+from app.config import settings
+
+
+def _views(identities: np.ndarray, noise: float, rng: np.random.Generator) -> np.ndarray:
+    return normalize(identities + noise * rng.standard_normal(identities.shape).astype(np.float32) / np.sqrt(identities.shape[1]))
+
+
+def _percentiles_ms(samples: list[float]) -> dict[str, float]:
+    ms = np.asarray(samples) * 1000.0
+    return {"p50": round(float(np.percentile(ms, 50)), 3), "p99": round(float(np.percentile(ms, 99)), 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dim", type=int, default=512, help="Embedding width (DeepSORT's MobileNet gives 1280).")
+    parser.add_argument("--sizes", default="1000,5000,10000,25000,50000", help="Comma-separated gallery sizes.")
+    parser.add_argument("--batch", type=int, default=16, help="Queries per search (new tracks in one frame).")
+    parser.add_argument("--batches", type=int, default=50, help="Timed searches per gallery size and path.")
+    parser.add_argument("--noise", type=float, default=0.8, help="Per-view noise relative to the identity vector.")
+    parser.add_argument("--projection-dim", type=int, default=settings.reid.projection_dim)
+    parser.add_argument("--rerank-candidates", type=int, default=settings.reid.rerank_candidates)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.sizes.split(",") if size.strip())
+    rng = np.random.default_rng(args.seed)
+    index = EmbeddingIndex(
+        window_seconds=float("inf"),
+        search="exact",
+        projection_dim=args.projection_dim,
+        rerank_candidates=args.rerank_candidates,
+        seed=args.seed,
+    )
+    identities = normalize(rng.standard_normal((sizes[-1], args.dim)).astype(np.float32))
+
+    results: list[dict[str, Any]] = []
+    filled = 0
+    upsert_s = 0.0
+    for size in sizes:
+        started = time.perf_counter()
+        for start in range(filled, size, 1000):
+            stop = min(size, start + 1000)
+            keys = [f"customer-{i}" for i in range(start, stop)]
+            index.upsert(keys, _views(identities[start:stop], args.noise, rng), "bench", 0.0, [0.0] * len(keys))
+        upsert_s += time.perf_counter() - started
+        filled = size
+
+        truth = [rng.integers(0, size, args.batch) for _ in range(args.batches)]
+        queries = [_views(identities[ids], args.noise, rng) for ids in truth]
+        row: dict[str, Any] = {"gallery": size}
+        top1: dict[str, list[np.ndarray]] = {}
+        for mode in ("exact", "approximate"):
+            index.search_mode = mode
+            index.search(queries[0], k=1)  # warm-up
+            latencies = []
+            top1[mode] = []
+            for batch in queries:
+                started = time.perf_counter()
+                _, rows = index.search(batch, k=1)
+                latencies.append(time.perf_counter() - started)
+                top1[mode].append(rows[:, 0])
+            row[f"{mode}_ms"] = _percentiles_ms(latencies)
+            row[f"{mode}_queries_per_second"] = round(args.batch * len(latencies) / sum(latencies), 1)
+        exact, approximate = np.concatenate(top1["exact"]), np.concatenate(top1["approximate"])
+        # Rows were filled in customer order and nothing was evicted, so row i is customer i.
+        row["approximate_recall_at_1"] = round(float(np.mean(exact == approximate)), 4)
+        row["exact_accuracy"] = round(float(np.mean(exact == np.concatenate(truth))), 4)
+        row["speedup"] = round(row["exact_ms"]["p50"] / row["approximate_ms"]["p50"], 2) if row["approximate_ms"]["p50"] else None
+        row["gallery_mb"] = round(index.nbytes / (1024.0 * 1024.0), 1)
+        results.append(row)
+
+    report = {
+        "dim": args.dim,
+        "batch": args.batch,
+        "projection_dim": args.projection_dim,
+        "rerank_candidates": args.rerank_candidates,
+        "upserts_per_second": round(sizes[-1] / upsert_s, 1) if upsert_s else 0.0,
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Replay a video file or a synthetic scene through the tracker pipeline and report throughput.
+
+Runs capture → detect → track → persist headless, as fast as possible or at --rate FPS, with a
+weight-free stub detector unless --real-model is given. Prints per-stage latency percentiles,
+sustained FPS, telemetry rows/s and peak RSS as JSON (also written to --output) so runs from
+different versions can be diffed. Any camera_tracking flag (e.g. --adaptive-cadence,
+--queue-size, --zones-file) is accepted.
+
+    python -m scripts.bench_replay --source synthetic --frames 1500 --stub-latency-ms 25
+    python -m scripts.bench_replay --source recordings/aisle3.mp4 --loops 3 --rate 15
+"""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import platform
+import subprocess
+import tempfile
+
+from app.analytics.camera_tracking import CameraTrackerApp, build_parser, validate_args
+from app.analytics.replay import PacedCapture, StubDetector, SyntheticCapture, VideoFileCapture, run_replay
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = build_parser()
+    parser.description = __doc__.splitlines()[0]
+    parser.add_argument("--source", default="synthetic", help="'synthetic' or a video file path.")
+    parser.add_argument("--frames", type=int, default=1000, help="Stop after this many frames.")
+    parser.add_argument("--loops", type=int, default=1, help="Times to loop a video file.")
+    parser.add_argument("--people", type=int, default=8, help="Walkers in the synthetic scene.")
+    parser.add_argument("--rate", type=float, default=0.0, help="Replay FPS (0 replays as fast as possible).")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="Simulated detector cost per frame.")
+    parser.add_argument("--real-model", action="store_true", help="Load --model weights instead of the stub detector.")
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file.")
+    parser.set_defaults(headless=True, drop_policy="block", telemetry_url=None)
+    args = validate_args(parser.parse_args())
+
+    workdir = tempfile.TemporaryDirectory()
+    if args.telemetry_url is None:
+        args.telemetry_url = f"sqlite:///{workdir.name}/replay.db"
+
+    if args.source == "synthetic":
+        source = SyntheticCapture(args.width, args.height, people=args.people)
+    else:
+        source = VideoFileCapture(args.source, loops=args.loops)
+        if not source.isOpened():
+            raise SystemExit(f"Unable to open video file {args.source}")
+
+    model = None if args.real_model else StubDetector(latency_ms=args.stub_latency_ms)
+    app = CameraTrackerApp(args, model=model)
+    report = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "source": args.source,
+        "detector": args.model if args.real_model else f"stub({args.stub_latency_ms:g}ms)",
+        "rate": args.rate,
+        "drop_policy": args.drop_policy,
+        "adaptive_cadence": args.adaptive_cadence,
+        **run_replay(app, PacedCapture(source, rate=args.rate, max_frames=args.frames)),
+    }
+    workdir.cleanup()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        pathlib.Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
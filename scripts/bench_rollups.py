@@ -0,0 +1,89 @@
+"""Show dashboard query time on rollups staying flat while raw telemetry grows.
+
+Each step appends synthetic rows, refreshes the rollups incrementally and times the dashboard's
+30-day footfall / product popularity queries against the rollups and the equivalent raw-table
+scan.
+
+    python -m scripts.bench_rollups --url sqlite:///bench_rollups.db --steps 5 --customers-per-step 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.db.models import Base, Customer, Movement, ProductInteraction
+from app.db.rollups import RollupJob, _bucket, load_rollups
+from scripts.generate_synthetic_data import generate
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return 1000.0 * (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--customers-per-step", type=int, default=100_000)
+    parser.add_argument("--movements-per-customer", type=int, default=40)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url, future=True)
+    Base.metadata.create_all(engine)
+    job = RollupJob(engine, settle_seconds=0)
+    end = datetime.now(timezone.utc) - timedelta(minutes=1)
+    start = end - timedelta(days=30)
+    dialect = engine.dialect.name
+
+    def rollup_queries() -> None:
+        with Session(engine) as session:
+            load_rollups(session, "footfall", start, end + timedelta(days=1))
+            load_rollups(session, "interactions", start, end + timedelta(days=1))
+
+    def raw_queries() -> None:
+        day = _bucket(Movement.timestamp, "day", dialect)
+        with Session(engine) as session:
+            session.execute(
+                select(day, func.count(func.distinct(Movement.customer_id)))
+                .where(Movement.timestamp >= start, Movement.timestamp < end)
+                .group_by(day)
+            ).all()
+            session.execute(
+                select(ProductInteraction.product_class, func.count())
+                .join(Customer, Customer.id == ProductInteraction.customer_id)
+                .where(Customer.entry_time >= start, Customer.entry_time < end)
+                .group_by(ProductInteraction.product_class)
+            ).all()
+
+    results = []
+    total_movements = 0
+    for step in range(args.steps):
+        counts = generate(
+            engine, args.customers_per_step, args.movements_per_customer, end=end, seed=step
+        )
+        total_movements += counts["movements"]
+        refresh_ms = _timed(job.run_once)
+        results.append(
+            {
+                "step": step + 1,
+                "movement_rows": total_movements,
+                "incremental_refresh_ms": round(refresh_ms, 1),
+                "dashboard_rollup_ms": round(_timed(rollup_queries), 2),
+                "dashboard_raw_scan_ms": round(_timed(raw_queries), 1),
+            }
+        )
+        print(json.dumps(results[-1]))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Replay per-frame camera state through the alert rule engine and measure evaluation throughput.
+
+Reads state recorded by the tracker (``--record-rule-inputs rules.jsonl``) or generates a
+synthetic stream of many cameras with crowds that swell past the overcrowding threshold,
+occasional runners, loiterers and shelves that empty out. Every frame is fed to its camera's
+``RuleEngine``; the report has frames/s, rule evaluations/s, per-frame latency percentiles and
+the alerts fired per rule.
+
+    python -m scripts.bench_rules --cameras 16 --tracks 40 --fps 15 --seconds 900
+    python -m scripts.bench_rules --input rules.jsonl --zones-file zones.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections import Counter
+from typing import Any
+
+import numpy as np
+
+from app.analytics.rules import RuleEngine, RuleInput, rules_for_camera
+from app.analytics.zones import Zone, load_zone_config, rectangle_zone
+from app.config import settings
+
+
+def synthetic_stream(args: argparse.Namespace) -> list[RuleInput]:
+    """Frames of ``args.cameras`` cameras, interleaved in time order."""
+    rng = np.random.default_rng(args.seed)
+    frames: list[RuleInput] = []
+    threshold = settings.alerts.overcrowding_threshold
+    for camera in range(args.cameras):
+        camera_id = f"cam-{camera}"
+        next_id = 0
+        entered: dict[int, float] = {}
+        runners: set[int] = set()
+        stock = np.full(args.zones, 6.0)
+        phase = rng.uniform(0, 2 * np.pi)
+        for index in range(int(args.seconds * args.fps)):
+            now = args.start + index / args.fps
+            # The crowd swings between a third of --tracks and 1.5x the overcrowding threshold.
+            target = int(args.tracks / 3 + (1.5 * threshold - args.tracks / 3) * (0.5 + 0.5 * np.sin(phase + now / 120.0)))
+            while len(entered) < target:
+                entered[next_id] = now
+                if rng.random() < 0.02:
+                    runners.add(next_id)
+                next_id += 1
+            while len(entered) > target:
+                # The oldest visitor under 10 minutes leaves (anyone older stays on as a loiterer);
+                # one in ten departures is the newest arrival instead.
+                leaving = min(entered, key=lambda tid: (now - entered[tid] > 600, entered[tid])) if rng.random() < 0.9 else max(entered)
+                entered.pop(leaving)
+                runners.discard(leaving)
+            ids = np.fromiter(entered, dtype=np.int64, count=len(entered))
+            speed = np.abs(rng.normal(60.0, 25.0, size=len(ids)))
+            speed[np.isin(ids, list(runners))] = rng.uniform(250.0, 400.0)
+            speed[rng.random(len(ids)) < 0.05] = np.nan  # tracks too young for kinematics
+            dwell = now - np.fromiter(entered.values(), dtype=np.float64, count=len(entered))
+            if index % args.detect_every == 0:
+                # Shelves sell down one item at a time and are occasionally restocked once empty.
+                stock -= rng.random(args.zones) < 0.05
+                stock[(stock <= 0) & (rng.random(args.zones) < 0.002)] = 8.0
+                stock = np.clip(stock, 0, 8)
+                shelf_stock = stock.copy()
+            else:
+                shelf_stock = None
+            zone_occupancy = np.bincount(rng.integers(0, args.zones, size=len(ids)), minlength=args.zones).astype(np.float64)
+            frames.append(RuleInput(now, ids, speed, dwell, zone_occupancy, shelf_stock, camera_id))
+    frames.sort(key=lambda frame: frame.timestamp)
+    return frames
+
+
+def load_stream(path: str) -> list[RuleInput]:
+    with open(path, encoding="utf-8") as fh:
+        return [RuleInput.from_dict(json.loads(line)) for line in fh if line.strip()]
+
+
+def camera_zones(camera_id: str, frame: RuleInput, zones_file: str | None) -> list[Zone]:
+    if zones_file:
+        return load_zone_config(zones_file).get(camera_id, [])
+    arrays = [array for array in (frame.zone_occupancy, frame.shelf_stock) if array is not None]
+    count = len(arrays[0]) if arrays else 0
+    return [rectangle_zone(f"zone_{i}", 0, 0, 1, 1, product_class="product") for i in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default=None, help="Recorded JSONL from the tracker's --record-rule-inputs.")
+    parser.add_argument("--zones-file", default=None, help="Zones the recording was made with (names and product classes).")
+    parser.add_argument("--rules-file", default=settings.alerts.rules_path)
+    parser.add_argument("--cameras", type=int, default=16)
+    parser.add_argument("--tracks", type=int, default=40, help="Typical people per synthetic camera.")
+    parser.add_argument("--zones", type=int, default=8, help="Product zones per synthetic camera.")
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--seconds", type=float, default=900.0, help="Simulated seconds per synthetic camera.")
+    parser.add_argument("--detect-every", type=int, default=5, help="Synthetic frames between shelf stock updates.")
+    parser.add_argument("--start", type=float, default=1_760_000_000.0, help="Synthetic epoch start time.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    frames = load_stream(args.input) if args.input else synthetic_stream(args)
+    engines: dict[str, RuleEngine] = {}
+    for frame in frames:
+        if frame.camera_id not in engines:
+            zones = camera_zones(frame.camera_id, frame, args.zones_file)
+            engines[frame.camera_id] = RuleEngine(frame.camera_id, rules_for_camera(frame.camera_id, args.rules_file), zones)
+
+    latencies = np.empty(len(frames), dtype=np.float64)
+    fired: Counter[str] = Counter()
+    started = time.perf_counter()
+    for index, frame in enumerate(frames):
+        frame_started = time.perf_counter()
+        events = engines[frame.camera_id].update(frame)
+        latencies[index] = time.perf_counter() - frame_started
+        fired.update(event.alert_type for event in events)
+    elapsed = time.perf_counter() - started
+
+    evaluations = sum(engine.stats.evaluations for engine in engines.values())
+    us = latencies * 1e6
+    report: dict[str, Any] = {
+        "source": args.input or "synthetic",
+        "cameras": len(engines),
+        "frames": len(frames),
+        "avg_tracks_per_frame": round(float(np.mean([len(frame.track_ids) for frame in frames])), 1) if frames else 0.0,
+        "evaluations": evaluations,
+        "elapsed_s": round(elapsed, 3),
+        "frames_per_second": round(len(frames) / elapsed, 1) if elapsed else 0.0,
+        "evaluations_per_second": round(evaluations / elapsed, 1) if elapsed else 0.0,
+        "frame_us": {
+            "p50": round(float(np.percentile(us, 50)), 2) if us.size else None,
+            "p99": round(float(np.percentile(us, 99)), 2) if us.size else None,
+        },
+        "fired": dict(fired),
+        "resolved": sum(engine.stats.resolved for engine in engines.values()),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
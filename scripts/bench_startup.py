@@ -0,0 +1,153 @@
+"""Measure import time and cold start of each entry point, in fresh interpreters.
+
+Every entry point's modules are imported ``--repeat`` times, each in a new process. The report
+has the median wall time of those processes and of a bare interpreter. One more run with
+``python -X importtime`` gives the entry modules' import time, their heaviest direct imports
+and which heavy libraries ended up loaded; that run is slower than a plain one. The API's cold
+start is the time from launching ``uvicorn app.main:app`` to its first ``200`` from ``/health``.
+With ``--check``, the exit status is 1 if a non-vision entry point loads a vision library or an
+entry point goes over ``--budget-ms``.
+
+    python -m scripts.bench_startup --repeat 5 --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Any
+
+from scripts.load_occupancy_ws import _free_port
+
+# Modules each process imports at startup, and whether it runs inference (and may load vision libraries).
+ENTRY_POINTS: dict[str, tuple[list[str], bool]] = {
+    "api": (["app.main"], False),
+    "apply_schema": (["scripts.apply_schema"], False),
+    "dashboard_data": (["app.db.heatmaps", "app.db.rollups"], False),
+    "supervisor": (["app.analytics.supervisor"], False),
+    "tracker": (["app.analytics.camera_tracking"], True),
+    "engine": (["app.analytics.engine"], True),
+}
+VISION_MODULES = ("cv2", "torch", "ultralytics", "deep_sort_realtime", "scipy", "onnxruntime")
+HEAVY_MODULES = (*VISION_MODULES, "numpy", "pandas", "sqlalchemy", "requests", "fastapi", "pydantic")
+
+
+def _run(code: str, importtime: bool = False) -> tuple[float, str, str]:
+    flags = ["-X", "importtime"] if importtime else []
+    started = time.perf_counter()
+    done = subprocess.run([sys.executable, *flags, "-W", "ignore", "-c", code], capture_output=True, text=True, check=True)
+    return time.perf_counter() - started, done.stdout, done.stderr
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, int, str]]:
+    """``(depth, cumulative_us, module)`` per ``-X importtime`` line, in the order printed
+    (a module's imports come before it, one level deeper)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, int(cumulative), name.strip()))
+    return rows
+
+
+def entry_import_report(rows: list[tuple[int, int, str]], modules: list[str], top: int) -> tuple[float, list[dict[str, Any]]]:
+    """Import time of ``modules`` (top-level lines) and their ``top`` slowest direct imports."""
+    total_us = 0
+    children: list[tuple[int, str]] = []
+    pending: list[tuple[int, str]] = []
+    for depth, cumulative, name in rows:
+        if depth == 1:
+            pending.append((cumulative, name))
+        elif depth == 0:
+            if name in modules:
+                total_us += cumulative
+                children.extend(pending)
+            pending = []
+    children.sort(reverse=True)
+    return total_us / 1000.0, [{"module": name, "ms": round(us / 1000.0, 1)} for us, name in children[:top]]
+
+
+def measure_entry(modules: list[str], repeat: int, top: int) -> dict[str, Any]:
+    code = (
+        "import sys, json\n"
+        + "".join(f"import {module}\n" for module in modules)
+        + f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))"
+    )
+    wall = statistics.median(_run(code)[0] for _ in range(repeat))
+    _, stdout, stderr = _run(code, importtime=True)
+    import_ms, slowest = entry_import_report(parse_importtime(stderr), modules, top)
+    return {
+        "modules": modules,
+        "process_ms": round(1000.0 * wall, 1),
+        "importtime_ms": round(import_ms, 1),
+        "slowest_imports": slowest,
+        "loaded": json.loads(stdout.strip().splitlines()[-1]),
+    }
+
+
+def api_cold_start(timeout: float = 30.0) -> dict[str, Any]:
+    """Seconds from launching uvicorn to the first ``200`` from ``/health`` (SQLite telemetry)."""
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "POSTGRES_URL": f"sqlite:///{tmp}/telemetry.db"}
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-W", "ignore", "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env=env,
+        )
+        try:
+            while time.perf_counter() - started < timeout:
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1.0) as response:
+                        if response.status == 200:
+                            return {"health_ms": round(1000.0 * (time.perf_counter() - started), 1)}
+                except (urllib.error.URLError, ConnectionError):
+                    time.sleep(0.01)
+            raise RuntimeError("API did not come up")
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entry", action="append", choices=sorted(ENTRY_POINTS), help="Entry points to measure (default: all).")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per entry point; medians are reported.")
+    parser.add_argument("--top", type=int, default=8, help="Slowest direct imports listed per entry point.")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="Process time each entry point should stay under.")
+    parser.add_argument("--skip-cold-start", action="store_true", help="Do not start uvicorn for the API cold start.")
+    parser.add_argument("--check", action="store_true", help="Exit 1 on a vision import outside trackers or a blown budget.")
+    args = parser.parse_args()
+
+    interpreter = statistics.median(_run("pass")[0] for _ in range(args.repeat))
+    report: dict[str, Any] = {"python": sys.version.split()[0], "interpreter_ms": round(1000.0 * interpreter, 1), "entries": {}}
+    problems: list[str] = []
+    for name in args.entry or list(ENTRY_POINTS):
+        modules, runs_inference = ENTRY_POINTS[name]
+        entry = measure_entry(modules, args.repeat, args.top)
+        report["entries"][name] = entry
+        vision = [module for module in entry["loaded"] if module in VISION_MODULES]
+        if vision and not runs_inference:
+            problems.append(f"{name} imports {', '.join(vision)}")
+        if entry["process_ms"] > args.budget_ms:
+            problems.append(f"{name} took {entry['process_ms']} ms (budget {args.budget_ms} ms)")
+    if not args.skip_cold_start:
+        report["api_cold_start"] = api_cold_start()
+    report["problems"] = problems
+    print(json.dumps(report, indent=2))
+    if args.check and problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark zone lookups and dwell accounting with many polygons and tracks.
+
+Compares a per-zone ``cv2.pointPolygonTest`` scan against the rasterized ZoneIndex.
+
+    python -m scripts.bench_zones --zones 300 --tracks 300 --frames 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import cv2
+import numpy as np
+
+from app.analytics.zones import Zone, ZoneDwell, ZoneIndex
+
+
+def make_zones(count: int, width: int, height: int, rng: np.random.Generator) -> list[Zone]:
+    zones = []
+    for i in range(count):
+        cx, cy = rng.uniform(0, width), rng.uniform(0, height)
+        sides = int(rng.integers(3, 8))
+        angles = np.sort(rng.uniform(0, 2 * np.pi, size=sides))
+        radius = rng.uniform(10, 60, size=sides)
+        polygon = np.stack([cx + radius * np.cos(angles), cy + radius * np.sin(angles)], axis=1)
+        zones.append(Zone(f"zone_{i}", tuple(map(tuple, polygon.tolist())), product_class=f"sku_{i % 40}"))
+    return zones
+
+
+def naive_frame(zones: list[Zone], contours: list[np.ndarray], points: np.ndarray) -> int:
+    hits = 0
+    for x, y in points.tolist():
+        for contour in contours:
+            if cv2.pointPolygonTest(contour, (x, y), False) >= 0:
+                hits += 1
+    return hits
+
+
+def indexed_frame(index: ZoneIndex, dwell: list[ZoneDwell], points: np.ndarray, now: datetime) -> int:
+    exits = 0
+    for state, combo in zip(dwell, index.combos_at(points).tolist()):
+        exits += len(state.update(index, combo, now))
+    return exits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--zones", type=int, default=300)
+    parser.add_argument("--tracks", type=int, default=300)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    zones = make_zones(args.zones, args.width, args.height, rng)
+    contours = [np.asarray(zone.polygon, dtype=np.float32) for zone in zones]
+
+    started = time.perf_counter()
+    index = ZoneIndex(zones, args.width, args.height)
+    build_s = time.perf_counter() - started
+
+    positions = rng.uniform((0, 0), (args.width, args.height), size=(args.tracks, 2))
+    steps = rng.normal(0, 4, size=(args.frames, args.tracks, 2))
+    frames = [np.clip(positions + steps[: i + 1].sum(axis=0), 0, (args.width - 1, args.height - 1)) for i in range(args.frames)]
+
+    naive_frames = max(1, args.frames // 10)
+    started = time.perf_counter()
+    for points in frames[:naive_frames]:
+        naive_frame(zones, contours, points)
+    naive_s = (time.perf_counter() - started) / naive_frames
+
+    dwell = [ZoneDwell() for _ in range(args.tracks)]
+    now = datetime.now(timezone.utc)
+    exits = 0
+    started = time.perf_counter()
+    for i, points in enumerate(frames):
+        exits += indexed_frame(index, dwell, points, now + timedelta(seconds=i / 15))
+    indexed_s = (time.perf_counter() - started) / args.frames
+
+    print(
+        json.dumps(
+            {
+                "zones": args.zones,
+                "tracks": args.tracks,
+                "zone_sets": len(index.combos),
+                "index_build_ms": round(1000 * build_s, 2),
+                "naive_ms_per_frame": round(1000 * naive_s, 3),
+                "indexed_ms_per_frame": round(1000 * indexed_s, 3),
+                "indexed_us_per_track": round(1e6 * indexed_s / args.tracks, 3),
+                "speedup": round(naive_s / indexed_s, 1) if indexed_s else None,
+                "zone_exits": exits,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from app.analytics.heatmap import rebuild_daily_heatmaps
+from app.config import settings
+from app.db.engine import create_db_engine
+
+
+def main() -> None:
+    today = datetime.now(timezone.utc).date()
+    parser = argparse.ArgumentParser(description="Recompute per-camera daily occupancy heatmaps from movements")
+    parser.add_argument("--url", default=settings.postgres_url)
+    parser.add_argument("--start", type=date.fromisoformat, default=today - timedelta(days=7))
+    parser.add_argument("--end", type=date.fromisoformat, default=today)
+    parser.add_argument("--chunk-rows", type=int, default=settings.heatmap.batch_chunk_rows)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = rebuild_daily_heatmaps(create_db_engine(args.url), args.start, args.end, chunk_rows=args.chunk_rows)
+    elapsed = time.perf_counter() - started
+    rate = result["rows"] / elapsed if elapsed else 0.0
+    print(
+        f"Rebuilt {result['heatmaps']} heatmap(s) over {result['days']} day(s) from {result['rows']} movements "
+        f"in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Check that DeepSORT tracks still confirm when detection only runs every few frames.
+
+Walkers move across a synthetic scene; at each --intervals value the detector "runs" every
+N-th frame and the frames in between go through ``predict_tracks``. The report lists the
+confirmed track ids per interval, next to feeding skipped frames ``update_tracks([])`` (which
+deletes tentative tracks on their first miss). With --check the exit status is 1 when an
+interval confirms fewer tracks than there are walkers.
+
+    python -m scripts.check_cadence_tracking --walkers 6 --frames 300 --intervals 1,3,5,8 --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from app.analytics.cadence import predict_tracks
+
+
+def _scene(walkers: int, frames: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-frame ``ltwh`` boxes ``(frames, walkers, 4)`` and one appearance vector per walker."""
+    rng = np.random.default_rng(seed)
+    start = rng.uniform([50, 50], [500, 350], (walkers, 2))
+    velocity = rng.uniform(-3.0, 3.0, (walkers, 2))
+    centers = start[None, :, :] + velocity[None, :, :] * np.arange(frames)[:, None, None]
+    size = np.array([60.0, 150.0])
+    boxes = np.concatenate([centers - size / 2, np.broadcast_to(size, centers.shape)], axis=2)
+    appearance = rng.standard_normal((walkers, 128)).astype(np.float32)
+    return boxes, appearance / np.linalg.norm(appearance, axis=1, keepdims=True)
+
+
+def run(interval: int, boxes: np.ndarray, appearance: np.ndarray, skipped: str, seed: int) -> int:
+    from deep_sort_realtime.deepsort_tracker import DeepSort
+
+    rng = np.random.default_rng(seed)
+    tracker = DeepSort(max_age=30, n_init=3, embedder=None)
+    confirmed: set[str] = set()
+    for frame, frame_boxes in enumerate(boxes):
+        if frame % interval == 0:
+            detections = [(box.tolist(), 0.9, "person") for box in frame_boxes]
+            embeds = appearance + 0.05 * rng.standard_normal(appearance.shape).astype(np.float32)
+            tracks = tracker.update_tracks(detections, embeds=list(embeds))
+        elif skipped == "predict":
+            tracks = predict_tracks(tracker)
+        else:
+            tracks = tracker.update_tracks([], embeds=[])
+        confirmed.update(str(track.track_id) for track in tracks if track.is_confirmed())
+    return len(confirmed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--walkers", type=int, default=6)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--intervals", default="1,3,5,8", help="Comma-separated detection intervals.")
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--check", action="store_true", help="Exit 1 if an interval confirms fewer tracks than walkers.")
+    args = parser.parse_args()
+
+    boxes, appearance = _scene(args.walkers, args.frames, args.seed)
+    results = []
+    problems = []
+    for interval in (int(value) for value in args.intervals.split(",") if value.strip()):
+        predicted = run(interval, boxes, appearance, "predict", args.seed)
+        empty_update = run(interval, boxes, appearance, "empty_update", args.seed)
+        results.append({"interval": interval, "confirmed_tracks": predicted, "confirmed_with_empty_update": empty_update})
+        if predicted < args.walkers:
+            problems.append(f"interval {interval} confirmed {predicted} of {args.walkers} walkers")
+    print(json.dumps({"walkers": args.walkers, "frames": args.frames, "results": results, "problems": problems}, indent=2))
+    if args.check and problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
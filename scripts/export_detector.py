@@ -0,0 +1,43 @@
+"""Export YOLO weights to a fixed-shape CPU format for the ONNX Runtime detector backend.
+
+The input size is pinned to DetectionConfig.frame_height x frame_width (what the trackers feed
+the detector), so ONNX Runtime can plan memory once. ``--format openvino`` writes an OpenVINO IR
+directory that the ultralytics backend can load with ``--model``.
+
+    python -m scripts.export_detector --weights yolov8n.pt
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from app.config import settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--weights", default=settings.detection.model_path)
+    parser.add_argument("--format", choices=["onnx", "openvino"], default="onnx")
+    parser.add_argument("--width", type=int, default=settings.detection.frame_width)
+    parser.add_argument("--height", type=int, default=settings.detection.frame_height)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument(
+        "--dynamic",
+        action="store_true",
+        help="Dynamic batch/image axes so BatchedInferenceService can run a whole batch in one call.",
+    )
+    args = parser.parse_args()
+
+    from ultralytics import YOLO
+
+    options = {"format": args.format, "imgsz": [args.height, args.width]}
+    if args.format == "onnx":
+        options.update(opset=args.opset, simplify=True, dynamic=args.dynamic)
+    path = YOLO(args.weights).export(**options)
+    print(f"Exported {args.weights} -> {path}")
+    if args.format == "onnx":
+        print(f"Run trackers with --backend onnx --onnx-model {path} (or set detection.onnx_model_path)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Export telemetry tables to date/camera-partitioned Parquet or gzip'd CSV, streaming in chunks.
+
+Defaults to yesterday (UTC), for a nightly job:
+
+    python -m scripts.export_telemetry --format parquet --out exports/
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from app.config import settings
+from app.db.engine import create_db_engine
+from app.db.export import EXPORT_TABLES, FORMATS, export_table
+
+
+def main() -> None:
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=settings.postgres_url)
+    parser.add_argument("--table", action="append", choices=list(EXPORT_TABLES), help="Tables to export (default: all).")
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--start", type=date.fromisoformat, default=yesterday)
+    parser.add_argument("--end", type=date.fromisoformat, default=yesterday)
+    parser.add_argument("--out", default=settings.export.output_dir)
+    parser.add_argument("--chunk-rows", type=int, default=settings.export.chunk_rows, help="Rows fetched per cursor round trip.")
+    parser.add_argument("--row-group-rows", type=int, default=settings.export.row_group_rows, help="Rows per Parquet row group.")
+    parser.add_argument("--compression", default=settings.export.parquet_compression, help="Parquet codec (zstd, snappy, gzip, none).")
+    args = parser.parse_args()
+    if args.start > args.end:
+        parser.error("--start must not be after --end")
+
+    engine = create_db_engine(args.url)
+    started = time.perf_counter()
+    for table in args.table or list(EXPORT_TABLES):
+        result = export_table(
+            engine,
+            table,
+            args.start,
+            args.end,
+            args.out,
+            args.format,
+            chunk_rows=args.chunk_rows,
+            row_group_rows=args.row_group_rows,
+            compression=args.compression,
+        )
+        stats = result.as_dict()
+        print(
+            f"Exported {stats['rows']} {table} row(s) over {stats['days']} day(s) to {stats['files']} {args.format} "
+            f"file(s), {stats['mb']} MB in {stats['seconds']:.2f}s ({stats['rows_per_second']:,.0f} rows/s)"
+        )
+    print(f"Export finished in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
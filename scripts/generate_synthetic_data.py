@@ -0,0 +1,160 @@
+"""Fill the telemetry tables with synthetic customers, movements, interactions and alerts.
+
+    python -m scripts.generate_synthetic_data --url sqlite:///synthetic.db --customers 100000 --movements-per-customer 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import Engine, create_engine, func, insert, select, text
+
+from app.db.models import Alert, Base, Customer, Movement, ProductInteraction
+
+PRODUCT_CLASSES = ["bottle", "backpack", "snacks", "dairy", "produce", "cosmetics"]
+ALERT_TYPES = ["overcrowding", "loitering", "rapid_movement", "shelf_empty"]
+
+
+def _next_id(engine: Engine, column: object) -> int:
+    with engine.connect() as conn:
+        return int(conn.scalar(select(func.coalesce(func.max(column), 0)))) + 1
+
+
+def generate(
+    engine: Engine,
+    customers: int,
+    movements_per_customer: int,
+    cameras: int = 8,
+    days: int = 30,
+    end: datetime | None = None,
+    chunk_size: int = 5000,
+    seed: int = 0,
+) -> dict[str, int]:
+    """Insert synthetic rows in chunks with explicit ids; returns row counts per table."""
+    rng = np.random.default_rng(seed)
+    end = end or datetime.now(timezone.utc)
+    start = end - timedelta(days=days)
+    span_seconds = (end - start).total_seconds()
+    counts = {"customers": 0, "movements": 0, "product_interactions": 0, "alerts": 0}
+    recorded_at = datetime.now(timezone.utc)
+
+    customer_id = _next_id(engine, Customer.id)
+    movement_id = _next_id(engine, Movement.id)
+    interaction_id = _next_id(engine, ProductInteraction.id)
+    alert_id = _next_id(engine, Alert.id)
+
+    for offset in range(0, customers, chunk_size):
+        n = min(chunk_size, customers - offset)
+        ids = np.arange(customer_id, customer_id + n)
+        customer_id += n
+        entry_offsets = np.sort(rng.uniform(0, span_seconds, size=n))
+        stay = rng.gamma(2.0, 300.0, size=n)
+        camera_ids = rng.integers(0, cameras, size=n)
+
+        customer_rows = []
+        for cid, entry_s, stay_s, cam in zip(ids.tolist(), entry_offsets.tolist(), stay.tolist(), camera_ids.tolist()):
+            entry_time = start + timedelta(seconds=entry_s)
+            customer_rows.append(
+                {
+                    "id": cid,
+                    "customer_key": f"syn-{cid}",
+                    "camera_id": f"cam-{cam}",
+                    "entry_time": entry_time,
+                    "exit_time": entry_time + timedelta(seconds=stay_s),
+                    "total_time_spent": stay_s,
+                    "exit_recorded_at": recorded_at,
+                }
+            )
+
+        movement_rows = []
+        if movements_per_customer:
+            steps = np.linspace(0.0, 1.0, movements_per_customer)
+            xy = rng.uniform(0, 640, size=(n, movements_per_customer, 2))
+            for row, points in zip(customer_rows, xy):
+                entry_time, stay_s = row["entry_time"], row["total_time_spent"]
+                for step, (x, y) in zip(steps.tolist(), points.tolist()):
+                    movement_rows.append(
+                        {
+                            "id": movement_id,
+                            "customer_id": row["id"],
+                            "camera_id": row["camera_id"],
+                            "timestamp": entry_time + timedelta(seconds=step * stay_s),
+                            "x_coordinate": x,
+                            "y_coordinate": y,
+                        }
+                    )
+                    movement_id += 1
+
+        interaction_rows = []
+        for row in customer_rows:
+            for _ in range(int(rng.poisson(1.5))):
+                interaction_rows.append(
+                    {
+                        "id": interaction_id,
+                        "customer_id": row["id"],
+                        "product_class": PRODUCT_CLASSES[int(rng.integers(len(PRODUCT_CLASSES)))],
+                        "dwell_time": float(rng.gamma(2.0, 10.0)),
+                    }
+                )
+                interaction_id += 1
+
+        alert_rows = []
+        for row in customer_rows[:: max(1, n // 20)]:
+            alert_rows.append(
+                {
+                    "id": alert_id,
+                    "alert_type": ALERT_TYPES[int(rng.integers(len(ALERT_TYPES)))],
+                    "timestamp": row["entry_time"],
+                    "camera_id": row["camera_id"],
+                    "severity": "medium",
+                }
+            )
+            alert_id += 1
+
+        with engine.begin() as conn:
+            conn.execute(insert(Customer), customer_rows)
+            for i in range(0, len(movement_rows), chunk_size * 4):
+                conn.execute(insert(Movement), movement_rows[i : i + chunk_size * 4])
+            if interaction_rows:
+                conn.execute(insert(ProductInteraction), interaction_rows)
+            if alert_rows:
+                conn.execute(insert(Alert), alert_rows)
+
+        counts["customers"] += len(customer_rows)
+        counts["movements"] += len(movement_rows)
+        counts["product_interactions"] += len(interaction_rows)
+        counts["alerts"] += len(alert_rows)
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            for table in ("customers", "movements", "product_interactions", "alerts"):
+                conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"))
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--movements-per-customer", type=int, default=40)
+    parser.add_argument("--cameras", type=int, default=8)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--create-schema", action="store_true", help="Create tables from the ORM models first.")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url, future=True)
+    if args.create_schema or args.url.startswith("sqlite"):
+        Base.metadata.create_all(engine)
+
+    started = time.perf_counter()
+    counts = generate(engine, args.customers, args.movements_per_customer, args.cameras, args.days)
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"Inserted {counts} in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
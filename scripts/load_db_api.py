@@ -0,0 +1,211 @@
+"""Load-test sync and async database endpoints of one FastAPI process against a local database.
+
+Serves this module's app with uvicorn, where the same alert-history query runs three ways:
+``/threadpool/alerts`` (``def`` endpoint, pooled sync Session, FastAPI's threadpool),
+``/blocking/alerts`` (``async def`` endpoint calling the sync Session on the event loop, the
+mistake the async layer exists to avoid) and ``/async/alerts`` (``AsyncSession`` from
+``app.db.engine``). Each mode gets --concurrency clients for --seconds while a prober hits
+``/ping`` to show how responsive the event loop stays. The report has requests/s and latency per
+mode as JSON. The stand-in is a temporary SQLite file seeded with --seed alerts (aiosqlite for
+the async mode); pass --url to run against a local PostgreSQL instead.
+
+    python -m scripts.load_db_api --concurrency 32 --seconds 10 --seed 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.engine import async_session_factory, create_async_db_engine, create_db_engine
+from app.db.history import alert_history_query, alert_rows
+from app.db.models import Alert, Base
+from scripts.load_occupancy_ws import _free_port, _wait_until_up
+
+MODES = ("threadpool", "blocking", "async")
+CAMERAS = 24
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.engine = create_db_engine(settings.postgres_url)
+    app.state.async_engine = create_async_db_engine(settings.postgres_url)
+    app.state.sessions = async_session_factory(app.state.async_engine)
+    try:
+        yield
+    finally:
+        await app.state.async_engine.dispose()
+        app.state.engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def _query(camera: int, limit: int) -> Any:
+    return alert_history_query(camera_id=f"cam-{camera % CAMERAS}", limit=limit)
+
+
+@app.get("/health")
+async def health() -> dict[str, str]:
+    return {"status": "ok"}
+
+
+@app.get("/ping")
+async def ping() -> dict[str, float]:
+    return {"time": time.time()}
+
+
+@app.get("/threadpool/alerts")
+def threadpool_alerts(camera: int = 0, limit: int = 50) -> dict[str, Any]:
+    with Session(app.state.engine) as session:
+        return {"alerts": alert_rows(session.execute(_query(camera, limit)).all())}
+
+
+@app.get("/blocking/alerts")
+async def blocking_alerts(camera: int = 0, limit: int = 50) -> dict[str, Any]:
+    with Session(app.state.engine) as session:
+        return {"alerts": alert_rows(session.execute(_query(camera, limit)).all())}
+
+
+@app.get("/async/alerts")
+async def async_alerts(camera: int = 0, limit: int = 50) -> dict[str, Any]:
+    async with app.state.sessions() as session:
+        return {"alerts": alert_rows((await session.execute(_query(camera, limit))).all())}
+
+
+def seed(url: str, rows: int) -> None:
+    engine = create_db_engine(url)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        for start in range(0, rows, 5000):
+            session.execute(
+                insert(Alert),
+                [
+                    {
+                        "alert_type": "loitering" if i % 3 else "overcrowding",
+                        "timestamp": now - timedelta(seconds=i),
+                        "camera_id": f"cam-{i % CAMERAS}",
+                        "severity": "medium",
+                    }
+                    for i in range(start, min(rows, start + 5000))
+                ],
+            )
+        session.commit()
+    engine.dispose()
+
+
+def _percentiles_ms(samples: list[float]) -> dict[str, float | None]:
+    if not samples:
+        return {"p50": None, "p99": None}
+    ms = np.asarray(samples) * 1000.0
+    return {"p50": round(float(np.percentile(ms, 50)), 2), "p99": round(float(np.percentile(ms, 99)), 2)}
+
+
+async def _client(client: httpx.AsyncClient, path: str, worker: int, limit: int, deadline: float, latencies: list[float], errors: list[int]) -> None:
+    camera = worker
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(path, params={"camera": camera, "limit": limit})
+            response.raise_for_status()
+        except httpx.HTTPError:
+            errors.append(1)
+        else:
+            latencies.append(time.perf_counter() - started)
+        camera += 1
+
+
+async def _prober(client: httpx.AsyncClient, interval: float, deadline: float, latencies: list[float]) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/ping")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+
+async def run_mode(base_url: str, mode: str, args: argparse.Namespace) -> dict[str, Any]:
+    latencies: list[float] = []
+    errors: list[int] = []
+    pings: list[float] = []
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        # Warm-up fills both pools and SQLAlchemy's compiled-statement cache.
+        await asyncio.gather(*(client.get(f"/{mode}/alerts") for _ in range(args.concurrency)))
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(
+            _prober(client, args.ping_interval, deadline, pings),
+            *(_client(client, f"/{mode}/alerts", i, args.limit, deadline, latencies, errors) for i in range(args.concurrency)),
+        )
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_second": round(len(latencies) / args.seconds, 1),
+        "latency_ms": _percentiles_ms(latencies),
+        "ping_ms": _percentiles_ms(pings),
+    }
+
+
+async def run(base_url: str, args: argparse.Namespace) -> dict[str, Any]:
+    await _wait_until_up(base_url)
+    return {mode: await run_mode(base_url, mode, args) for mode in args.mode or MODES}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Database URL (default: a temporary SQLite file).")
+    parser.add_argument("--seed", type=int, default=None, help="Alerts to insert first (default 20000 for the SQLite stand-in, 0 with --url).")
+    parser.add_argument("--mode", action="append", choices=MODES, help="Modes to run (default: all).")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients per mode.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measured time per mode.")
+    parser.add_argument("--limit", type=int, default=50, help="Alerts returned per request.")
+    parser.add_argument("--ping-interval", type=float, default=0.05, help="Seconds between event-loop probes.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{tmp}/load_db_api.db"
+        rows = args.seed if args.seed is not None else (0 if args.url else 20000)
+        if rows or url.startswith("sqlite"):
+            seed(url, rows)
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "scripts.load_db_api:app", "--port", str(port), "--log-level", "warning"],
+            env={**os.environ, "POSTGRES_URL": url},
+        )
+        try:
+            results = asyncio.run(run(f"http://127.0.0.1:{port}", args))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    report = {
+        "database": url.split("://", 1)[0],
+        "seeded_alerts": rows,
+        "concurrency": args.concurrency,
+        "pool_size": settings.database.pool_size,
+        "max_overflow": settings.database.max_overflow,
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Load-test the bulk ingestion endpoint with simulated edge trackers against a local uvicorn.
+
+Starts ``uvicorn app.main:app`` on a free port (unless --url is given) with telemetry going to
+a temporary SQLite file (or --telemetry-url), then runs --devices edge devices that each send
+NDJSON batches of --batch-size events for their cameras over ``POST /ingest`` (or one
+``/ws/ingest`` stream each with --transport ws). Reports sustained events/s, batch ack latency,
+refused batches and, for a server it started, the rows that reached the database.
+
+    python -m scripts.load_ingest --devices 8 --cameras 4 --batch-size 2000 --seconds 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+
+import httpx
+import numpy as np
+import websockets
+from sqlalchemy import create_engine, func, select
+
+from app.db.models import Customer, Movement
+from scripts.load_occupancy_ws import _free_port, _wait_until_up
+
+
+class EdgeDevice:
+    """Generates compact event lines for a few cameras, each with a rotating set of customers."""
+
+    def __init__(self, device: int, cameras: int, people: int) -> None:
+        self.device = device
+        self.cameras = [f"edge-{device}-cam-{i}" for i in range(cameras)]
+        self.people = people
+        self.next_customer = 0
+        self.active: dict[str, list[str]] = {camera: [] for camera in self.cameras}
+        self.rng = random.Random(device)
+
+    def _enter(self, camera: str, now: float, lines: list[str]) -> None:
+        key = f"{camera}-{self.next_customer}"
+        self.next_customer += 1
+        self.active[camera].append(key)
+        lines.append(json.dumps(["e", camera, key, now]))
+
+    def batch(self, size: int) -> tuple[bytes, int]:
+        now = time.time()
+        lines: list[str] = []
+        for camera in self.cameras:
+            customers = self.active[camera]
+            while len(customers) < self.people:
+                self._enter(camera, now, lines)
+            if self.rng.random() < 0.2:
+                key = customers.pop(self.rng.randrange(len(customers)))
+                lines.append(json.dumps(["x", camera, key, now, 60.0]))
+                self._enter(camera, now, lines)
+            lines.append(json.dumps(["o", camera, now, len(customers)]))
+        while len(lines) < size:
+            camera = self.rng.choice(self.cameras)
+            key = self.rng.choice(self.active[camera])
+            lines.append(f'["m","{camera}","{key}",{now:.3f},{self.rng.uniform(0, 640):.1f},{self.rng.uniform(0, 480):.1f}]')
+        return "\n".join(lines).encode(), len(lines)
+
+
+async def _http_device(
+    base_url: str, device: EdgeDevice, args: argparse.Namespace, stop: asyncio.Event, latencies: list[float], counters: dict[str, int]
+) -> None:
+    headers = {"content-type": "application/x-ndjson"}
+    if args.gzip:
+        headers["content-encoding"] = "gzip"
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+        while not stop.is_set():
+            body, events = device.batch(args.batch_size)
+            if args.gzip:
+                body = gzip.compress(body, compresslevel=1)
+            started = time.perf_counter()
+            response = await client.post("/ingest", content=body, headers=headers)
+            _record(response.status_code, response.json(), events, time.perf_counter() - started, latencies, counters)
+            if response.status_code == 503:
+                await asyncio.sleep(float(response.headers.get("retry-after", 1.0)))
+
+
+async def _ws_device(
+    base_url: str, device: EdgeDevice, args: argparse.Namespace, stop: asyncio.Event, latencies: list[float], counters: dict[str, int]
+) -> None:
+    async with websockets.connect(base_url.replace("http", "ws", 1) + "/ws/ingest", max_size=None) as ws:
+        while not stop.is_set():
+            body, events = device.batch(args.batch_size)
+            started = time.perf_counter()
+            await ws.send(body)
+            ack = json.loads(await ws.recv())
+            _record(ack.get("status", 200), ack, events, time.perf_counter() - started, latencies, counters)
+            if "retry_after" in ack:
+                await asyncio.sleep(ack["retry_after"])
+
+
+def _record(
+    status: int, ack: dict[str, Any], events: int, elapsed: float, latencies: list[float], counters: dict[str, int]
+) -> None:
+    counters["events_sent"] += events
+    if status == 200:
+        counters["batches"] += 1
+        counters["accepted"] += ack["accepted"]
+        counters["rejected"] += ack["rejected"]
+        latencies.append(elapsed)
+    else:
+        counters["refused_batches"] += 1
+
+
+async def run(args: argparse.Namespace, base_url: str) -> dict[str, Any]:
+    await _wait_until_up(base_url)
+    stop = asyncio.Event()
+    latencies: list[float] = []
+    counters = {"events_sent": 0, "batches": 0, "accepted": 0, "rejected": 0, "refused_batches": 0}
+    sender = _ws_device if args.transport == "ws" else _http_device
+    devices = [
+        asyncio.create_task(sender(base_url, EdgeDevice(i, args.cameras, args.people), args, stop, latencies, counters))
+        for i in range(args.devices)
+    ]
+    started = time.perf_counter()
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*devices)
+    elapsed = time.perf_counter() - started
+
+    lat_ms = np.asarray(latencies) * 1000.0
+    return {
+        "transport": args.transport,
+        "devices": args.devices,
+        "cameras": args.devices * args.cameras,
+        "batch_size": args.batch_size,
+        **counters,
+        "events_per_second": round(counters["accepted"] / elapsed, 1),
+        "ack_latency_ms": {
+            "p50": round(float(np.percentile(lat_ms, 50)), 2) if lat_ms.size else None,
+            "p95": round(float(np.percentile(lat_ms, 95)), 2) if lat_ms.size else None,
+            "p99": round(float(np.percentile(lat_ms, 99)), 2) if lat_ms.size else None,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Existing server base URL; omit to start a local uvicorn.")
+    parser.add_argument("--telemetry-url", default=None, help="Database for a started server; default is a temporary SQLite file.")
+    parser.add_argument("--transport", choices=["http", "ws"], default="http")
+    parser.add_argument("--devices", type=int, default=8)
+    parser.add_argument("--cameras", type=int, default=4, help="Cameras per device.")
+    parser.add_argument("--people", type=int, default=10, help="Tracked customers per camera.")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Events per batch.")
+    parser.add_argument("--gzip", action="store_true", help="Send gzip-encoded HTTP bodies.")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    telemetry_url = args.telemetry_url
+    workdir = tempfile.TemporaryDirectory()
+    if base_url is None:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        telemetry_url = telemetry_url or f"sqlite:///{os.path.join(workdir.name, 'ingest.db')}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env={**os.environ, "POSTGRES_URL": telemetry_url},
+        )
+    try:
+        report = asyncio.run(run(args, base_url))
+    finally:
+        if server is not None:
+            server.terminate()  # lifespan shutdown flushes the telemetry writer
+            server.wait(timeout=60)
+    if server is not None:
+        engine = create_engine(telemetry_url)
+        with engine.connect() as conn:
+            report["db_customers"] = conn.scalar(select(func.count()).select_from(Customer))
+            report["db_movements"] = conn.scalar(select(func.count()).select_from(Movement))
+        engine.dispose()
+    workdir.cleanup()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
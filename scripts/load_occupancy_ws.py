@@ -0,0 +1,130 @@
+"""Load-test the occupancy WebSocket hub with many subscribers against a local uvicorn.
+
+Starts ``uvicorn app.main:app`` on a free port (unless --url is given), connects --clients
+WebSocket subscribers, publishes counts for --cameras cameras at --rate updates/s through
+``POST /occupancy`` and reports delivery latency and message counts as JSON.
+
+    python -m scripts.load_occupancy_ws --clients 300 --cameras 12 --rate 60 --seconds 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+import websockets
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_up(base_url: str, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not come up")
+
+
+async def _subscriber(ws_url: str, stop: asyncio.Event, latencies: list[float], counters: dict[str, int]) -> None:
+    try:
+        async with websockets.connect(ws_url, max_queue=None) as ws:
+            counters["connected"] += 1
+            while not stop.is_set():
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                received = time.time()
+                message = json.loads(raw)
+                counters["messages"] += 1
+                if message.get("event") == "occupancy_delta":
+                    for camera in message["cameras"].values():
+                        latencies.append(received - camera["published_at"])
+    except (websockets.ConnectionClosed, OSError):
+        counters["disconnected"] += 1
+
+
+async def _publisher(base_url: str, cameras: int, rate: float, stop: asyncio.Event, counters: dict[str, int]) -> None:
+    interval = 1.0 / rate
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while not stop.is_set():
+            camera_id = f"cam-{random.randrange(cameras)}"
+            await client.post("/occupancy", json={"camera_id": camera_id, "people_count": random.randrange(40)})
+            counters["published"] += 1
+            await asyncio.sleep(interval)
+
+
+async def run(args: argparse.Namespace, base_url: str) -> dict[str, object]:
+    await _wait_until_up(base_url)
+    ws_url = base_url.replace("http", "ws", 1) + "/ws/occupancy"
+    stop = asyncio.Event()
+    latencies: list[float] = []
+    counters = {"connected": 0, "disconnected": 0, "messages": 0, "published": 0}
+
+    clients = [asyncio.create_task(_subscriber(ws_url, stop, latencies, counters)) for _ in range(args.clients)]
+    await asyncio.sleep(1.0)
+    publisher = asyncio.create_task(_publisher(base_url, args.cameras, args.rate, stop, counters))
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(publisher, *clients, return_exceptions=True)
+
+    lat_ms = np.asarray(latencies) * 1000.0
+    return {
+        "clients": args.clients,
+        "connected": counters["connected"],
+        "disconnected": counters["disconnected"],
+        "published": counters["published"],
+        "messages_received": counters["messages"],
+        "messages_per_second": round(counters["messages"] / args.seconds, 1),
+        "latency_ms": {
+            "p50": round(float(np.percentile(lat_ms, 50)), 2) if lat_ms.size else None,
+            "p95": round(float(np.percentile(lat_ms, 95)), 2) if lat_ms.size else None,
+            "p99": round(float(np.percentile(lat_ms, 99)), 2) if lat_ms.size else None,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Existing server base URL; omit to start a local uvicorn.")
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--cameras", type=int, default=12)
+    parser.add_argument("--rate", type=float, default=60.0, help="Published count updates per second.")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+        )
+    try:
+        print(json.dumps(asyncio.run(run(args, base_url)), indent=2))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.config import settings
+from app.db.engine import create_db_engine
+from app.db.partitions import PartitionManager
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create upcoming movement partitions and apply retention")
+    parser.add_argument("--url", default=settings.postgres_url)
+    parser.add_argument("--loop-seconds", type=float, default=0.0, help="Keep maintaining at this interval (0 runs once).")
+    args = parser.parse_args()
+
+    manager = PartitionManager(create_db_engine(args.url))
+    while True:
+        started = time.perf_counter()
+        result = manager.run_once()
+        print(
+            f"Partition maintenance in {time.perf_counter() - started:.2f}s: "
+            f"created={result.created} downsampled={result.downsampled} dropped={result.dropped}"
+        )
+        if args.loop_seconds <= 0:
+            break
+        time.sleep(args.loop_seconds)
+
+
+if __name__ == "__main__":
+    main()
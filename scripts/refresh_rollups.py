@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.config import settings
+from app.db.engine import create_db_engine
+from app.db.rollups import RollupJob
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fold new telemetry rows into analytics_rollups")
+    parser.add_argument("--url", default=settings.postgres_url)
+    parser.add_argument("--loop-seconds", type=float, default=0.0, help="Keep refreshing at this interval (0 runs once).")
+    args = parser.parse_args()
+
+    job = RollupJob(create_db_engine(args.url))
+    while True:
+        started = time.perf_counter()
+        results = job.run_once()
+        summary = ", ".join(f"{r.source}={r.rows} rows/{r.buckets} buckets" for r in results)
+        print(f"Rollups refreshed in {time.perf_counter() - started:.2f}s: {summary}")
+        if args.loop_seconds <= 0:
+            break
+        time.sleep(args.loop_seconds)
+
+
+if __name__ == "__main__":
+    main()
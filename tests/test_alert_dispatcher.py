@@ -0,0 +1,84 @@
+import time
+
+from app.analytics.alerts import AlertDispatcher, AlertEvent, MemorySink
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def dispatcher(sinks, **options) -> AlertDispatcher:
+    defaults = {"cooldown_seconds": 60.0, "coalesce_seconds": 0.0, "max_retries": 0, "retry_backoff_seconds": 0.01}
+    return AlertDispatcher(sinks, **(defaults | options))
+
+
+def test_cooldown_suppresses_and_counts_repeats() -> None:
+    sink = MemorySink()
+    alerts = dispatcher([sink], cooldown_seconds=0.2)
+    alerts.start()
+    try:
+        assert alerts.dispatch("loitering", "cam", "medium", "first")
+        assert not alerts.dispatch("loitering", "cam", "medium", "again")
+        assert not alerts.dispatch("loitering", "cam", "medium", "again")
+        assert alerts.dispatch("loitering", "other-cam", "medium", "different key")
+        time.sleep(0.25)
+        assert alerts.dispatch("loitering", "cam", "medium", "after cooldown")
+        wait_for(lambda: len(sink.events) == 3)
+    finally:
+        alerts.close()
+    assert [event.suppressed for event in sink.events if event.camera_id == "cam"] == [0, 2]
+    assert alerts.snapshot()["suppressed"] == 2
+
+
+def test_full_queue_does_not_start_cooldown_or_lose_suppressed_count() -> None:
+    sink = MemorySink()
+    alerts = dispatcher([sink], cooldown_seconds=0.2, queue_size=1)
+    assert alerts.dispatch("overcrowding", "a", "high", "fills the queue")
+    assert not alerts.dispatch("overcrowding", "a", "high", "suppressed")
+    assert not alerts.dispatch("overcrowding", "b", "high", "dropped: queue full")
+    time.sleep(0.25)
+    assert not alerts.dispatch("overcrowding", "a", "high", "dropped: queue full")
+    assert alerts.snapshot()["dropped"] == 2
+
+    alerts.start()
+    try:
+        wait_for(lambda: len(sink.events) == 1)
+        # Neither drop started a cooldown, and "a" still carries its suppressed repeat.
+        assert alerts.dispatch("overcrowding", "b", "high", "sent")
+        wait_for(lambda: len(sink.events) == 2)
+        assert alerts.dispatch("overcrowding", "a", "high", "sent")
+        wait_for(lambda: len(sink.events) == 3)
+    finally:
+        alerts.close()
+    assert {event.camera_id: event.suppressed for event in sink.events[1:]} == {"a": 1, "b": 0}
+
+
+class FailingSink:
+    def __init__(self) -> None:
+        self.attempts = 0
+
+    def deliver(self, events: list[AlertEvent], message: str) -> None:
+        self.attempts += 1
+        raise ConnectionError("sink down")
+
+
+def test_failing_sink_does_not_delay_other_sinks() -> None:
+    failing, memory = FailingSink(), MemorySink()
+    alerts = dispatcher([failing, memory], max_retries=3, retry_backoff_seconds=30.0)
+    alerts.start()
+    alerts.dispatch("shelf_empty", "cam", "low", "one")
+    alerts.dispatch("shelf_empty", "cam-2", "low", "two")
+    wait_for(lambda: len(memory.events) == 2, timeout=2.0)
+
+    started = time.monotonic()
+    alerts.close()
+    # close() interrupts the 30 s backoff; the remaining attempts run without waiting.
+    assert time.monotonic() - started < 5.0
+    digests = len(memory.messages)
+    assert failing.attempts == 4 * digests
+    stats = alerts.snapshot()
+    assert stats["delivery_failures"] == digests
+    assert stats["messages_sent"] == digests
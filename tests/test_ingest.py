@@ -0,0 +1,83 @@
+import gzip
+import json
+from typing import Any
+
+import pytest
+
+from app.ingest import BulkIngestor, IngestError, gunzip_bounded
+
+
+class FakeWriter:
+    max_pending_events = 1000
+
+    def __init__(self) -> None:
+        self.events: list[tuple[Any, ...]] = []
+
+    def pending(self) -> int:
+        return len(self.events)
+
+    def submit(self, events: list[tuple[Any, ...]]) -> None:
+        self.events.extend(events)
+
+
+def ndjson(*lines: Any) -> bytes:
+    return b"\n".join(json.dumps(line).encode() if not isinstance(line, bytes) else line for line in lines)
+
+
+def test_valid_lines_are_queued() -> None:
+    writer = FakeWriter()
+    ack = BulkIngestor(writer).ingest(
+        ndjson(["e", "cam", "k1", 1767225600], ["m", "cam", "k1", 1767225601, 10, 20.5], ["x", "cam", "k1", 1767225660, 60])
+    )
+    assert ack["accepted"] == 3 and ack["rejected"] == 0
+    assert [event[0] for event in writer.events] == ["customer", "movement", "exit"]
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        ["m", "cam", "k", 1e20, 1, 2],  # datetime.fromtimestamp overflows
+        ["m", "cam", "k", 1767225600, int("9" * 400), 2],  # int past float's range
+        ["o", "cam", 1e300, 1],
+        ["m", "cam", "k", float("nan"), 1, 2],
+        ["x", "cam", "k", 1767225600, float("inf")],
+        ["e", "cam", "k", -5],
+        ["m", "cam", "k", "soon", 1, 2],
+        ["e", "c" * 81, "k", 1767225600],
+        ["q", "cam"],
+        b"{not json",
+    ],
+)
+def test_bad_line_is_rejected_alone(line: Any) -> None:
+    writer = FakeWriter()
+    ack = BulkIngestor(writer).ingest(ndjson(line, ["e", "cam", "ok", 1767225600]))
+    assert ack["accepted"] == 1
+    assert ack["rejected"] == 1
+    assert ack["errors"][0]["line"] == 1
+    assert writer.events == [("customer", "ok", writer.events[0][2], "cam")]
+
+
+def test_numbers_are_stored_as_floats() -> None:
+    writer = FakeWriter()
+    BulkIngestor(writer).ingest(ndjson(["m", "cam", "k", 1767225600, 3, 4]))
+    assert writer.events[0][3:5] == (3.0, 4.0)
+    assert all(type(value) is float for value in writer.events[0][3:5])
+
+
+def test_saturated_writer_refuses_whole_batch() -> None:
+    writer = FakeWriter()
+    writer.max_pending_events = 1
+    with pytest.raises(IngestError) as exc:
+        BulkIngestor(writer).ingest(ndjson(["e", "cam", "a", 1767225600], ["e", "cam", "b", 1767225600]))
+    assert exc.value.status_code == 503
+    assert writer.events == []
+
+
+def test_gzip_is_bounded() -> None:
+    assert gunzip_bounded(gzip.compress(b"a" * 100) + gzip.compress(b"b"), 101) == b"a" * 100 + b"b"
+    with pytest.raises(IngestError) as exc:
+        gunzip_bounded(gzip.compress(b"\n" * 10_000_000), 1000)
+    assert exc.value.status_code == 413
+    with pytest.raises(IngestError) as exc:
+        gunzip_bounded(gzip.compress(b"abc")[:-4], 1000)
+    assert exc.value.status_code == 400
@@ -0,0 +1,18 @@
+import time
+
+from app.analytics.supervisor import CameraSupervisor, CameraSpec, WorkerSpec
+from app.realtime import OccupancyHub
+
+
+def test_supervisor_stats_reports_feed_the_occupancy_hub() -> None:
+    hub = OccupancyHub()
+    workers = [WorkerSpec("w", [CameraSpec("entrance", 0), CameraSpec("aisle", 1)])]
+    supervisor = CameraSupervisor(workers, status_path="", publish_occupancy=hub.publish)
+    supervisor._events.put(("stats", "w", {"camera_id": "entrance", "people": 4, "tracks": 6}))
+    supervisor._events.put(("stats", "w", {"camera_id": "aisle", "people": 0, "tracks": 0}))
+    supervisor._events.put(("error", "w", "aisle", "RuntimeError: boom"))
+    deadline = time.monotonic() + 5.0
+    while len(hub.cameras) < 2 and time.monotonic() < deadline:
+        supervisor._drain_events(timeout=0.1)
+
+    assert {camera_id: state.people_count for camera_id, state in hub.cameras.items()} == {"entrance": 4, "aisle": 0}
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from app.analytics.rules import Rule, RuleEngine, RuleInput, default_rules
+from app.analytics.zones import rectangle_zone
+
+
+def people(timestamp: float, count: int) -> RuleInput:
+    empty = np.zeros(count, dtype=np.float64)
+    return RuleInput(timestamp, np.arange(count, dtype=np.int64), empty, empty)
+
+
+def stock(timestamp: float, count: float) -> RuleInput:
+    empty = np.zeros(0, dtype=np.float64)
+    return RuleInput(timestamp, np.zeros(0, dtype=np.int64), empty, empty, shelf_stock=np.array([count]))
+
+
+def fired_at(engine: RuleEngine, frames: list[RuleInput]) -> list[float]:
+    return [event.timestamp.timestamp() for frame in frames for event in engine.update(frame)]
+
+
+def test_rule_fires_after_holding_for_seconds() -> None:
+    engine = RuleEngine("cam", [Rule("crowd", "occupancy", 5, for_seconds=2.0)])
+    assert fired_at(engine, [people(t, 6) for t in (0.0, 1.0, 1.5)]) == []
+    assert fired_at(engine, [people(2.0, 6), people(3.0, 6)]) == [2.0]
+    assert engine.firing() == {"crowd": 1}
+
+
+def test_dropping_below_threshold_before_for_seconds_restarts_the_wait() -> None:
+    engine = RuleEngine("cam", [Rule("crowd", "occupancy", 5, for_seconds=2.0)])
+    assert fired_at(engine, [people(0.0, 6), people(1.5, 4), people(2.0, 6), people(3.5, 6)]) == []
+    assert fired_at(engine, [people(4.0, 6)]) == [4.0]
+
+
+def test_firing_rule_stays_firing_between_clear_and_threshold() -> None:
+    engine = RuleEngine("cam", [Rule("crowd", "occupancy", 10, clear=7, clear_seconds=2.0)])
+    assert fired_at(engine, [people(0.0, 10)]) == [0.0]
+    # Hovering around the threshold, but never at or below clear: no re-fire, no resolve.
+    assert fired_at(engine, [people(t, 9 if t % 2 else 10) for t in range(1, 8)]) == []
+    assert engine.firing() == {"crowd": 1}
+    assert engine.stats.resolved == 0
+
+    # Past clear, but not for clear_seconds.
+    assert fired_at(engine, [people(10.0, 6), people(11.0, 8), people(12.0, 6), people(13.0, 6)]) == []
+    assert engine.firing() == {"crowd": 1}
+    assert fired_at(engine, [people(14.0, 6)]) == []
+    assert engine.firing() == {"crowd": 0}
+    assert engine.stats.resolved == 1
+    assert fired_at(engine, [people(15.0, 10)]) == [15.0]
+
+
+def test_cooldown_holds_back_a_refire() -> None:
+    engine = RuleEngine("cam", [Rule("crowd", "occupancy", 10, cooldown_seconds=60.0)])
+    assert fired_at(engine, [people(0.0, 10), people(1.0, 5), people(30.0, 10), people(59.0, 10)]) == [0.0]
+    assert fired_at(engine, [people(60.0, 10)]) == [60.0]
+
+
+def test_clear_on_the_firing_side_is_rejected() -> None:
+    with pytest.raises(ValueError, match="firing side"):
+        Rule("crowd", "occupancy", 10, clear=12)
+
+
+@pytest.mark.parametrize("restocked", [1, 3])
+def test_default_shelf_empty_clears_once_one_item_is_back(restocked: int) -> None:
+    (rule,) = [rule for rule in default_rules() if rule.name == "shelf_empty"]
+    zones = [rectangle_zone("Shelf", 0, 0, 10, 10, product_class="bottle")]
+    engine = RuleEngine("cam", [rule], zones)
+    hold = rule.for_seconds
+    assert fired_at(engine, [stock(0.0, 0), stock(hold, 0)]) == [hold]
+
+    frames = [stock(hold + 1 + t, restocked) for t in range(int(rule.clear_seconds) + 1)]
+    assert fired_at(engine, frames) == []
+    assert engine.firing() == {"shelf_empty": 0}
+    assert engine.stats.resolved == 1
+
+
+def test_frames_without_shelf_stock_leave_shelf_rules_alone() -> None:
+    rule = Rule("shelf_empty", "shelf_stock", 0, op="<=", clear=0.5, for_seconds=5.0)
+    engine = RuleEngine("cam", [rule], [rectangle_zone("Shelf", 0, 0, 10, 10, product_class="bottle")])
+    skipped = RuleInput(3.0, np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0))
+    assert fired_at(engine, [stock(0.0, 0), skipped, stock(5.0, 0)]) == [5.0]